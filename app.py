@@ -1,59 +1,37 @@
-import time
-import requests
-import datetime as dt
-import pytz
-import os
-import pandas as pd
 import streamlit as st
-from streamlit.components.v1 import iframe
-
-if st.query_params.get("ping") == "1":
-    st.write("ok"); st.stop()
-
-# ===== Komponen: Waktu Sholat =====
-from components.waktu_sholat import (
-    TZ, METHODS, fetch_timings_by_city, parse_today_times,
-    to_local_datetime, next_prayer, fmt_delta
-)
-
-# ===== Komponen: Quran =====
-from components.quran import render_quran_tab
-
-# ===== Komponen: Zakat =====
-from components.zakat import (
-    zakat_kalkulator, OZT_TO_GRAM,
-    fetch_gold_price_idr_per_gram, format_rp, nisab_emas_idr
-)
-
-# ===== Komponen: Masjid Terdekat =====
-from components.masjid import (
-    show_nearby_mosques
-)
-
-# ===== Komponen: Murottal =====
-from components.murottal import (
-    RADIO_API, fetch_radios, show_murottal_tab
-)
 
-# ===== Komponen: Khutbah GPT =====
-from components.khutbah_gpt import (
-    render_khutbah_form, generate_khutbah, generate_khutbah_gpt
+# ===== Page setup =====
+# set_page_config harus jadi perintah st pertama di setiap rerun
+st.set_page_config(
+    page_title="SmartFaith",
+    page_icon="🕋",
+    layout="wide"
 )
 
-# ===== Komponen: Live TV =====
-from components.live_tv import render_live_tv_tab
-
-# ===== Komponen: Chat Ustadz =====
-from components.chat_ustadz import show_chat_ustadz_tab
-
-# ===== Komponen: Hafalan =====
-from components.tab_hafalan_audio import show_hafalan_audio_tab
+# Warm-up cache upstream di thread latar, sekali per proses (components/warmup.py).
+# Dipasang sebelum ping supaya container yang dibangunkan ping sudah hangat;
+# modul job baru di-import di thread itu, bukan di sini. Thread itu tak punya
+# ScriptRunContext, jadi secrets dibaca di sini lalu diteruskan.
+from components import warmup
+try:
+    _gold_key = str(st.secrets.get("GOLDAPI_KEY", "") or "")
+except Exception:  # tanpa secrets.toml
+    _gold_key = ""
+warmup.start(job_args={"gold_price": [(_gold_key,)] if _gold_key else []})
+
+# Exporter Prometheus /metrics (hanya kalau ISLAMICHAT_METRICS_PORT di-set), sekali per proses.
+from components import metrics
+metrics.start_exporter()
+
+# Ping keep-alive (GitHub Actions tiap 10 menit) dijawab sebelum import lain:
+# modul komponen & dependency beratnya baru dimuat saat tab-nya dirender.
+if st.query_params.get("ping") == "1":
+    st.write("ok"); st.stop()
 
-# ===== Komponen: Zikir =====
-from components.zikir import show_zikir_tab
+import time
 
-# ===== Komponen: Doa Harian =====
-from components.doa_harian import show_doa_harian
+# ===== Router tab =====
+from components.router import register_tab, render_tab_router
 
 with st.sidebar:
     st.sidebar.image(
@@ -96,12 +74,8 @@ with st.sidebar:
     Versi UI: v1.0 • Streamlit • Theme Dark
     """)
 
-# ===== Page setup =====
-st.set_page_config(
-    page_title="SmartFaith",
-    page_icon="🕋",
-    layout="wide"
-)
+    with st.expander("⚙️ Status data & cache"):
+        warmup.render_status()
 
 LOGO_URL = "https://i.imgur.com/vPQigu6.png"
 
@@ -117,24 +91,12 @@ with col2:
 st.caption("Asisten Islami Berbasis AI: Tanya Jawab, Generator Khutbah, & Setor Hafalan")
 
 # ===== Tab utama =====
-tabs = st.tabs([
-    "🤖 Chatbot", 
-    "🕌 Waktu Sholat",
-    "📻 Murottal Quran",
-    "📖 Quran",
-    "🧮 Kalkulator Zakat",
-    "🗺️ Masjid Terdekat",
-    "🗓️ Event Islam",
-    "🗣️ KhutbahGPT",
-    "📺 Live TV",
-    "📞 Chat Ustadz",
-    "🎙️ Setor Hafalan",
-    "🧿 Zikir",
-    "📚 Doa Harian"
-])
+# Hanya tab aktif yang dieksekusi per rerun (lihat components/router.py);
+# sebelumnya st.tabs menjalankan ke-13 body tab setiap interaksi.
 
 # ===== Tab: Chatbot =====
-with tabs[0]:
+@register_tab("chatbot", "🤖 Chatbot")
+def _tab_chatbot():
     st.subheader("🤖 Chatbot Islami")
     st.markdown("""
         Silakan pilih beragam pilihan widget chatbot sesuai kebutuhan Anda:
@@ -168,6 +130,7 @@ with tabs[0]:
     st.write(f"💬 Chat aktif: **{widget_opt}**")
     st.caption("Jika area kosong, kemungkinan dibatasi oleh CSP/X-Frame-Options dari penyedia.")
 
+    from streamlit.components.v1 import iframe
     iframe(src=final_url, height=720)
 
     if st.button(f"🔗 Klik disini jika ingin menampilkan halaman chat {widget_opt} dengan lebih baik"):
@@ -178,8 +141,18 @@ with tabs[0]:
             unsafe_allow_html=True
         )
 
-# === Tab 1: Waktu Sholat ===
-with tabs[1]:
+# === Tab: Waktu Sholat ===
+@register_tab("sholat", "🕌 Waktu Sholat")
+def _tab_waktu_sholat():
+    import datetime as dt
+    import pandas as pd
+    from components.waktu_sholat import (
+        METHODS, fetch_timings, parse_today_times, location_tz,
+        to_local_datetime, render_countdown,
+        all_cities, yearly_timetable
+    )
+    from components.prayer_calc import timetable_to_csv, timetable_to_json
+
     st.subheader("🕌 Waktu Sholat Harian")
     try:
         city = st.text_input("Kota", value="Palembang")
@@ -187,47 +160,45 @@ with tabs[1]:
         method_name = st.selectbox("Metode perhitungan", list(METHODS.keys()), index=1)
         method = METHODS[method_name]
 
-        payload = fetch_timings_by_city(city, country, method)
+        payload = fetch_timings(city, country, method)
         date_readable = payload["date"]["readable"]
         timings = parse_today_times(payload["timings"])
+        tz = location_tz(payload)
 
         times_local = {
-            n: to_local_datetime(date_readable, t.split(" ")[0])
+            n: to_local_datetime(date_readable, t.split(" ")[0], tz)
             for n, t in timings.items()
         }
 
-        st.write(f"📅 **{date_readable}** — Zona: **{TZ.zone}** — Metode: **{method_name}**")
+        st.write(f"📅 **{date_readable}** — Zona: **{tz.zone}** — Metode: **{method_name}**")
+        src = payload.get("meta", {}).get("source")
+        st.caption("Dihitung lokal (offline)" if src == "local" else "Sumber: Aladhan API")
         rows = [(n, timings[n]) for n in ["Fajr", "Dhuhr", "Asr", "Maghrib", "Isha"] if n in timings]
         st.dataframe(pd.DataFrame(rows, columns=["Sholat", "Waktu"]), hide_index=True, use_container_width=True)
 
-        now = dt.datetime.now(TZ)
-        name, tnext = next_prayer(now, times_local)
-        if name:
-            st.success(f"Sholat berikutnya: **{name}** — **{tnext.strftime('%H:%M')}** (≈ {fmt_delta(tnext - now)})")
-            st.caption("Hitung mundur diperbarui saat halaman di-run ulang.")
-        else:
-            st.info("Semua waktu sholat hari ini sudah lewat.")
+        render_countdown(times_local)
+
+        with st.expander("📆 Jadwal setahun (display/IoT)"):
+            meta = payload.get("meta", {})
+            year = st.number_input("Tahun", min_value=1900, max_value=2200,
+                                   value=dt.date.today().year, step=1)
+            semua = st.checkbox("Semua kota di tabel offline", value=False)
+            if semua:
+                locs = tuple((k["kota"], k["lat"], k["lon"], k["tz"]) for k in all_cities())
+            else:
+                locs = ((city, float(meta["latitude"]), float(meta["longitude"]), meta["timezone"]),)
+            df = yearly_timetable(locs, int(year), method)
+            st.caption(f"{len(locs)} lokasi × {df['date'].nunique()} hari = {len(df):,} baris")
+            st.dataframe(df.head(31), hide_index=True, use_container_width=True)
+            fname = "jadwal-sholat-" + ("semua" if semua else city.strip().lower().replace(" ", "-")) + f"-{int(year)}"
+            c1, c2 = st.columns(2)
+            c1.download_button("⬇️ CSV", timetable_to_csv(df), file_name=f"{fname}.csv", mime="text/csv")
+            c2.download_button("⬇️ JSON", timetable_to_json(df), file_name=f"{fname}.json", mime="application/json")
     except Exception as e:
         st.error(f"Gagal mengambil data: {e}")
 
-# === Tab 2: Murottal ===
-with tabs[2]:
-    show_murottal_tab()
-
-# === Tab 3: Quran ===
-with tabs[3]:
-    render_quran_tab()
-
-# === Tab 4: Kalkulator Zakat ===
-with tabs[4]:
-    zakat_kalkulator()
-
-# === Tab 5: Masjid Terdekat ===
-with tabs[5]:
-    show_nearby_mosques()
-
-# === Tab 6: Event Islam ===
-with tabs[6]:
+# === Tab: Event Islam ===
+def _tab_event():
     try:
         from components.event import render_event
         render_event()
@@ -236,29 +207,21 @@ with tabs[6]:
         from components.event import render_simple_hijri_calendar
         render_simple_hijri_calendar()
 
-# === Tab 7: KhutbahGPT ===
-with tabs[7]:
-    render_khutbah_form()
-
-# === Tab 8: Live TV ===
-with tabs[8]:
-    render_live_tv_tab()
-
-# === Tab 9: Chat Ustadz ===
-with tabs[9]:
-    show_chat_ustadz_tab()
-
-# === Tab 10: Hafalan ===
-with tabs[10]:
-    show_hafalan_audio_tab()
-
-# === Tab 11: Zikir ===
-with tabs[11]:
-    show_zikir_tab()
-
-# === Tab 12: Doa Harian ===
-with tabs[12]:
-    show_doa_harian()
+register_tab("murottal", "📻 Murottal Quran", "components.murottal:show_murottal_tab")
+register_tab("quran", "📖 Quran", "components.quran:render_quran_tab")
+register_tab("zakat", "🧮 Kalkulator Zakat", "components.zakat:zakat_kalkulator")
+register_tab("masjid", "🗺️ Masjid Terdekat", "components.masjid:show_nearby_mosques")
+register_tab("event", "🗓️ Event Islam", _tab_event)
+register_tab("khutbah", "🗣️ KhutbahGPT", "components.khutbah_gpt:render_khutbah_form")
+register_tab("live_tv", "📺 Live TV", "components.live_tv:render_live_tv_tab")
+register_tab("ustadz", "📞 Chat Ustadz", "components.chat_ustadz:show_chat_ustadz_tab")
+register_tab("hafalan", "🎙️ Setor Hafalan", "components.tab_hafalan_audio:show_hafalan_audio_tab")
+register_tab("zikir", "🧿 Zikir", "components.zikir:show_zikir_tab")
+register_tab("doa", "📚 Doa Harian", "components.doa_harian:show_doa_harian")
+# khusus admin: buka sekali dengan ?admin=<ADMIN_TOKEN> (secrets / ISLAMICHAT_ADMIN_TOKEN)
+register_tab("debug", "🛠️ Debug", "components.metrics:render_debug_tab", when="components.metrics:is_admin")
+
+render_tab_router(default="chatbot")
 
 import streamlit as st
 
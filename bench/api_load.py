@@ -0,0 +1,148 @@
+"""
+Load test API JSON (components/api.py): N koneksi keep-alive paralel
+selama D detik, campuran endpoint; lapor req/s dan latensi p50/p95/p99.
+
+Klien asyncio + socket mentah (tanpa dependensi), jadi klien sendiri tidak
+jadi bottleneck. --spawn menjalankan server di core `--cpu` dan klien
+di core lain, supaya angka req/s = kapasitas satu core server.
+
+    python bench/api_load.py --spawn --cpu 0                  # server bawaan/uvicorn, 1 core
+    python bench/api_load.py --url http://127.0.0.1:8000 -c 64 -d 20
+    python bench/api_load.py --spawn --paths /zakat/income?penghasilan=1 --etag   # jalur 304
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+ROOT = Path(__file__).resolve().parents[1]
+
+DEFAULT_PATHS = [
+    "/prayer-times?city=Jakarta&date=2025-03-01",
+    "/prayer-times?lat=-7.25&lon=112.75",
+    "/hijri/convert?date=2025-03-01",
+    "/hijri/convert?hijri=10-12-1446",
+    "/calendar/1447",
+    "/zakat/income?penghasilan=12000000&pengeluaran=3000000&harga_emas=1500000",
+]
+
+async def _read_response(reader: asyncio.StreamReader) -> Tuple[int, Dict[str, str]]:
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status = int(lines[0].split(" ", 2)[1])
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            k, v = line.split(":", 1)
+            headers[k.strip().lower()] = v.strip()
+    n = int(headers.get("content-length", "0") or 0)
+    if n:
+        await reader.readexactly(n)
+    return status, headers
+
+async def _worker(host: str, port: int, paths: List[str], offset: int, deadline: float,
+                  use_etag: bool, lat: List[float], codes: Counter) -> None:
+    reader, writer = await asyncio.open_connection(host, port)
+    etags: Dict[str, str] = {}
+    i = offset
+    try:
+        while time.perf_counter() < deadline:
+            path = paths[i % len(paths)]
+            i += 1
+            extra = f"If-None-Match: {etags[path]}\r\n" if use_etag and path in etags else ""
+            req = f"GET {path} HTTP/1.1\r\nHost: {host}\r\n{extra}\r\n".encode("latin-1")
+            t = time.perf_counter()
+            writer.write(req)
+            status, headers = await _read_response(reader)
+            lat.append(time.perf_counter() - t)
+            codes[status] += 1
+            if use_etag and "etag" in headers:
+                etags[path] = headers["etag"]
+            if headers.get("connection", "").lower() == "close":
+                writer.close()
+                reader, writer = await asyncio.open_connection(host, port)
+    finally:
+        writer.close()
+
+async def run_load(url: str, paths: List[str], conns: int, duration: float, use_etag: bool) -> Dict:
+    u = urlsplit(url)
+    host, port = u.hostname or "127.0.0.1", u.port or 80
+    lat: List[float] = []
+    codes: Counter = Counter()
+    # pemanasan: isi cache kalender & import malas sebelum diukur
+    await _worker(host, port, paths, 0, time.perf_counter() + 0.5, use_etag, [], Counter())
+    t0 = time.perf_counter()
+    deadline = t0 + duration
+    await asyncio.gather(*(_worker(host, port, paths, k, deadline, use_etag, lat, codes)
+                           for k in range(conns)))
+    elapsed = time.perf_counter() - t0
+    lat.sort()
+
+    def pct(p: float) -> float:
+        return lat[min(len(lat) - 1, int(p * len(lat)))] * 1000 if lat else float("nan")
+
+    return {
+        "requests": len(lat),
+        "rps": len(lat) / elapsed,
+        "p50_ms": pct(0.50),
+        "p95_ms": pct(0.95),
+        "p99_ms": pct(0.99),
+        "mean_ms": statistics.fmean(lat) * 1000 if lat else float("nan"),
+        "codes": dict(codes),
+    }
+
+def _wait_port(host: str, port: int, timeout: float = 20.0) -> None:
+    import socket
+    end = time.time() + timeout
+    while time.time() < end:
+        try:
+            socket.create_connection((host, port), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise SystemExit(f"server tidak bisa dihubungi di {host}:{port}")
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Load test API JSON IslamiChat")
+    ap.add_argument("--url", default="http://127.0.0.1:8000")
+    ap.add_argument("-c", "--connections", type=int, default=32)
+    ap.add_argument("-d", "--duration", type=float, default=10.0)
+    ap.add_argument("--paths", nargs="+", default=DEFAULT_PATHS)
+    ap.add_argument("--etag", action="store_true", help="kirim If-None-Match (uji jalur 304)")
+    ap.add_argument("--spawn", action="store_true", help="jalankan server sendiri (python -m components.api)")
+    ap.add_argument("--cpu", type=int, default=0, help="core untuk server saat --spawn")
+    ap.add_argument("--server", choices=["auto", "uvicorn", "builtin"], default="auto")
+    args = ap.parse_args(argv)
+
+    proc = None
+    if args.spawn:
+        u = urlsplit(args.url)
+        cmd = [sys.executable, "-m", "components.api", "--host", u.hostname or "127.0.0.1",
+               "--port", str(u.port or 8000), "--cpu", str(args.cpu), "--server", args.server]
+        env = {**os.environ, "ISLAMICHAT_WARMUP": "off"}
+        proc = subprocess.Popen(cmd, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        _wait_port(u.hostname or "127.0.0.1", u.port or 8000)
+        if hasattr(os, "sched_setaffinity") and len(os.sched_getaffinity(0)) > 1:
+            os.sched_setaffinity(0, os.sched_getaffinity(0) - {args.cpu})  # klien jangan rebut core server
+    try:
+        res = asyncio.run(run_load(args.url, args.paths, args.connections, args.duration, args.etag))
+    finally:
+        if proc:
+            proc.terminate()
+            proc.wait()
+
+    print(f"{res['requests']} request dalam {args.duration:.0f} s, {args.connections} koneksi"
+          + (f", server di core {args.cpu}" if args.spawn else ""))
+    print(f"  {res['rps']:,.0f} req/s   p50 {res['p50_ms']:.2f} ms   p95 {res['p95_ms']:.2f} ms   "
+          f"p99 {res['p99_ms']:.2f} ms   (mean {res['mean_ms']:.2f} ms)")
+    print(f"  status: {res['codes']}")
+
+if __name__ == "__main__":
+    main()
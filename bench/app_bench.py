@@ -0,0 +1,251 @@
+"""
+Benchmark rerun app.py per tab, tanpa menyentuh upstream asli.
+
+Setiap tab dijalankan sebagai satu sesi AppTest di subprocess tersendiri
+(import, cache & memori bersih per sesi) melawan bench/mock_upstream.py;
+semua fetcher diarahkan ke mock lewat ISLAMICHAT_UPSTREAM_OVERRIDE.
+Per sesi: render awal, langkah interaksi skenario (ganti kota, pilih
+surat, cari alamat, …), lalu --reruns rerun biasa.
+
+Dilaporkan per tab: latensi render awal (dingin) terpisah dari p50/p95/maks
+rerun sesudahnya, panggilan upstream per rerun (dan per host),
+error/exception, serta memori puncak sesi (ru_maxrss subprocess dikurangi
+baseline setelah import Streamlit).
+
+    python bench/app_bench.py                               # semua tab, mock tanpa latensi
+    python bench/app_bench.py --tabs quran masjid --reruns 10
+    python bench/app_bench.py --latency 120 --rate-429 0.1 --error-rate 0.05
+    python bench/app_bench.py --json hasil.json             # simpan untuk dibandingkan
+    python bench/app_bench.py --compare hasil.json          # selisih terhadap run sebelumnya
+    python bench/app_bench.py --env ISLAMICHAT_HIJRI_SOURCE=api --tabs event
+
+Tab yang butuh OpenAI (KhutbahGPT, Setor Hafalan) hanya dirender —
+tombol generate/transkripsi tidak ditekan.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "bench"))
+
+TIMEOUT_SEC = 120
+
+# ===== Skenario per tab =====
+# (label langkah, aksi pada AppTest sebelum rerun); render awal selalu langkah pertama.
+Step = Tuple[str, Callable[[Any], Any]]
+
+def _by_label(widgets, label: str):
+    return next(w for w in widgets if w.label == label)
+
+SCENARIOS: Dict[str, List[Step]] = {
+    "chatbot": [],
+    "sholat": [
+        ("kota di luar tabel offline (Aladhan)", lambda at: _by_label(at.text_input, "Kota").set_value("Cianjur")),
+    ],
+    # selectbox qori berisi dict + format_func: AppTest tidak bisa memilihnya, cukup rerun
+    "murottal": [],
+    "quran": [
+        ("pilih surat 2", lambda at: _by_label(at.selectbox, "Pilih Surat").select_index(1)),
+    ],
+    "zakat": [
+        ("harga emas otomatis (GoldAPI)", lambda at: _by_label(at.toggle, "Gunakan harga emas otomatis").set_value(True)),
+        ("hitung", lambda at: _by_label(at.button, "Hitung Zakat").click()),
+    ],
+    "masjid": [
+        ("cari alamat", lambda at: at.text_input(key="addr_query").set_value("Jakarta")),
+        ("radius 3000 m", lambda at: _by_label(at.slider, "Radius pencarian (meter)").set_value(3000)),
+    ],
+    "event": [],
+    "khutbah": [],
+    "live_tv": [],
+    "ustadz": [],
+    "hafalan": [],
+    "zikir": [],
+    "doa": [
+        ("pilih doa lain", lambda at: _by_label(at.selectbox, "Pilih doa").select_index(1)),
+    ],
+}
+
+# ===== Sisi child: satu sesi AppTest =====
+def _mock_stats(url: str) -> Dict[str, Any]:
+    with urllib.request.urlopen(f"{url}/__mock/stats", timeout=5) as r:
+        return json.load(r)
+
+def _maxrss_mb() -> float:
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB di Linux
+
+def run_session(tab: str, mock_url: str, reruns: int) -> Dict[str, Any]:
+    import logging
+
+    logging.disable(logging.WARNING)  # "No runtime found" dkk. dari mode bare
+    from streamlit.testing.v1 import AppTest
+
+    from components.router import STATE_KEY
+
+    baseline_mb = _maxrss_mb()
+    at = AppTest.from_file(str(ROOT / "app.py"), default_timeout=TIMEOUT_SEC)
+    at.secrets["GOLDAPI_KEY"] = "bench"
+    at.session_state[STATE_KEY] = tab
+
+    steps: List[Tuple[str, Optional[Callable]]] = [("render awal", None)]
+    steps += SCENARIOS.get(tab, [])
+    steps += [("rerun", None)] * reruns
+
+    runs = []
+    for label, action in steps:
+        err = ""
+        before = _mock_stats(mock_url)
+        t = time.perf_counter()
+        try:
+            if action is not None:
+                action(at)
+            at.run()
+        except Exception as e:  # widget tak ditemukan / timeout script
+            err = f"{type(e).__name__}: {e}"[:200]
+        ms = (time.perf_counter() - t) * 1000
+        after = _mock_stats(mock_url)
+        hosts = {h: n - before["by_host"].get(h, 0) for h, n in after["by_host"].items()
+                 if n - before["by_host"].get(h, 0)}
+        runs.append({
+            "step": label,
+            "ms": round(ms, 2),
+            "upstream_calls": after["total"] - before["total"],
+            "upstream_bytes": after["bytes"] - before["bytes"],
+            "hosts": hosts,
+            "exceptions": len(at.exception) + (1 if err else 0),
+            "errors": len(at.error),
+            "error": err or (at.exception[0].value if len(at.exception) else ""),
+        })
+    peak_mb = _maxrss_mb()
+    return {"tab": tab, "runs": runs, "peak_rss_mb": round(peak_mb, 1),
+            "session_mb": round(peak_mb - baseline_mb, 1)}
+
+# ===== Sisi parent =====
+def _pct(xs: List[float], p: float) -> float:
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(p * len(xs)))] if xs else float("nan")
+
+def summarize(res: Dict[str, Any]) -> Dict[str, Any]:
+    runs = res["runs"]
+    # render awal (dingin) punya kolom sendiri; persentil hanya dari rerun sesudahnya
+    warm = [r["ms"] for r in runs[1:]] or [runs[0]["ms"]]
+    calls = [r["upstream_calls"] for r in runs]
+    hosts: Dict[str, int] = {}
+    for r in runs:
+        for h, n in r["hosts"].items():
+            hosts[h] = hosts.get(h, 0) + n
+    return {
+        "tab": res["tab"],
+        "reruns": len(runs),
+        "first_ms": runs[0]["ms"],
+        "p50_ms": statistics.median(warm),
+        "p95_ms": _pct(warm, 0.95),
+        "max_ms": max(warm),
+        "calls_total": sum(calls),
+        "calls_per_rerun": sum(calls) / len(calls),
+        "calls_steady": statistics.fmean(calls[-3:]) if len(calls) >= 3 else calls[-1],
+        "hosts": hosts,
+        "exceptions": sum(r["exceptions"] for r in runs),
+        "errors": sum(r["errors"] for r in runs),
+        "first_error": next((r["error"] for r in runs if r["error"]), ""),
+        "session_mb": res["session_mb"],
+        "peak_rss_mb": res["peak_rss_mb"],
+    }
+
+def run_tab(tab: str, mock_url: str, reruns: int, env: Dict[str, str]) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory(prefix=f"bench-{tab}-") as cache:
+        child_env = {
+            **os.environ,
+            "ISLAMICHAT_UPSTREAM_OVERRIDE": mock_url,
+            "ISLAMICHAT_CACHE_DIR": cache,           # cache disk bersih per sesi
+            "ISLAMICHAT_WARMUP": "off",              # hanya hitung panggilan dari rerun
+            "ISLAMICHAT_MOSQUE_INDEX": os.path.join(cache, "tidak-ada.npz"),  # paksa jalur Overpass
+            "PYTHONPATH": str(ROOT),
+            **env,
+        }
+        p = subprocess.run(
+            [sys.executable, __file__, "--child", tab, "--mock", mock_url, "--reruns", str(reruns)],
+            cwd=ROOT, env=child_env, capture_output=True, text=True, timeout=TIMEOUT_SEC * (reruns + 4),
+        )
+    line = next((ln for ln in reversed(p.stdout.splitlines()) if ln.startswith("{")), None)
+    if p.returncode or not line:
+        tail = (p.stderr or p.stdout).strip().splitlines()[-3:]
+        return {"tab": tab, "runs": [{"step": "crash", "ms": float("nan"), "upstream_calls": 0, "upstream_bytes": 0,
+                                      "hosts": {}, "exceptions": 1, "errors": 0, "error": " | ".join(tail)}],
+                "peak_rss_mb": float("nan"), "session_mb": float("nan")}
+    return json.loads(line)
+
+def print_table(rows: List[Dict[str, Any]], base: Optional[Dict[str, Dict[str, Any]]] = None) -> None:
+    def cell(r: Dict[str, Any], key: str, width: int, fmt: str = ".0f") -> str:
+        """Nilai + selisih % terhadap --compare, rata kanan dalam satu kolom."""
+        cur, prev = r[key], (base or {}).get(r["tab"], {}).get(key)
+        delta = f" ({(cur - prev) / prev * 100:+.0f}%)" if prev else ""
+        return f"{format(cur, fmt)}{delta}".rjust(width)
+
+    w = 16 if base else 8
+    print(f"{'tab':<9} {'awal ms':>{w}} {'p50 ms':>{w}} {'p95 ms':>{w}} {'upstream/rerun':>14} "
+          f"{'sesi MB':>{w}}  exc/err")
+    for r in rows:
+        print(f"{r['tab']:<9} {cell(r, 'first_ms', w)} {cell(r, 'p50_ms', w)} {cell(r, 'p95_ms', w)} "
+              f"{r['calls_per_rerun']:>14.2f} {cell(r, 'session_mb', w, '.1f')}  "
+              f"{r['exceptions']}/{r['errors']}")
+    for r in rows:
+        if r["hosts"]:
+            print(f"  {r['tab']}: " + ", ".join(f"{h}×{n}" for h, n in sorted(r["hosts"].items())))
+        if r["first_error"]:
+            print(f"  {r['tab']}: ⚠ {r['first_error']}")
+
+def main(argv: Optional[List[str]] = None) -> None:
+    import mock_upstream
+
+    ap = argparse.ArgumentParser(description="Benchmark rerun app.py per tab dengan mock upstream")
+    ap.add_argument("--tabs", nargs="+", default=list(SCENARIOS), choices=list(SCENARIOS))
+    ap.add_argument("--reruns", type=int, default=5, help="rerun biasa sesudah langkah skenario")
+    ap.add_argument("--env", action="append", default=[], metavar="KEY=VAL", help="env tambahan untuk app")
+    ap.add_argument("--json", type=Path, help="simpan ringkasan + data mentah")
+    ap.add_argument("--compare", type=Path, help="bandingkan dengan file --json sebelumnya")
+    ap.add_argument("--child", help=argparse.SUPPRESS)
+    ap.add_argument("--mock", help=argparse.SUPPRESS)
+    mock_upstream.add_profile_args(ap)
+    args = ap.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(run_session(args.child, args.mock, args.reruns)))
+        return
+
+    env = dict(e.split("=", 1) for e in args.env)
+    srv = mock_upstream.start(profile=mock_upstream.profile_from_args(args),
+                              fixtures=mock_upstream.Fixtures(record=args.record))
+    print(f"mock upstream {srv.url} • {len(args.tabs)} tab • {args.reruns} rerun/tab", flush=True)
+
+    raw, rows = [], []
+    for tab in args.tabs:
+        res = run_tab(tab, srv.url, args.reruns, env)
+        raw.append(res)
+        rows.append(summarize(res))
+        print(f"  {tab:<9} selesai ({rows[-1]['reruns']} rerun)", flush=True)
+    srv.shutdown()
+
+    base = None
+    if args.compare:
+        base = {r["tab"]: r for r in json.loads(args.compare.read_text())["summary"]}
+    print()
+    print_table(rows, base)
+    if args.json:
+        args.json.write_text(json.dumps({"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "args": sys.argv[1:],
+                                         "summary": rows, "raw": raw}, indent=1, ensure_ascii=False))
+        print(f"\ntersimpan di {args.json}")
+
+if __name__ == "__main__":
+    main()
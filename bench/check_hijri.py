@@ -0,0 +1,94 @@
+"""
+Validasi konverter Hijriah offline (components/hijri.py) terhadap Aladhan API.
+
+Set fixture: awal bulan Hijriah (1 Muharram, 1 Ramadhan, 1 Syawal, 1 Dzulhijjah)
+untuk sampel tahun 1343–1500 H (hToG) + tanggal Masehi acak 1925–2076 (gToH).
+Aladhan dipanggil dengan calendarMethod=UAQ (Umm al-Qura murni); default API
+(HJCoSA) memasukkan hasil rukyat resmi, jadi bisa beda ±1 hari dan itu wajar.
+
+    python bench/check_hijri.py                       # tanya API langsung
+    python bench/check_hijri.py --save fx.json        # sekalian simpan respons
+    python bench/check_hijri.py --fixtures fx.json    # replay offline
+"""
+import argparse
+import datetime as dt
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from components.hijri import gregorian_to_hijri, hijri_to_gregorian  # noqa: E402
+
+ALADHAN = "https://api.aladhan.com/v1"
+MONTHS = [1, 9, 10, 12]
+
+def fixture_set(quick: bool):
+    years = range(1343, 1501, 15 if quick else 3)
+    h_dates = [(y, m, 1) for y in years for m in MONTHS]
+    rnd = random.Random(1447)
+    n = 20 if quick else 200
+    start = dt.date(1925, 1, 1).toordinal()
+    end = dt.date(2076, 12, 31).toordinal()
+    g_dates = sorted(dt.date.fromordinal(rnd.randint(start, end)) for _ in range(n))
+    return h_dates, g_dates
+
+def _fetch(session, path: str, date_str: str) -> dict:
+    r = session.get(f"{ALADHAN}/{path}", params={"date": date_str, "calendarMethod": "UAQ"}, timeout=15)
+    r.raise_for_status()
+    j = r.json()
+    if j.get("code") != 200:
+        raise RuntimeError(j)
+    return j["data"]
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--quick", action="store_true")
+    ap.add_argument("--fixtures", type=Path, help="file JSON respons tersimpan (tanpa jaringan)")
+    ap.add_argument("--save", type=Path, help="simpan respons API ke file ini")
+    args = ap.parse_args()
+
+    if args.fixtures:
+        with open(args.fixtures, encoding="utf-8") as f:
+            fx = json.load(f)
+    else:
+        import requests
+        session = requests.Session()
+        h_dates, g_dates = fixture_set(args.quick)
+        fx = {"hToG": {}, "gToH": {}}
+        for y, m, d in h_dates:
+            key = f"{d:02d}-{m:02d}-{y}"
+            fx["hToG"][key] = _fetch(session, "hToG", key)["gregorian"]["date"]
+            time.sleep(0.1)  # sopan ke API publik
+        for g in g_dates:
+            key = g.strftime("%d-%m-%Y")
+            fx["gToH"][key] = _fetch(session, "gToH", key)["hijri"]["date"]
+            time.sleep(0.1)
+        if args.save:
+            with open(args.save, "w", encoding="utf-8") as f:
+                json.dump(fx, f, indent=1)
+
+    failures = 0
+    for key, ref in fx["hToG"].items():
+        d, m, y = (int(x) for x in key.split("-"))
+        local = hijri_to_gregorian(y, m, d).strftime("%d-%m-%Y")
+        if local != ref:
+            failures += 1
+            print(f"✗ hToG {key} H: lokal {local} vs API {ref}")
+    for key, ref in fx["gToH"].items():
+        d, m, y = (int(x) for x in key.split("-"))
+        hy, hm, hd = gregorian_to_hijri(dt.date(y, m, d))
+        local = f"{hd:02d}-{hm:02d}-{hy}"
+        if local != ref:
+            failures += 1
+            print(f"✗ gToH {key}: lokal {local} vs API {ref}")
+
+    total = len(fx["hToG"]) + len(fx["gToH"])
+    print(f"{total} tanggal dicek, {failures} beda")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
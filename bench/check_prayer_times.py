@@ -0,0 +1,107 @@
+"""
+Validasi hitungan lokal (components/prayer_calc.py) terhadap Aladhan API.
+
+Set referensi: semua kota di data/kota.json × semua metode di
+waktu_sholat.METHODS × mazhab Asar (0/1) × beberapa tanggal sepanjang tahun.
+Selisih tiap waktu harus ≤ 1 menit; script exit 1 kalau ada yang melewati.
+Ditambah lokasi lintang tinggi (~65°LU, titik balik Juni) untuk aturan
+ANGLE_BASED, dan cek offline siang/malam kutub: tidak boleh crash, waktu
+yang tak ada harus "-".
+
+    python bench/check_prayer_times.py                 # set penuh (banyak request)
+    python bench/check_prayer_times.py --quick         # 6 kota, 2 tanggal
+"""
+import argparse
+import datetime as dt
+import json
+import sys
+import time
+from pathlib import Path
+
+import requests
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from components.prayer_calc import compute_timings  # noqa: E402
+
+ALADHAN = "https://api.aladhan.com/v1/timings"
+KEYS = ["Imsak", "Fajr", "Sunrise", "Dhuhr", "Asr", "Sunset", "Maghrib", "Isha", "Midnight"]
+METHOD_IDS = [12, 20, 2, 4, 5]  # = nilai di waktu_sholat.METHODS
+DATES = [dt.date(2026, 1, 15), dt.date(2026, 3, 20), dt.date(2026, 6, 21),
+         dt.date(2026, 9, 23), dt.date(2026, 12, 21)]
+# Subuh/Isya tak tercapai (dibatasi ANGLE_BASED), tapi matahari masih terbenam
+HIGH_LAT = [{"kota": "Oulu", "lat": 65.0121, "lon": 25.4651, "tz": "Europe/Helsinki"}]
+HIGH_LAT_DATES = [dt.date(2026, 6, 21)]
+# (lat, lon, tz, tanggal, waktu yang harus "-")
+POLAR = [
+    (69.65, 18.96, "Europe/Oslo", dt.date(2026, 6, 21),
+     {"Fajr", "Sunrise", "Sunset", "Maghrib", "Isha", "Imsak", "Midnight"}),
+    (69.65, 18.96, "Europe/Oslo", dt.date(2026, 12, 21), {"Sunrise", "Asr", "Sunset", "Maghrib", "Midnight"}),
+]
+
+def _minutes(hhmm: str) -> int:
+    h, m = hhmm.split(" ")[0].split(":")[:2]
+    return int(h) * 60 + int(m)
+
+def _diff(a: str, b: str) -> int:
+    d = abs(_minutes(a) - _minutes(b))
+    return min(d, 1440 - d)
+
+def check_polar() -> int:
+    """Siang/malam kutub: tanpa crash, waktu yang tak ada = "-" (offline)."""
+    failures = 0
+    for lat, lon, tz, day, missing in POLAR:
+        timings = compute_timings(lat, lon, tz, day)["timings"]
+        got = {k for k, v in timings.items() if v == "-"}
+        if got != missing:
+            failures += 1
+            print(f"✗ kutub {lat},{lon} {day}: '-' di {sorted(got)}, seharusnya {sorted(missing)}")
+    return failures
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--quick", action="store_true")
+    ap.add_argument("--tolerance", type=int, default=1, help="menit")
+    args = ap.parse_args()
+
+    with open(ROOT / "data" / "kota.json", encoding="utf-8") as f:
+        kota = json.load(f)
+    dates = DATES
+    if args.quick:
+        kota = [k for k in kota if k["kota"] in ("Jakarta", "Palembang", "Makassar", "Jayapura", "Makkah", "London")]
+        dates = DATES[:2]
+
+    cases = [(k, dates) for k in kota] + [(k, HIGH_LAT_DATES) for k in HIGH_LAT]
+
+    session = requests.Session()
+    worst = 0
+    failures = check_polar()
+    checked = 0
+    for k, days in cases:
+        for method in METHOD_IDS:
+            for school in (0, 1):
+                for day in days:
+                    r = session.get(
+                        f"{ALADHAN}/{day.strftime('%d-%m-%Y')}",
+                        params={"latitude": k["lat"], "longitude": k["lon"], "method": method,
+                                "school": school, "timezonestring": k["tz"]},
+                        timeout=15,
+                    )
+                    r.raise_for_status()
+                    ref = r.json()["data"]["timings"]
+                    local = compute_timings(k["lat"], k["lon"], k["tz"], day, method=method, school=school)["timings"]
+                    for key in KEYS:
+                        d = _diff(local[key], ref[key])
+                        worst = max(worst, d)
+                        checked += 1
+                        if d > args.tolerance:
+                            failures += 1
+                            print(f"✗ {k['kota']} m{method} s{school} {day} {key}: lokal {local[key]} vs API {ref[key]}")
+                    time.sleep(0.1)  # sopan ke API publik
+
+    print(f"{checked} waktu dicek, selisih maks {worst} menit, {failures} melewati toleransi {args.tolerance} menit")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Benchmark latensi build kalender setahun lewat jalur API (event.build_hijri_year_calendar).
+
+Menjalankan server Aladhan tiruan di localhost (jawaban dari components/hijri.py)
+dengan delay buatan per request, lalu membandingkan fetch berurutan (1 worker)
+vs thread pool terbatas. Opsi --missing membuat sebagian bulan 404 supaya
+jalur fallback hToG per hari ikut teruji.
+
+    python bench/hijri_year_fetch.py                         # delay 200 ms
+    python bench/hijri_year_fetch.py --delay 0.5 --missing 3 --workers 1 4 8
+"""
+import argparse
+import datetime as dt
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+os.environ["ISLAMICHAT_HIJRI_SOURCE"] = "api"
+os.environ["ISLAMICHAT_CACHE_BACKEND"] = "memory"  # jangan simpan jawaban mock ke cache disk
+
+from components import event  # noqa: E402
+from components.hijri import hijri_payload, hijri_to_gregorian, month_calendar  # noqa: E402
+
+
+# di luar `streamlit run`, cache/st.* mencatat warning "missing ScriptRunContext" per panggilan
+logging.disable(logging.WARNING)
+
+_CAL = re.compile(r"^/v1/hToGCalendar/(\d+)/(\d+)$")
+
+class MockAladhan(BaseHTTPRequestHandler):
+    delay = 0.2
+    missing = set()
+    calls = 0
+    _lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, code: int, body: dict):
+        raw = json.dumps(body).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def do_GET(self):
+        with MockAladhan._lock:
+            MockAladhan.calls += 1
+        time.sleep(self.delay)
+        url = urlparse(self.path)
+        m = _CAL.match(url.path)
+        if m:
+            y, mo = int(m.group(1)), int(m.group(2))
+            if mo in self.missing:
+                return self._send(404, {"code": 404, "data": "Not found"})
+            return self._send(200, {"code": 200, "data": month_calendar(y, mo)})
+        if url.path == "/v1/hToG":
+            dd, mm, yyyy = (int(x) for x in parse_qs(url.query)["date"][0].split("-"))
+            try:
+                g = hijri_to_gregorian(yyyy, mm, dd)
+            except ValueError:
+                return self._send(400, {"code": 400, "data": "Invalid date"})
+            return self._send(200, {"code": 200, "data": hijri_payload(g)})
+        if url.path == "/v1/gToH":
+            dd, mm, yyyy = (int(x) for x in parse_qs(url.query)["date"][0].split("-"))
+            return self._send(200, {"code": 200, "data": hijri_payload(dt.date(yyyy, mm, dd))})
+        self._send(404, {"code": 404, "data": "Not found"})
+
+def _clear_caches():
+    for fn in (event._api_h_to_g_calendar, event._api_h_to_g_single, event._api_g_to_h,
+               event.build_hijri_year_calendar):
+        fn.clear()
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--delay", type=float, default=0.2, help="detik per request")
+    ap.add_argument("--missing", type=int, default=0, help="jumlah bulan yang dibuat 404")
+    ap.add_argument("--workers", type=int, nargs="+", default=[1, 4, 6, 12])
+    ap.add_argument("--year", type=int, default=1448)
+    ap.add_argument("-n", "--runs", type=int, default=3)
+    args = ap.parse_args()
+
+    MockAladhan.delay = args.delay
+    MockAladhan.missing = set(range(1, args.missing + 1))
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockAladhan)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    event.API_BASE = f"http://127.0.0.1:{server.server_port}/v1"
+
+    print(f"mock Aladhan delay {args.delay * 1000:.0f} ms, {args.missing} bulan 404, tahun {args.year} H")
+    print(f"{'workers':>8} {'median s':>9} {'min s':>7} {'req/build':>10} {'baris':>6}")
+    for w in args.workers:
+        event.API_MAX_WORKERS = w
+        secs, rows = [], []
+        for _ in range(args.runs):
+            _clear_caches()
+            MockAladhan.calls = 0
+            t = time.perf_counter()
+            rows = event.build_hijri_year_calendar(args.year, True, True)
+            secs.append(time.perf_counter() - t)
+        secs.sort()
+        print(f"{w:>8} {secs[len(secs) // 2]:>9.2f} {secs[0]:>7.2f} {MockAladhan.calls:>10} {len(rows):>6}")
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
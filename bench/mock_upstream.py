@@ -0,0 +1,270 @@
+"""
+Mock upstream lokal untuk benchmark: meniru equran.id, api.aladhan.com,
+Overpass, Nominatim, GoldAPI, mp3quran & open.er-api dari fixture rekaman.
+
+Aplikasi diarahkan ke sini lewat ISLAMICHAT_UPSTREAM_OVERRIDE (components/
+http_client.py): https://equran.id/api/v2/surat → <mock>/equran.id/api/v2/surat.
+
+Fixture: bench/fixtures/<host>.json = list entri
+    {"method": "GET", "path": "<regex fullmatch>", "query": {opsional, subset},
+     "status": 200, "headers": {...}, "body": <JSON | string>}
+atau {"same_as": "<host lain>"} untuk host cermin (mis. dua endpoint Overpass).
+Entri pertama yang cocok dipakai; tak ada yang cocok → 404 (atau direkam, lihat --record).
+
+Perilaku buruk bisa diatur, global atau per host (HOST=NILAI):
+    --latency 80 --latency overpass-api.de=1500     # ms (± --jitter)
+    --error-rate 0.05                               # fraksi 503
+    --rate-429 0.1                                  # fraksi 429 + Retry-After
+
+    python bench/mock_upstream.py --port 8999 --latency 50
+    python bench/mock_upstream.py --record          # miss → ambil dari upstream asli & simpan
+
+Endpoint kontrol: GET /__mock/stats (hitungan per host/status), POST /__mock/reset.
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+def _per_host(values: List[str], cast=float) -> Dict[str, float]:
+    """["80", "overpass-api.de=1500"] → {"*": 80, "overpass-api.de": 1500}."""
+    out: Dict[str, float] = {}
+    for v in values or []:
+        host, _, val = v.rpartition("=")
+        out[host or "*"] = cast(val)
+    return out
+
+class Profile:
+    """Latensi & kegagalan buatan per host."""
+
+    def __init__(self, latency_ms: Optional[Dict[str, float]] = None, jitter: float = 0.2,
+                 error_rate: Optional[Dict[str, float]] = None, rate_429: Optional[Dict[str, float]] = None,
+                 seed: Optional[int] = 1):
+        self.latency_ms = latency_ms or {}
+        self.jitter = jitter
+        self.error_rate = error_rate or {}
+        self.rate_429 = rate_429 or {}
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _get(table: Dict[str, float], host: str) -> float:
+        return table.get(host, table.get("*", 0.0))
+
+    def draw(self, host: str) -> Tuple[float, Optional[int]]:
+        """(detik tunda, status paksa atau None)."""
+        with self.lock:
+            base = self._get(self.latency_ms, host) / 1000
+            delay = base * (1 + self.rng.uniform(-self.jitter, self.jitter)) if base else 0.0
+            r = self.rng.random()
+        if r < self._get(self.rate_429, host):
+            return delay, 429
+        if r < self._get(self.rate_429, host) + self._get(self.error_rate, host):
+            return delay, 503
+        return delay, None
+
+class Fixtures:
+    def __init__(self, root: Path = FIXTURES_DIR, record: bool = False):
+        self.root = Path(root)
+        self.record = record
+        self._cache: Dict[str, List[Dict[str, Any]]] = {}
+        self.lock = threading.Lock()
+
+    def _path(self, host: str) -> Path:
+        return self.root / f"{host}.json"
+
+    def entries(self, host: str) -> List[Dict[str, Any]]:
+        with self.lock:
+            if host in self._cache:
+                return self._cache[host]
+        p = self._path(host)
+        raw = json.loads(p.read_text(encoding="utf-8")) if p.exists() else []
+        if isinstance(raw, dict) and "same_as" in raw:
+            entries = self.entries(raw["same_as"])
+        else:
+            for e in raw:
+                e["_re"] = re.compile(e["path"])
+            entries = raw
+        with self.lock:
+            return self._cache.setdefault(host, entries)
+
+    def match(self, host: str, method: str, path: str, query: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        for e in self.entries(host):
+            if e.get("method", "GET") not in (method, "*") and not (method == "HEAD" and e.get("method", "GET") == "GET"):
+                continue
+            if not e["_re"].fullmatch(path):
+                continue
+            if any(query.get(k) != str(v) for k, v in (e.get("query") or {}).items()):
+                continue
+            return e
+        return None
+
+    def record_live(self, host: str, method: str, path: str, query: str, body: bytes,
+                    headers: Dict[str, str]) -> Dict[str, Any]:
+        """Ambil dari upstream asli lalu tambahkan ke file fixture host itu."""
+        import requests
+
+        url = f"https://{host}{path}" + (f"?{query}" if query else "")
+        r = requests.request(method, url, data=body or None, timeout=30,
+                             headers={k: v for k, v in headers.items() if k.lower() in ("content-type", "x-access-token")})
+        try:
+            payload: Any = r.json()
+        except ValueError:
+            payload = r.text
+        entry = {"method": method, "path": re.escape(path), "status": r.status_code, "body": payload}
+        with self.lock:
+            p = self._path(host)
+            raw = json.loads(p.read_text(encoding="utf-8")) if p.exists() else []
+            raw.append(entry)
+            p.write_text(json.dumps(raw, ensure_ascii=False, indent=1), encoding="utf-8")
+            self._cache.pop(host, None)
+        return {**entry, "_re": re.compile(entry["path"])}
+
+class Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self.lock:
+            self.total = 0
+            self.by_host: Dict[str, int] = {}
+            self.by_status: Dict[str, int] = {}
+            self.bytes_out = 0
+
+    def add(self, host: str, status: int, n: int) -> None:
+        with self.lock:
+            self.total += 1
+            self.by_host[host] = self.by_host.get(host, 0) + 1
+            self.by_status[str(status)] = self.by_status.get(str(status), 0) + 1
+            self.bytes_out += n
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self.lock:
+            return {"total": self.total, "by_host": dict(self.by_host),
+                    "by_status": dict(self.by_status), "bytes": self.bytes_out}
+
+class MockUpstream(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, addr: Tuple[str, int], fixtures: Fixtures, profile: Profile):
+        super().__init__(addr, _Handler)
+        self.fixtures = fixtures
+        self.profile = profile
+        self.stats = Stats()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start_background(self) -> "MockUpstream":
+        threading.Thread(target=self.serve_forever, name="mock-upstream", daemon=True).start()
+        return self
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, sama seperti upstream asli
+    server: MockUpstream
+
+    def log_message(self, fmt: str, *args: Any) -> None:
+        pass
+
+    def _send(self, status: int, body: bytes, ctype: str = "application/json; charset=utf-8",
+              headers: Optional[Dict[str, str]] = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _control(self, path: str) -> None:
+        if path == "/__mock/stats":
+            self._send(200, json.dumps(self.server.stats.snapshot()).encode())
+        elif path == "/__mock/reset":
+            self.server.stats.reset()
+            self._send(200, b'{"ok":true}')
+        else:
+            self._send(404, b'{"error":"unknown control endpoint"}')
+
+    def _handle(self) -> None:
+        parts = urlsplit(self.path)
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        if parts.path.startswith("/__mock/"):
+            return self._control(parts.path)
+        host, _, rest = parts.path.lstrip("/").partition("/")
+        path = "/" + rest
+        srv = self.server
+
+        delay, forced = srv.profile.draw(host)
+        if delay:
+            time.sleep(delay)
+        if forced == 429:
+            out = b'{"error":"Too Many Requests"}'
+            self._send(429, out, headers={"Retry-After": "1"})
+        elif forced:
+            out = b'{"error":"Service Unavailable (mock)"}'
+            self._send(forced, out)
+        else:
+            entry = srv.fixtures.match(host, self.command, path, dict(parse_qsl(parts.query)))
+            if entry is None and srv.fixtures.record:
+                entry = srv.fixtures.record_live(host, self.command, path, parts.query, body, dict(self.headers))
+            if entry is None:
+                forced = 404
+                out = json.dumps({"error": f"tidak ada fixture untuk {self.command} {host}{path}"}).encode()
+                self._send(404, out)
+            else:
+                payload = entry["body"]
+                if isinstance(payload, str):
+                    out, ctype = payload.encode("utf-8"), entry.get("content_type", "text/plain; charset=utf-8")
+                else:
+                    out, ctype = json.dumps(payload, ensure_ascii=False).encode("utf-8"), "application/json; charset=utf-8"
+                forced = int(entry.get("status", 200))
+                self._send(forced, out, ctype, entry.get("headers"))
+        srv.stats.add(host, forced, len(out))
+
+    do_GET = do_POST = do_HEAD = _handle
+
+def add_profile_args(ap: argparse.ArgumentParser) -> None:
+    ap.add_argument("--latency", action="append", default=[], metavar="[HOST=]MS")
+    ap.add_argument("--jitter", type=float, default=0.2, help="fraksi ± latensi (default 0.2)")
+    ap.add_argument("--error-rate", action="append", default=[], metavar="[HOST=]FRAKSI")
+    ap.add_argument("--rate-429", action="append", default=[], metavar="[HOST=]FRAKSI")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--record", action="store_true", help="fixture hilang → ambil dari upstream asli & simpan")
+
+def profile_from_args(args: argparse.Namespace) -> Profile:
+    return Profile(_per_host(args.latency), args.jitter, _per_host(args.error_rate),
+                   _per_host(args.rate_429), args.seed)
+
+def start(port: int = 0, host: str = "127.0.0.1", profile: Optional[Profile] = None,
+          fixtures: Optional[Fixtures] = None) -> MockUpstream:
+    """Jalankan mock di thread latar (port 0 = acak); kembalikan server-nya."""
+    return MockUpstream((host, port), fixtures or Fixtures(), profile or Profile()).start_background()
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Mock upstream dari fixture (untuk bench)")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8999)
+    ap.add_argument("--fixtures", type=Path, default=FIXTURES_DIR)
+    add_profile_args(ap)
+    args = ap.parse_args(argv)
+    srv = MockUpstream((args.host, args.port), Fixtures(args.fixtures, args.record), profile_from_args(args))
+    print(f"mock upstream di {srv.url}  →  export ISLAMICHAT_UPSTREAM_OVERRIDE={srv.url}")
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark cold-start import per modul komponen.
+
+Tiap modul di-import di proses Python baru (cold, tanpa sys.modules bersama),
+lalu diukur waktu import-nya. Baseline `streamlit` ikut diukur karena itu
+biaya minimum yang selalu dibayar (termasuk oleh ?ping=1).
+
+Pakai:
+    python bench/startup_imports.py            # semua modul, 3 putaran
+    python bench/startup_imports.py -n 5 components.masjid
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+MODULES = [
+    "streamlit",
+    "components.router",
+    "components.waktu_sholat",
+    "components.murottal",
+    "components.quran",
+    "components.zakat",
+    "components.masjid",
+    "components.event",
+    "components.khutbah_gpt",
+    "components.live_tv",
+    "components.chat_ustadz",
+    "components.tab_hafalan_audio",
+    "components.zikir",
+    "components.doa_harian",
+]
+
+# dependency berat yang seharusnya TIDAK ikut termuat oleh import modul komponen
+HEAVY = ["folium", "streamlit_folium", "geopy", "openai", "pandas", "requests"]
+
+_PROBE = r"""
+import json, sys, time
+t = time.perf_counter()
+import {mod}
+dt = time.perf_counter() - t
+print(json.dumps({{"sec": dt, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+def measure(mod: str) -> dict:
+    code = _PROBE.format(mod=mod, heavy=HEAVY)
+    # streamlit sudah di-import dulu supaya angka komponen = biaya modul itu sendiri
+    if mod != "streamlit":
+        code = "import streamlit\n" + code
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=ROOT, capture_output=True, text=True,
+        env={**os.environ, "PYTHONPATH": str(ROOT)},
+    )
+    if out.returncode != 0:
+        return {"sec": float("nan"), "heavy": [], "error": out.stderr.strip().splitlines()[-1:]}
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("modules", nargs="*", default=MODULES)
+    ap.add_argument("-n", "--runs", type=int, default=3)
+    args = ap.parse_args()
+
+    print(f"{'modul':<34} {'median ms':>10} {'min ms':>8}  heavy deps termuat")
+    print("-" * 80)
+    for mod in args.modules:
+        runs = [measure(mod) for _ in range(args.runs)]
+        secs = [r["sec"] for r in runs]
+        heavy = ", ".join(runs[-1].get("heavy") or []) or "-"
+        if runs[-1].get("error"):
+            heavy = f"ERROR: {runs[-1]['error']}"
+        print(f"{mod:<34} {statistics.median(secs) * 1000:>10.1f} {min(secs) * 1000:>8.1f}  {heavy}")
+
+if __name__ == "__main__":
+    main()
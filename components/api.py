@@ -0,0 +1,267 @@
+"""
+API JSON tanpa Streamlit di atas components/services.py (ASGI murni, tanpa framework).
+
+    GET /prayer-times?city=Jakarta[&country=Indonesia]   atau ?lat=-6.2&lon=106.8[&tz=Asia/Jakarta]
+                     [&date=2025-03-01&method=20&school=0]
+    GET /hijri/convert?date=2025-03-01   atau ?hijri=01-09-1446   [&adjust=0]
+    GET /calendar/{year}[.json|.csv|.ics][?mon_thu=1&tasua=1&only_labeled=0&adjust=0]
+    GET /quran/{surah}/{ayah}
+    GET /zakat/income?penghasilan=10000000&pengeluaran=4000000&harga_emas=1500000
+                     [&tahunan=0&nisab=1]
+    GET /health
+    GET /metrics                                          # Prometheus (components/metrics.py)
+
+Setiap respons 200 membawa ETag (sha1 body) dan Cache-Control sesuai
+endpoint; If-None-Match yang cocok → 304 tanpa body. HEAD didukung.
+Pekerjaan yang bisa blok (SQLite korpus, fallback EQuran, membangun
+kalender) dijalankan lewat asyncio.to_thread.
+
+Jalankan:
+
+    python -m components.api --port 8000            # uvicorn kalau terpasang, selain itu server bawaan
+    python -m components.api --port 8000 --cpu 0    # kunci ke satu core (untuk bench/api_load.py)
+    uvicorn components.api:app --port 8000
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+import requests
+
+from components import metrics, services
+from components.services import ServiceError
+
+JSON_TYPE = "application/json; charset=utf-8"
+CONTENT_TYPES = {"json": JSON_TYPE, "csv": "text/csv; charset=utf-8", "ics": "text/calendar; charset=utf-8"}
+MAX_AGE_TODAY = 300            # hasil bergantung "hari ini"
+MAX_AGE_FIXED = 7 * 24 * 3600  # hasil deterministik dari argumen
+_TRUE = {"1", "true", "yes", "ya", "on"}
+
+# handler(query, *path_groups) -> (body, content_type, max_age)
+Result = Tuple[bytes, str, int]
+
+def _json(obj: Any) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), allow_nan=False).encode("utf-8")
+
+def _flag(q: Dict[str, str], name: str, default: bool) -> bool:
+    return q[name].strip().lower() in _TRUE if name in q else default
+
+# ===== Handler =====
+def _prayer_times(q: Dict[str, str]) -> Result:
+    data = services.prayer_times(
+        city=q.get("city"), country=q.get("country", "Indonesia"),
+        lat=q.get("lat"), lon=q.get("lon"), tz=q.get("tz"), date=q.get("date"),
+        method=q.get("method", 20), school=q.get("school", 0),
+    )
+    return _json(data), JSON_TYPE, MAX_AGE_FIXED if q.get("date") else MAX_AGE_TODAY
+
+def _hijri_convert(q: Dict[str, str]) -> Result:
+    data = services.hijri_convert(date=q.get("date"), hijri=q.get("hijri"), adjust=q.get("adjust", 0))
+    fixed = q.get("date") or q.get("hijri")
+    return _json(data), JSON_TYPE, MAX_AGE_FIXED if fixed else MAX_AGE_TODAY
+
+def _calendar(q: Dict[str, str], year: str, ext: Optional[str]) -> Result:
+    fmt = ext or q.get("format", "json")
+    body = services.calendar_year(
+        year, fmt, mon_thu=_flag(q, "mon_thu", True), tasua=_flag(q, "tasua", True),
+        adjust=q.get("adjust", 0),
+        only_labeled=_flag(q, "only_labeled", False),
+    )
+    return body, CONTENT_TYPES[fmt], MAX_AGE_FIXED
+
+def _quran(q: Dict[str, str], surah: str, ayah: str) -> Result:
+    return _json(services.quran_ayah(surah, ayah)), JSON_TYPE, MAX_AGE_FIXED
+
+def _zakat(q: Dict[str, str]) -> Result:
+    data = services.zakat_income(
+        q.get("penghasilan", 0), q.get("pengeluaran", 0), q.get("harga_emas", 1_000_000),
+        tahunan=_flag(q, "tahunan", False), pakai_nisab=_flag(q, "nisab", True),
+    )
+    return _json(data), JSON_TYPE, 3600
+
+def _health(q: Dict[str, str]) -> Result:
+    return b'{"status":"ok"}', JSON_TYPE, 0
+
+def _metrics(q: Dict[str, str]) -> Result:
+    return metrics.prometheus_text().encode("utf-8"), "text/plain; version=0.0.4; charset=utf-8", 0
+
+# ===== Routing =====
+# (pola path, handler, blocking) — blocking=True → dijalankan di thread pool
+ROUTES: List[Tuple["re.Pattern[str]", Callable[..., Result], bool]] = [
+    (re.compile(r"/prayer-times"), _prayer_times, False),
+    (re.compile(r"/hijri/convert"), _hijri_convert, False),
+    (re.compile(r"/calendar/(-?\d+)(?:\.(json|csv|ics))?"), _calendar, True),
+    (re.compile(r"/quran/(\d+)/(\d+)"), _quran, True),
+    (re.compile(r"/zakat/income"), _zakat, False),
+    (re.compile(r"/health"), _health, False),
+    (re.compile(r"/metrics"), _metrics, False),
+]
+
+def _match(path: str) -> Tuple[Optional[Callable[..., Result]], Tuple[str, ...], bool]:
+    path = path.rstrip("/") or "/"
+    for pattern, handler, blocking in ROUTES:
+        m = pattern.fullmatch(path)
+        if m:
+            return handler, m.groups(), blocking
+    return None, (), False
+
+def etag_for(body: bytes) -> str:
+    return '"' + hashlib.sha1(body).hexdigest()[:24] + '"'
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    return any(t.strip().removeprefix("W/") == etag for t in header.split(","))
+
+async def handle(method: str, path: str, query: str, headers: Dict[str, str]) -> Tuple[int, List[Tuple[str, str]], bytes]:
+    """Proses satu request → (status, headers, body). Dipakai app ASGI."""
+    if method not in ("GET", "HEAD"):
+        return 405, [("allow", "GET, HEAD"), ("content-type", JSON_TYPE)], _json({"error": "method tidak didukung"})
+    handler, groups, blocking = _match(path)
+    if handler is None:
+        return 404, [("content-type", JSON_TYPE)], _json({"error": f"endpoint tidak ada: {path}"})
+    q = {k: v[-1] for k, v in parse_qs(query, keep_blank_values=False).items()}
+    try:
+        # span per endpoint; to_thread menyalin konteks, jadi fetcher di thread ikut tercatat
+        with metrics.span("api", handler.__name__.lstrip("_")):
+            if blocking:
+                body, ctype, max_age = await asyncio.to_thread(handler, q, *groups)
+            else:
+                body, ctype, max_age = handler(q, *groups)
+    except ServiceError as e:
+        return e.status, [("content-type", JSON_TYPE)], _json({"error": str(e)})
+    except requests.RequestException as e:
+        # fallback upstream (EQuran) gagal / circuit open
+        return 502, [("content-type", JSON_TYPE), ("retry-after", "30")], _json({"error": f"upstream: {e}"})
+
+    etag = etag_for(body)
+    out = [
+        ("etag", etag),
+        ("cache-control", f"public, max-age={max_age}" if max_age else "no-cache"),
+        ("access-control-allow-origin", "*"),
+    ]
+    inm = headers.get("if-none-match")
+    if inm and _etag_matches(inm, etag):
+        return 304, out, b""
+    return 200, out + [("content-type", ctype)], body
+
+# ===== ASGI =====
+async def app(scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+    if scope["type"] == "lifespan":
+        while True:
+            msg = await receive()
+            if msg["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif msg["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+    if scope["type"] != "http":
+        return
+    headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in scope.get("headers", [])}
+    try:
+        status, out, body = await handle(scope["method"], scope["path"],
+                                         scope.get("query_string", b"").decode("latin-1"), headers)
+    except Exception as e:
+        status, out, body = 500, [("content-type", JSON_TYPE)], _json({"error": f"{type(e).__name__}: {e}"})
+    out.append(("content-length", str(len(body))))
+    await send({"type": "http.response.start", "status": status,
+                "headers": [(k.encode("latin-1"), v.encode("latin-1")) for k, v in out]})
+    await send({"type": "http.response.body", "body": b"" if scope["method"] == "HEAD" else body})
+
+# ===== Server bawaan (tanpa uvicorn) =====
+REASONS = {200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 500: "Internal Server Error", 502: "Bad Gateway"}
+MAX_HEADER_BYTES = 16 * 1024
+KEEPALIVE_SEC = 15.0
+
+async def _serve_conn(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    """HTTP/1.1 keep-alive minimal: cukup untuk GET/HEAD tanpa body."""
+    try:
+        while True:
+            try:
+                head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), KEEPALIVE_SEC)
+            except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                return
+            lines = head.decode("latin-1").split("\r\n")
+            try:
+                method, target, version = lines[0].split(" ", 2)
+            except ValueError:
+                writer.write(b"HTTP/1.1 400 Bad Request\r\ncontent-length: 0\r\nconnection: close\r\n\r\n")
+                return
+            headers = []
+            for line in lines[1:]:
+                if ":" in line:
+                    k, v = line.split(":", 1)
+                    headers.append((k.strip().lower().encode("latin-1"), v.strip().encode("latin-1")))
+            hdict = dict(headers)
+            if int(hdict.get(b"content-length", b"0") or 0):
+                await reader.readexactly(int(hdict[b"content-length"]))  # body diabaikan (GET/HEAD saja)
+            conn = hdict.get(b"connection", b"").lower()
+            keep = conn != b"close" if version == "HTTP/1.1" else conn == b"keep-alive"
+
+            path, _, query = target.partition("?")
+            scope = {"type": "http", "method": method.upper(), "path": path,
+                     "query_string": query.encode("latin-1"), "headers": headers}
+            start: Dict[str, Any] = {}
+            chunks: List[bytes] = []
+
+            async def receive() -> Dict[str, Any]:
+                return {"type": "http.request", "body": b"", "more_body": False}
+
+            async def send(msg: Dict[str, Any]) -> None:
+                if msg["type"] == "http.response.start":
+                    start.update(msg)
+                else:
+                    chunks.append(msg.get("body", b""))
+
+            await app(scope, receive, send)
+            status = start["status"]
+            lines_out = [f"HTTP/1.1 {status} {REASONS.get(status, '')}"]
+            lines_out += [f"{k.decode('latin-1')}: {v.decode('latin-1')}" for k, v in start["headers"]]
+            lines_out.append("connection: " + ("keep-alive" if keep else "close"))
+            writer.write(("\r\n".join(lines_out) + "\r\n\r\n").encode("latin-1") + b"".join(chunks))
+            await writer.drain()
+            if not keep:
+                return
+    except (ConnectionError, asyncio.CancelledError):
+        pass
+    finally:
+        writer.close()
+
+async def serve(host: str = "127.0.0.1", port: int = 8000) -> None:
+    server = await asyncio.start_server(_serve_conn, host, port, limit=MAX_HEADER_BYTES, backlog=1024)
+    print(f"IslamiChat API (server bawaan) di http://{host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="API JSON IslamiChat (tanpa Streamlit)")
+    ap.add_argument("--host", default=os.getenv("ISLAMICHAT_API_HOST", "127.0.0.1"))
+    ap.add_argument("--port", type=int, default=int(os.getenv("ISLAMICHAT_API_PORT", "8000")))
+    ap.add_argument("--cpu", type=int, default=None, help="kunci proses ke satu core (Linux)")
+    ap.add_argument("--server", choices=["auto", "uvicorn", "builtin"], default="auto")
+    args = ap.parse_args(argv)
+
+    if args.cpu is not None and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, {args.cpu})
+    if args.server != "builtin":
+        try:
+            import uvicorn
+        except ImportError:
+            if args.server == "uvicorn":
+                raise SystemExit("uvicorn belum terpasang: pip install uvicorn")
+        else:
+            uvicorn.run(app, host=args.host, port=args.port, log_level="warning", access_log=False)
+            return
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
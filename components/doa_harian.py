@@ -1,9 +1,12 @@
-import requests
 import streamlit as st
 import base64, uuid
 from typing import Any, Dict, List, Optional
 from streamlit.components.v1 import html
 
+from components import http_client
+from components.metrics import instrument
+from components.response_cache import persistent_cache
+
 API_BASE  = "https://equran.id/api/doa"
 CACHE_TTL = 60 * 60  # 1 jam
 
@@ -49,24 +52,26 @@ def _normalize_item(x: Dict[str, Any]) -> Dict[str, Any]:
 # =========================
 # Fetchers (cached)
 # =========================
-@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+@instrument("fetch_list")
+@persistent_cache(ttl=CACHE_TTL, show_spinner=False)
 def fetch_list(grup: Optional[str] = None, tag: Optional[str] = None) -> List[Dict[str, Any]]:
     params: Dict[str, Any] = {}
     if grup: params["grup"] = grup
     if tag:  params["tag"]  = tag
 
-    r = requests.get(API_BASE, params=params, timeout=15)
+    r = http_client.get(API_BASE, params=params, timeout=15)
     r.raise_for_status()
     raw = r.json()
 
     items = _normalize_container(raw)
     return [_normalize_item(it) for it in items if isinstance(it, dict)]
 
-@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+@instrument("fetch_detail")
+@persistent_cache(ttl=CACHE_TTL, show_spinner=False)
 def fetch_detail(doa_id: str) -> Dict[str, Any]:
     if not doa_id:
         return {}
-    r = requests.get(f"{API_BASE}/{doa_id}", timeout=15)
+    r = http_client.get(f"{API_BASE}/{doa_id}", timeout=15)
     r.raise_for_status()
     raw = r.json()
 
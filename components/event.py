@@ -1,15 +1,30 @@
 import io
 import csv
-import requests
+import os
+import re
+import threading
+import time
+import unicodedata
 import streamlit as st
-from datetime import datetime, date
-from typing import Optional, List, Dict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, date, timedelta
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
 
 import math
+import numpy as np
 import pandas as pd
 import streamlit as st
 
-API_BASE = "https://api.aladhan.com/v1"
+from components import http_client
+from components.metrics import bind, instrument
+from components.response_cache import persistent_cache
+from components.hijri import (
+    MAX_YEAR, MIN_YEAR, HijriRangeError, hijri_payload, hijri_to_gregorian, month_calendar, month_length,
+)
+
+API_BASE = os.getenv("ISLAMICHAT_ALADHAN_API", "https://api.aladhan.com/v1")
+# batas request API serentak (12 bulan / ~30 hari fallback sekali jalan)
+API_MAX_WORKERS = int(os.getenv("ISLAMICHAT_API_WORKERS", "6"))
 
 def render_simple_hijri_calendar(month_len=30, first_weekday=0, event_days=None, title="Kalender Hijriah"):
     """
@@ -69,57 +84,141 @@ def _safe_fromiso(s: str) -> Optional[date]:
         except Exception:
             return None
 
-# ===================== CACHE: API =====================
-@st.cache_data(ttl=6 * 60 * 60)
-def g_to_h(date_dd_mm_yyyy: str) -> Optional[dict]:
+# ===================== KONVERSI: lokal (default) / API =====================
+# Default: konverter Umm al-Qura offline (components/hijri.py, 1300–1600 H).
+# ISLAMICHAT_HIJRI_SOURCE=api → pakai Aladhan (mis. ingin kalender HJCoSA/rukyat resmi);
+# tahun di luar cakupan tabel juga otomatis jatuh ke API.
+HIJRI_SOURCE = os.getenv("ISLAMICHAT_HIJRI_SOURCE", "local").strip().lower()
+
+def _dmy(s: str):
+    dd, mm, yyyy = (int(x) for x in s.split("-"))
+    return dd, mm, yyyy
+
+@instrument("g_to_h")
+def g_to_h(date_dd_mm_yyyy: str, adjust: int = 0) -> Optional[dict]:
     """Konversi Gregorian → Hijri (satu hari). Param harus DD-MM-YYYY."""
+    if HIJRI_SOURCE != "api":
+        try:
+            dd, mm, yyyy = _dmy(date_dd_mm_yyyy)
+            return hijri_payload(date(yyyy, mm, dd), adjust)["hijri"]
+        except (HijriRangeError, ValueError):
+            pass
     try:
-        r = requests.get(f"{API_BASE}/gToH", params={"date": date_dd_mm_yyyy}, timeout=10)
-        r.raise_for_status()
-        j = r.json()
-        if j.get("code") == 200:
-            d = j.get("data", {})
-            if "hijri" in d:
-                return d["hijri"]
-            return d
+        return _api_g_to_h(date_dd_mm_yyyy, adjust)
     except Exception as e:
         st.error(f"Gagal memuat tanggal Hijriah: {e}")
-    return None
+        return None
 
-@st.cache_data(ttl=6 * 60 * 60)
-def h_to_g_calendar(year_h: int, month_h: int) -> Optional[List[dict]]:
-    """Ambil kalender 1 bulan Hijri → list item {'hijri':..., 'gregorian':...}."""
+@instrument("h_to_g_calendar")
+def h_to_g_calendar(year_h: int, month_h: int, adjust: int = 0) -> Optional[List[dict]]:
+    """Kalender 1 bulan Hijri → list item {'hijri':..., 'gregorian':...}."""
+    if HIJRI_SOURCE != "api":
+        try:
+            return month_calendar(int(year_h), int(month_h), adjust)
+        except HijriRangeError:
+            pass
     try:
-        url = f"{API_BASE}/hToGCalendar/{year_h}/{month_h}"
-        r = requests.get(url, timeout=15)
-        if r.status_code == 404:
-            return None
-        r.raise_for_status()
-        j = r.json()
-        if j.get("code") == 200 and isinstance(j.get("data"), list):
-            return j["data"]
+        return _api_h_to_g_calendar(year_h, month_h, adjust)
     except Exception as e:
         st.warning(f"Gagal ambil kalender H{year_h}/{month_h}: {e}")
-    return None
+        return None
 
-@st.cache_data(ttl=6 * 60 * 60)
-def h_to_g_single(dd_mm_yyyy_h: str) -> Optional[dict]:
+@instrument("h_to_g_single")
+def h_to_g_single(dd_mm_yyyy_h: str, adjust: int = 0) -> Optional[dict]:
     """
     Konversi satu tanggal Hijriah (DD-MM-YYYY) ke Gregorian.
     Return: {"gregorian": {"date": "...", "weekday": {"en": ...}}, "hijri": {...}}
     """
+    if HIJRI_SOURCE != "api":
+        try:
+            dd, mm, yyyy = _dmy(dd_mm_yyyy_h)
+            return hijri_payload(hijri_to_gregorian(yyyy, mm, dd, adjust), adjust)
+        except HijriRangeError:
+            pass
+        except ValueError:
+            return None  # mis. tanggal 30 di bulan 29 hari
     try:
-        r = requests.get(f"{API_BASE}/hToG", params={"date": dd_mm_yyyy_h}, timeout=10)
-        r.raise_for_status()
-        j = r.json()
-        if j.get("code") == 200:
-            d = j.get("data", {})
-            # sebagian response sudah punya struktur g/hijri di level atas
-            if isinstance(d, dict) and "gregorian" in d and "hijri" in d:
-                return d
-            # fallback lain: kadang d langsung "date", dll — abaikan kalau tak lengkap
+        return _api_h_to_g_single(dd_mm_yyyy_h, adjust)
     except Exception:
-        pass
+        return None
+
+def _parallel_map(fn: Callable[..., Any], args_list: Sequence[tuple], max_workers: Optional[int] = None) -> List[Any]:
+    """
+    fn(*args) untuk tiap args di thread pool terbatas; hasil urut sesuai input.
+    Konteks script Streamlit ditempel ke worker supaya st.cache_data/st.warning
+    di dalam fn tetap bekerja.
+    """
+    workers = min(max_workers or API_MAX_WORKERS, len(args_list))
+    if workers <= 1:
+        return [fn(*a) for a in args_list]
+    try:
+        from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+        ctx = get_script_run_ctx()
+    except Exception:
+        ctx = None
+
+    def run(a):
+        if ctx is not None:
+            add_script_run_ctx(threading.current_thread(), ctx)
+        return fn(*a)
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="aladhan") as ex:
+        # salinan konteks per task: request di worker tetap tercatat di span pemanggil
+        futures = [ex.submit(bind(run), a) for a in args_list]
+        return [f.result() for f in futures]
+
+def _hijri_map(fn: Callable[..., Any], year_h: int, args_list: Sequence[tuple]) -> List[Any]:
+    """
+    fn(*args) untuk tahun Hijriah year_h. Konversi lokal cuma hitungan
+    mikrodetik → loop biasa; pool + konteks script hanya untuk jalur API.
+    """
+    if HIJRI_SOURCE != "api" and MIN_YEAR <= int(year_h) <= MAX_YEAR:
+        return [fn(*a) for a in args_list]
+    return _parallel_map(fn, args_list)
+
+def h_to_g_year(year_h: int, adjust: int = 0) -> List[Optional[List[dict]]]:
+    """12 bulan sekaligus; lewat API diambil paralel, urutan bulan tetap 1..12."""
+    return _hijri_map(h_to_g_calendar, year_h, [(int(year_h), m, adjust) for m in range(1, 13)])
+
+# ===================== CACHE: API =====================
+# Murni (tanpa st.*): gagal → exception, supaya revalidasi latar & warm-up
+# aman tanpa ScriptRunContext dan stale-if-error di response_cache berlaku.
+# Pesan ke pengguna ditampilkan wrapper di atas (g_to_h dkk).
+@persistent_cache(ttl=6 * 60 * 60)
+def _api_g_to_h(date_dd_mm_yyyy: str, adjust: int = 0) -> Optional[dict]:
+    r = http_client.get(f"{API_BASE}/gToH", params={"date": date_dd_mm_yyyy, "adjustment": adjust}, timeout=10)
+    r.raise_for_status()
+    j = r.json()
+    if j.get("code") == 200:
+        d = j.get("data", {})
+        if "hijri" in d:
+            return d["hijri"]
+        return d
+    return None
+
+@persistent_cache(ttl=6 * 60 * 60)
+def _api_h_to_g_calendar(year_h: int, month_h: int, adjust: int = 0) -> Optional[List[dict]]:
+    url = f"{API_BASE}/hToGCalendar/{year_h}/{month_h}"
+    r = http_client.get(url, params={"adjustment": adjust}, timeout=15)
+    if r.status_code == 404:
+        return None
+    r.raise_for_status()
+    j = r.json()
+    if j.get("code") == 200 and isinstance(j.get("data"), list):
+        return j["data"]
+    return None
+
+@persistent_cache(ttl=6 * 60 * 60)
+def _api_h_to_g_single(dd_mm_yyyy_h: str, adjust: int = 0) -> Optional[dict]:
+    r = http_client.get(f"{API_BASE}/hToG", params={"date": dd_mm_yyyy_h, "adjustment": adjust}, timeout=10)
+    r.raise_for_status()
+    j = r.json()
+    if j.get("code") == 200:
+        d = j.get("data", {})
+        # sebagian response sudah punya struktur g/hijri di level atas
+        if isinstance(d, dict) and "gregorian" in d and "hijri" in d:
+            return d
+        # fallback lain: kadang d langsung "date", dll — abaikan kalau tak lengkap
     return None
 
 # ===================== RULES =====================
@@ -144,62 +243,69 @@ FIXED_EVENTS = {
 AYYAM_AL_BID_DAYS = {13, 14, 15}
 MON_THU = {"Monday": "Puasa Senin", "Thursday": "Puasa Kamis"}
 
-from typing import List
+# ===================== LABEL ENGINE (vektor) =====================
+AYYAM_AL_BID_LABEL = "Ayyām al-Bīḍ (13–15)"
+_HIJRI_DMY = r"^\s*(\d{1,2})-(\d{1,2})-(\d{3,4})"
 
-def labels_for_day(
-    h_day: int,
-    h_month_num: int,
-    weekday_en: str,
-    include_mon_thu: bool,
-    include_tasua: bool,
-) -> List[str]:
-    labels: List[str] = []
-
-    # --- Normalisasi ---
-    try:
-        d = int(h_day)
-        m = int(h_month_num)
-    except Exception:
-        return labels  # kalau datanya aneh, jangan paksa
-
-    w = (weekday_en or "").strip()  # buang spasi
-
-    # --- Fixed events (Tasū‘ā, ‘Āsyūrā, dst) ---
-    if (d, m) in FIXED_EVENTS:
-        if include_tasua or (d, m) != (9, 1):  # (9,1)=Tasū‘ā
-            labels.append(FIXED_EVENTS[(d, m)])
-
-    # --- Ayyām al-Bīḍ (selalu tampil) ---
-    if d in AYYAM_AL_BID_DAYS:
-        labels.append("Ayyām al-Bīḍ (13–15)")
-
-    # --- Senin/Kamis (opsional) ---
-    if include_mon_thu and w in MON_THU:
-        labels.append(MON_THU[w])
+def label_events(df_in: pd.DataFrame, include_mon_thu: bool, include_tasua: bool) -> pd.DataFrame:
+    """
+    Label event untuk seluruh baris sekaligus (satu-satunya sumber aturan label).
 
-    return labels
+    Kolom yang dipakai: "hijri" (DD-MM-YYYY) dan "weekday" (nama hari Inggris);
+    h_day/h_month_num diturunkan sekali dari "hijri" bila belum ada. FIXED_EVENTS,
+    AYYAM_AL_BID_DAYS dan MON_THU diterapkan sebagai mask/map pandas, jadi
+    kalender multi-tahun cukup dilabeli satu kali. Hasil: salinan df dengan
+    kolom "labels" berisi list string (urutan: event tetap, Ayyām al-Bīḍ, Senin/Kamis).
+    """
+    if df_in is None or df_in.empty:
+        return df_in
+    df = df_in.copy()
+    parts = df["hijri"].astype(str).str.extract(_HIJRI_DMY)
+    empty = pd.Series(np.nan, index=df.index)
+    day = pd.to_numeric(df["h_day"], errors="coerce") if "h_day" in df else empty
+    month = pd.to_numeric(df["h_month_num"], errors="coerce") if "h_month_num" in df else empty
+    day = day.astype(float).fillna(pd.to_numeric(parts[0], errors="coerce"))
+    month = month.astype(float).fillna(pd.to_numeric(parts[1], errors="coerce"))
+    df["h_day"] = day.astype("Int64")
+    df["h_month_num"] = month.astype("Int64")
+
+    fixed = {m * 100 + d: label for (d, m), label in FIXED_EVENTS.items()
+             if include_tasua or (d, m) != (9, 1)}
+    key = month * 100 + day
+    col_fixed = key.map(fixed).fillna("").to_numpy(dtype=object)
+    col_bid = np.where(day.isin(AYYAM_AL_BID_DAYS).to_numpy(dtype=bool), AYYAM_AL_BID_LABEL, "")
+    if include_mon_thu and "weekday" in df:
+        col_mk = df["weekday"].astype(str).str.strip().map(MON_THU).fillna("").to_numpy(dtype=object)
+    else:
+        col_mk = np.full(len(df), "", dtype=object)
+
+    stacked = np.stack([col_fixed, col_bid.astype(object), col_mk], axis=1)
+    has = stacked != ""
+    df["labels"] = [list(row[mask]) for row, mask in zip(stacked, has)]
+    return df
 
 # ===================== BUILD KALENDER =====================
+@instrument("build_hijri_year_calendar")
 @st.cache_data(ttl=6 * 60 * 60)
-def build_hijri_year_calendar(year_h: int, include_mon_thu: bool, include_tasua: bool) -> List[Dict]:
+def build_hijri_year_calendar(year_h: int, include_mon_thu: bool, include_tasua: bool,
+                              adjust: int = 0) -> List[Dict]:
     rows: List[Dict] = []
-    for m in range(1, 13):
-        data = h_to_g_calendar(year_h, m)
+
+    def synth_days(m: int) -> List[int]:
+        # event tetap yang jatuh di bulan m + ayyam al-bid 13-15 setiap bulan
+        days = {d_fixed for (d_fixed, m_fixed) in FIXED_EVENTS if m_fixed == m}
+        return sorted(days | {13, 14, 15})
+
+    months = h_to_g_year(year_h, adjust)
+    # tanggal pengganti untuk semua bulan yang kosong, diambil paralel sekali jalan
+    keys = [f"{d:02d}-{m:02d}-{year_h}" for m, data in enumerate(months, 1) if not data for d in synth_days(m)]
+    singles = dict(zip(keys, _hijri_map(h_to_g_single, year_h, [(k, adjust) for k in keys])))
+
+    for m, data in enumerate(months, 1):
         # -------- Fallback kalau bulan ini tidak tersedia dari hToGCalendar --------
         if not data:
-            synth_days = set()
-            # event tetap yang jatuh di bulan m
-            for (d_fixed, m_fixed), _label in FIXED_EVENTS.items():
-                if m_fixed == m:
-                    synth_days.add(d_fixed)
-            # ayyam al-bid 13-15 setiap bulan
-            synth_days.update({13, 14, 15})
-
-            for d in sorted(synth_days):
-                dd = f"{d:02d}"
-                mm = f"{m:02d}"
-                yyyy = f"{year_h}"
-                payload = h_to_g_single(f"{dd}-{mm}-{yyyy}")
+            for d in synth_days(m):
+                payload = singles.get(f"{d:02d}-{m:02d}-{year_h}")
                 if not payload:
                     continue
                 g = payload.get("gregorian", {})
@@ -214,9 +320,6 @@ def build_hijri_year_calendar(year_h: int, include_mon_thu: bool, include_tasua:
                 except Exception:
                     continue
 
-                lbls = ", ".join(
-                    labels_for_day(h_day, h_month_num, w_en, include_mon_thu, include_tasua)
-                )
                 rows.append({
                     "gregorian": g_date,
                     "weekday": w_en,
@@ -224,7 +327,6 @@ def build_hijri_year_calendar(year_h: int, include_mon_thu: bool, include_tasua:
                     "h_day": h_day,
                     "h_month_num": h_month_num,
                     "h_month_en": h_month_en,
-                    "labels": lbls
                 })
             # lanjut ke bulan berikutnya
             continue
@@ -243,9 +345,6 @@ def build_hijri_year_calendar(year_h: int, include_mon_thu: bool, include_tasua:
             except Exception:
                 continue
 
-            lbls = ", ".join(
-                labels_for_day(h_day, h_month_num, w_en, include_mon_thu, include_tasua)
-            )
             rows.append({
                 "gregorian": g_date,
                 "weekday": w_en,
@@ -253,30 +352,16 @@ def build_hijri_year_calendar(year_h: int, include_mon_thu: bool, include_tasua:
                 "h_day": h_day,
                 "h_month_num": h_month_num,
                 "h_month_en": h_month_en,
-                "labels": lbls
             })
 
     rows.sort(key=lambda r: (_safe_fromiso(r["gregorian"]) or date.max))
-    return rows
-
-@st.cache_data(ttl=6 * 60 * 60)
-def h_to_g_single(dd_mm_yyyy_h: str) -> Optional[dict]:
-    """
-    Konversi satu tanggal Hijriah (DD-MM-YYYY) ke Gregorian.
-    Return: {"gregorian": {"date": "...", "weekday": {"en": ...}}, "hijri": {...}}
-    """
-    try:
-        r = requests.get(f"{API_BASE}/hToG", params={"date": dd_mm_yyyy_h}, timeout=10)
-        r.raise_for_status()
-        j = r.json()
-        if j.get("code") == 200:
-            d = j.get("data", {})
-            # sebagian response sudah punya struktur g/hijri di level atas
-            if isinstance(d, dict) and "gregorian" in d and "hijri" in d:
-                return d
-    except Exception:
-        pass
-    return None
+    if not rows:
+        return rows
+    # label sekali untuk setahun penuh
+    df = label_events(pd.DataFrame(rows), include_mon_thu, include_tasua)
+    df["labels"] = df["labels"].str.join(", ")
+    df[["h_day", "h_month_num"]] = df[["h_day", "h_month_num"]].astype(int)
+    return df.to_dict("records")
 
 # ===================== FILTER & UPCOMING =====================
 def find_upcoming(rows: List[Dict], from_g: date, limit: int = 5) -> List[Dict]:
@@ -303,56 +388,147 @@ def filter_rows(rows: List[Dict], only_labeled: bool, month_filter: Optional[int
         res = [r for r in res if r.get("labels")]
     return res
 
+# ===================== RENTANG MULTI-TAHUN =====================
+RANGE_CHUNK_DAYS = 366  # dilabeli per ±1 tahun supaya memori tetap kecil
+
+def _as_gregorian(d, adjust: int = 0) -> date:
+    """date Masehi apa adanya; tuple (tahun, bulan, hari) dianggap tanggal Hijriah."""
+    if isinstance(d, date):
+        return d
+    y, m, dd = (int(x) for x in d)
+    return hijri_to_gregorian(y, m, dd, adjust)
+
+def _day_row(g: date, adjust: int) -> Dict:
+    p = hijri_payload(g, adjust)
+    h = p["hijri"]
+    return {
+        "gregorian": g.isoformat(),
+        "weekday": p["gregorian"]["weekday"]["en"],
+        "hijri": h["date"],
+        "h_day": int(h["day"]),
+        "h_month_num": int(h["month"]["number"]),
+        "h_month_en": h["month"]["en"],
+    }
+
+def iter_calendar_range(start, end, include_mon_thu: bool = True, include_tasua: bool = True,
+                        adjust: int = 0, only_labeled: bool = False) -> Iterator[Dict]:
+    """
+    Baris kalender (bentuk sama dengan build_hijri_year_calendar) dari `start`
+    s/d `end` inklusif. start/end: date Masehi atau tuple Hijriah (y, m, d).
+    Dibangkitkan per potongan ±1 tahun (konversi offline + label_events),
+    jadi horizon 20 tahun tidak pernah dimuat utuh ke memori.
+    """
+    g, g_end = _as_gregorian(start, adjust), _as_gregorian(end, adjust)
+    while g <= g_end:
+        n = min(RANGE_CHUNK_DAYS, (g_end - g).days + 1)
+        chunk = label_events(pd.DataFrame([_day_row(g + timedelta(days=i), adjust) for i in range(n)]),
+                             include_mon_thu, include_tasua)
+        for r in chunk.to_dict("records"):
+            if only_labeled and not r["labels"]:
+                continue
+            r["labels"] = ", ".join(r["labels"])
+            r["h_day"], r["h_month_num"] = int(r["h_day"]), int(r["h_month_num"])
+            yield r
+        g += timedelta(days=n)
+
+def hijri_years_range(first_year_h: int, last_year_h: int, **kw) -> Iterator[Dict]:
+    """Semua hari dari 1 Muharram `first_year_h` s/d akhir Dzulhijjah `last_year_h`."""
+    last_day = month_length(int(last_year_h), 12)
+    return iter_calendar_range((first_year_h, 1, 1), (last_year_h, 12, last_day), **kw)
+
 # ===================== EXPORTERS =====================
-def to_csv_bytes(rows: List[Dict]) -> bytes:
+CSV_FIELDS = ["gregorian", "weekday", "hijri", "h_day", "h_month_num", "h_month_en", "labels"]
+ICS_PRODID = "-//IslamiChat//Kalender Hijriah//ID"
+
+def _labels_list(lab) -> List[str]:
+    if isinstance(lab, list):
+        return [x for x in lab if x]
+    return [x.strip() for x in str(lab or "").split(", ") if x.strip()]
+
+def iter_csv(rows: Iterable[Dict]) -> Iterator[bytes]:
+    """CSV baris demi baris (header dulu); `rows` boleh generator."""
     buf = io.StringIO()
-    writer = csv.DictWriter(buf, fieldnames=[
-        "gregorian", "weekday", "hijri", "h_day", "h_month_num", "h_month_en", "labels"
-    ])
+    writer = csv.DictWriter(buf, fieldnames=CSV_FIELDS, extrasaction="ignore")
     writer.writeheader()
     for r in rows:
-        lab = r.get("labels", [])
-        if isinstance(lab, list):
-            r_out = {**r, "labels": ", ".join(lab)}
-        else:
-            r_out = r
-        writer.writerow(r_out)
-    return buf.getvalue().encode("utf-8")
+        writer.writerow({**r, "labels": ", ".join(_labels_list(r.get("labels")))})
+        yield buf.getvalue().encode("utf-8")
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue().encode("utf-8")
+
+def _ics_escape(s: str) -> str:
+    return str(s).replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+def _ics_fold(line: str) -> str:
+    """Lipat baris > 75 oktet (RFC 5545 §3.1) tanpa memotong karakter UTF-8."""
+    out, cur, size = [], "", 0
+    for ch in line:
+        n = len(ch.encode("utf-8"))
+        if size + n > 75:
+            out.append(cur)
+            cur, size = " ", 1
+        cur += ch
+        size += n
+    out.append(cur)
+    return "\r\n".join(out)
+
+def _slug(s: str) -> str:
+    ascii_ = unicodedata.normalize("NFKD", s).encode("ascii", "ignore").decode()
+    return re.sub(r"[^a-z0-9]+", "-", ascii_.lower()).strip("-")
+
+def event_uid(hijri_dmy: str, label: str) -> str:
+    """
+    UID stabil per (tanggal Hijriah, event): tidak bergantung urutan label,
+    opsi tampilan atau penyesuaian ±1 hari, jadi kalender yang berlangganan
+    memperbarui event yang sama alih-alih menduplikasinya.
+    """
+    dd, mm, yyyy = str(hijri_dmy).split(" ")[0].split("-")
+    return f"{int(yyyy):04d}{int(mm):02d}{int(dd):02d}-{_slug(label)}@islamichat"
 
-def to_ics_bytes(rows: List[Dict]) -> bytes:
+def iter_ics(rows: Iterable[Dict], cal_name: str = "Kalender Hijriah") -> Iterator[bytes]:
     """
-    Ekspor event bertanda ke iCalendar (.ics) sebagai all-day events.
+    iCalendar all-day events (satu VEVENT per label), dialirkan per event.
+    `rows` boleh generator; hanya baris berlabel yang ditulis.
     """
-    lines = ["BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//IslamiChat//Kalender Hijriah//ID"]
+    stamp = time.strftime("%Y%m%dT%H%M%SZ", time.gmtime())
+    head = ["BEGIN:VCALENDAR", "VERSION:2.0", f"PRODID:{ICS_PRODID}", "CALSCALE:GREGORIAN",
+            f"X-WR-CALNAME:{_ics_escape(cal_name)}"]
+    yield ("\r\n".join(head) + "\r\n").encode("utf-8")
     for r in rows:
-        lab = r.get("labels")
-        if not lab:
+        labels = _labels_list(r.get("labels"))
+        if not labels:
+            continue
+        g = _safe_fromiso(_to_iso_gdate(r["gregorian"]))
+        if not g:
             continue
+        start = g.strftime("%Y%m%d")
+        end = (g + timedelta(days=1)).strftime("%Y%m%d")
+        desc = f"Hijri: {r['hijri']} ({r.get('h_month_en', '')})\nSemua label: {', '.join(labels)}"
+        for label in labels:
+            lines = [
+                "BEGIN:VEVENT",
+                f"UID:{event_uid(r['hijri'], label)}",
+                f"DTSTAMP:{stamp}",
+                f"DTSTART;VALUE=DATE:{start}",
+                f"DTEND;VALUE=DATE:{end}",
+                f"SUMMARY:{_ics_escape(label)}",
+                f"DESCRIPTION:{_ics_escape(desc)}",
+                "TRANSP:TRANSPARENT",
+                "END:VEVENT",
+            ]
+            yield ("\r\n".join(_ics_fold(x) for x in lines) + "\r\n").encode("utf-8")
+    yield b"END:VCALENDAR\r\n"
 
-        # Normalisasi labels -> string ringkas + gabungan
-        if isinstance(lab, list):
-            first_label = lab[0] if lab else ""
-            all_labels = ", ".join(lab)
-        else:  # string
-            first_label = lab.split(",")[0].strip()
-            all_labels = lab
-
-        y, m, d = _to_iso_gdate(r["gregorian"]).split("-")
-        dt = f"{y}{m}{d}"
-        summary = first_label
-        desc = f"Hijri: {r['hijri']} ({r['h_month_en']})\\nSemua label: {all_labels}"
-        uid = f"{dt}-{summary.replace(' ', '')}-{r['hijri']}"
-
-        lines += [
-            "BEGIN:VEVENT",
-            f"UID:{uid}",
-            f"DTSTART;VALUE=DATE:{dt}",
-            f"SUMMARY:{summary}",
-            f"DESCRIPTION:{desc}",
-            "END:VEVENT"
-        ]
-    lines.append("END:VCALENDAR")
-    return ("\r\n".join(lines)).encode("utf-8")
+def to_csv_bytes(rows: List[Dict]) -> bytes:
+    return b"".join(iter_csv(rows))
+
+def to_ics_bytes(rows: List[Dict]) -> bytes:
+    """
+    Ekspor event bertanda ke iCalendar (.ics) sebagai all-day events.
+    """
+    return b"".join(iter_ics(rows))
 
 # ===================== UI =====================
 def render_event():
@@ -365,10 +541,15 @@ def render_event():
     today_display = datetime.now().strftime("%Y-%m-%d")
     st.write(f"Hari ini (Masehi): `{today_display}`")
 
+    adjust = st.selectbox(
+        "Penyesuaian hari (rukyat lokal)", options=[-1, 0, 1], index=1,
+        format_func=lambda x: {-1: "−1 hari", 0: "Umm al-Qura (0)", 1: "+1 hari"}[x],
+        help="Geser tanggal Hijriah bila awal bulan di daerah Anda berbeda dari Umm al-Qura.",
+    )
     today_for_api = datetime.now().strftime("%d-%m-%Y")
-    hijri = g_to_h(today_for_api)
+    hijri = g_to_h(today_for_api, adjust)
     if not hijri:
-        st.error("Tidak bisa mendapatkan konversi Hijriah dari API.")
+        st.error("Tidak bisa mendapatkan konversi Hijriah.")
         return
 
     try:
@@ -416,32 +597,6 @@ def render_event():
             return f"{yyyy}-{mm}-{dd}"
         return s
 
-    def _parse_hijri_day(hijri_str: str):
-        try:
-            return int(str(hijri_str).split("-")[0])  # DD
-        except Exception:
-            return None
-
-    def add_event_labels(df_in: pd.DataFrame, mark_mk: bool, mark_tasua: bool) -> pd.DataFrame:
-        if df_in is None or df_in.empty:
-            return df_in
-        df2 = df_in.copy()
-        out = []
-        for _, r in df2.iterrows():
-            tags = []
-            if mark_mk:
-                wd = str(r.get("weekday", "")).strip()
-                if wd == "Monday":   tags.append("Puasa Senin")
-                if wd == "Thursday": tags.append("Puasa Kamis")
-            if mark_tasua:
-                dnum = _parse_hijri_day(r.get("hijri", ""))
-                hme  = str(r.get("h_month_en", "")).lower()
-                if dnum == 9 and hme == "muharram":
-                    tags.append("Tasū‘a (9 Muharram)")
-            out.append(tags)  # <-- LIST, bukan string
-        df2["labels"] = out
-        return df2
-
     def _to_iso(s: str) -> str:
         s = str(s)
         # "DD-MM-YYYY" -> "YYYY-MM-DD"
@@ -463,9 +618,8 @@ def render_event():
         return s
     
     rows_all = []
-    for m in range(1, 13):
-        cal = h_to_g_calendar(int(year_h), m) or []
-        for it in cal:
+    for cal in h_to_g_year(int(year_h), adjust):
+        for it in cal or []:
             g = it.get("gregorian", {})
             h = it.get("hijri", {})
             rows_all.append({
@@ -491,8 +645,8 @@ def render_event():
     rows_df["__dt"] = pd.to_datetime(rows_df["gregorian"], errors="coerce")
     rows_df = rows_df.sort_values("__dt").drop(columns="__dt")
     
-    # labelkan (Senin/Kamis, Tasū‘a)
-    rows_df = add_event_labels(rows_df, include_mon_thu, include_tasua)
+    # labelkan sekali untuk setahun (event tetap, Ayyām al-Bīḍ, Senin/Kamis)
+    rows_df = label_events(rows_df, include_mon_thu, include_tasua)
     rows_labeled = rows_df.to_dict("records")
 
     try:
@@ -512,9 +666,11 @@ def render_event():
             mm = int(view_month)
             yyyy = int(year_h)
             skeleton = []
-            for d in range(1, month_len + 1):
+            payloads = _hijri_map(
+                h_to_g_single, yyyy, [(f"{d:02d}-{mm:02d}-{yyyy}", adjust) for d in range(1, month_len + 1)]
+            )
+            for d, payload in enumerate(payloads, 1):
                 dd = f"{d:02d}"
-                payload = h_to_g_single(f"{dd}-{mm:02d}-{yyyy}")
                 if payload:
                     g = payload.get("gregorian", {}); h = payload.get("hijri", {})
                     skeleton.append({
@@ -534,15 +690,14 @@ def render_event():
                         "h_month_num": mm,
                         "labels": [],
                     })
-            filtered = skeleton
+            filtered = label_events(pd.DataFrame(skeleton), include_mon_thu, include_tasua).to_dict("records")
 
     # ===== Render tabel =====
     df = pd.DataFrame(
         filtered,
         columns=["gregorian", "weekday", "hijri", "h_month_en", "h_month_num", "labels"]
     )
-    df = add_event_labels(df, include_mon_thu, include_tasua)
-    
+
     # filter "hanya bertanda" (labels = list)
     if only_labeled:
         df = df[df["labels"].apply(lambda v: isinstance(v, list) and len(v) > 0)]
@@ -583,4 +738,50 @@ def render_event():
             use_container_width=True
         )
 
+    # ===== Ekspor rentang multi-tahun =====
+    with st.expander("📦 Ekspor rentang multi-tahun (feed ICS/CSV)"):
+        r1, r2, r3 = st.columns([1, 1, 2])
+        with r1:
+            range_start = st.number_input("Dari tahun H", value=int(year_h), step=1,
+                                          min_value=MIN_YEAR, max_value=MAX_YEAR, key="ev_range_start")
+        with r2:
+            range_years = st.number_input("Jumlah tahun", value=10, step=1, min_value=1, max_value=50,
+                                          key="ev_range_years")
+        with r3:
+            range_labeled = st.checkbox("Hanya hari bertanda", value=True, key="ev_range_labeled")
+        range_end = min(int(range_start) + int(range_years) - 1, MAX_YEAR)
+        st.caption(f"{int(range_start)}–{range_end} H · UID event stabil, jadi langganan kalender "
+                   "diperbarui tanpa duplikat.")
+
+        def _range_rows():
+            return hijri_years_range(int(range_start), range_end, include_mon_thu=include_mon_thu,
+                                     include_tasua=include_tasua, adjust=adjust, only_labeled=range_labeled)
+
+        if st.button("Siapkan file", key="ev_range_build"):
+            fname = f"kalender_hijriah_{int(range_start)}-{range_end}"
+            d1, d2 = st.columns(2)
+            d1.download_button("⬇️ CSV", data=b"".join(iter_csv(_range_rows())),
+                               file_name=f"{fname}.csv", mime="text/csv", use_container_width=True)
+            d2.download_button("📥 ICS", data=b"".join(iter_ics(_range_rows(), f"Kalender Hijriah {int(range_start)}–{range_end} H")),
+                               file_name=f"{fname}.ics", mime="text/calendar", use_container_width=True)
+
     st.caption("Catatan: kalender berdasar perhitungan (Umm al-Qura) – bisa bergeser ±1 hari dari rukyat lokal.")
+
+def main():
+    """Tulis feed langsung ke stdout: python -m components.event ics|csv 1447 1466 [--all]"""
+    import argparse
+    import sys
+    ap = argparse.ArgumentParser(description=main.__doc__)
+    ap.add_argument("fmt", choices=["ics", "csv"])
+    ap.add_argument("first_year_h", type=int)
+    ap.add_argument("last_year_h", type=int)
+    ap.add_argument("--all", action="store_true", help="sertakan hari tanpa label (CSV)")
+    ap.add_argument("--adjust", type=int, default=0, choices=[-1, 0, 1])
+    args = ap.parse_args()
+    rows = hijri_years_range(args.first_year_h, args.last_year_h, adjust=args.adjust, only_labeled=not args.all)
+    out = sys.stdout.buffer
+    for chunk in (iter_ics(rows) if args.fmt == "ics" else iter_csv(rows)):
+        out.write(chunk)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Tabel kota offline (data/kota.json) & tebakan timezone dari koordinat.
+
+Tanpa Streamlit, jadi bisa dipakai UI (waktu_sholat) maupun API JSON
+headless (services) tanpa memuat runtime Streamlit.
+
+    find_city("Palembang", "Indonesia")   → {"kota", "negara", "lat", "lon", "tz", …}
+    tz_for_coords(-2.98, 104.78)          → "Asia/Jakarta"
+"""
+import json
+import math
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Optional
+
+KOTA_PATH = Path(__file__).resolve().parents[1] / "data" / "kota.json"
+
+@lru_cache(maxsize=1)
+def _kota_index():
+    with open(KOTA_PATH, encoding="utf-8") as f:
+        rows = json.load(f)
+    return {(r["kota"].strip().lower(), r["negara"].strip().lower()): r for r in rows}
+
+def find_city(city: str, country: str) -> Optional[dict]:
+    """Koordinat & timezone kota dari tabel offline data/kota.json (None kalau tak ada)."""
+    return _kota_index().get(((city or "").strip().lower(), (country or "").strip().lower()))
+
+def all_cities() -> List[dict]:
+    """Semua baris tabel offline (untuk jadwal multi-lokasi)."""
+    return list(_kota_index().values())
+
+# ====== Zona waktu per lokasi ======
+# Batas bujur kasar WIB/WITA/WIT; cukup untuk daratan Indonesia.
+_ID_BBOX = (-11.5, 6.5, 94.5, 141.5)  # lat_min, lat_max, lon_min, lon_max
+_ID_BANDS = [(114.5, "Asia/Jakarta"), (126.0, "Asia/Makassar"), (180.0, "Asia/Jayapura")]
+_NEAREST_MAX_KM = 500
+
+def _km(lat1, lon1, lat2, lon2):
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp, dl = p2 - p1, math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 6371.0 * 2 * math.asin(math.sqrt(a))
+
+@lru_cache(maxsize=1024)
+def tz_for_coords(lat: float, lon: float) -> Optional[str]:
+    """
+    Koordinat → nama timezone tanpa jaringan: kota terdekat di data/kota.json
+    (≤ 500 km), lalu pita bujur WIB/WITA/WIT untuk wilayah Indonesia.
+    """
+    best = min(_kota_index().values(), key=lambda r: _km(lat, lon, r["lat"], r["lon"]), default=None)
+    if best and _km(lat, lon, best["lat"], best["lon"]) <= _NEAREST_MAX_KM:
+        return best["tz"]
+    lat_min, lat_max, lon_min, lon_max = _ID_BBOX
+    if lat_min <= lat <= lat_max and lon_min <= lon <= lon_max:
+        return next(tz for edge, tz in _ID_BANDS if lon < edge)
+    return None
@@ -0,0 +1,328 @@
+"""
+Geocoding alamat → kandidat (label, lat, lon) dengan sesedikit mungkin panggilan Nominatim.
+
+Urutan jawaban:
+  1. cache disk (SQLite) per query ternormalisasi — bertahan lintas restart/replika;
+  2. gazetteer lokal wilayah Indonesia (data/gazetteer.csv), hanya kalau nama
+     cocok persis: "Sekayu, Musi Banyuasin" → bagian pertama harus sama dengan
+     nama wilayah (setelah normalisasi), bagian sesudahnya utuh di rantai
+     induknya (kecamatan/kota/provinsi). Prefiks ("Palem…") hanya dipakai
+     perintah `search` — di geocode() prefiks salah kena untuk nama jalan/gedung;
+  3. Nominatim (dibatasi 1 request/detik per proses sesuai kebijakan OSM),
+     fallback bagian terakhir alamat lewat gazetteer dulu baru Nominatim.
+
+Gazetteer bawaan berhenti di tingkat kota/kabupaten: provinsi, kota di
+data/kota.json, dan beberapa kabupaten. Alamat tingkat kelurahan seperti
+"8 Ilir, Palembang" tetap ke Nominatim pada pencarian pertama (lalu dari
+cache disk), kecuali data kecamatan/kelurahan diimpor dulu dari CSV wilayah
+Kemendagri (kolom kode,nama,lat,lng — mis. dataset "wilayah" dengan koordinat):
+
+    python -m components.geocode import-wilayah wilayah.csv
+    python -m components.geocode search "sekayu, musi banyuasin"
+    python -m components.geocode stats
+
+Cache: $ISLAMICHAT_CACHE_DIR/geocode.sqlite, TTL env ISLAMICHAT_GEOCODE_TTL (default 90 hari).
+"""
+import argparse
+import csv
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from bisect import bisect_left
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from components import http_client
+from components.mosque_tiles import cache_dir
+
+ROOT = Path(__file__).resolve().parents[1]
+GAZETTEER_PATH = ROOT / "data" / "gazetteer.csv"
+GAZETTEER_FIELDS = ["nama", "tingkat", "induk", "lat", "lon"]
+TTL_SEC = int(os.getenv("ISLAMICHAT_GEOCODE_TTL", str(90 * 24 * 3600)))
+NEGATIVE_TTL_SEC = 24 * 3600  # hasil kosong disimpan sebentar saja
+NOMINATIM_MIN_DELAY = 1.0
+NOMINATIM_URL = "https://nominatim.openstreetmap.org/search"
+
+# urutan prioritas tingkat wilayah saat skor sama
+LEVELS = ["kelurahan", "desa", "kecamatan", "kota", "kabupaten", "provinsi"]
+_PREFIXES = re.compile(
+    r"^(kelurahan|kel|desa|kecamatan|kec|kota administrasi|kota adm|kota|kabupaten|kab|"
+    r"provinsi|prov|daerah istimewa)\.?\s+"
+)
+
+Candidate = Dict[str, object]  # {"label", "lat", "lon"}
+
+# ===== Normalisasi =====
+def normalize(text: str) -> str:
+    """huruf kecil, tanpa diakritik/tanda baca (koma dipertahankan), spasi tunggal."""
+    t = unicodedata.normalize("NFKD", text or "")
+    t = "".join(c for c in t if not unicodedata.combining(c)).lower()
+    t = re.sub(r"[^\w,]+", " ", t)
+    parts = [re.sub(r"\s+", " ", p).strip() for p in t.split(",")]
+    return ", ".join(p for p in parts if p)
+
+def _strip_level(part: str) -> str:
+    """'kel. 8 ilir' → '8 ilir', 'kota palembang' → 'palembang'."""
+    return _PREFIXES.sub("", part).strip()
+
+# ===== Cache disk =====
+class GeocodeCache:
+    """query ternormalisasi → daftar kandidat (JSON). Satu koneksi per thread."""
+
+    _SCHEMA = """
+    CREATE TABLE IF NOT EXISTS geocode (
+        key        TEXT PRIMARY KEY,   -- "<country>|<query ternormalisasi>"
+        fetched_at REAL NOT NULL,
+        results    TEXT NOT NULL
+    )
+    """
+
+    def __init__(self, path: Path, ttl: int = TTL_SEC):
+        self.path = Path(path)
+        self.ttl = ttl
+        self._local = threading.local()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn().execute(self._SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[List[Candidate]]:
+        row = self._conn().execute("SELECT fetched_at, results FROM geocode WHERE key=?", (key,)).fetchone()
+        if not row:
+            return None
+        results = json.loads(row[1])
+        ttl = self.ttl if results else NEGATIVE_TTL_SEC
+        return results if time.time() - row[0] < ttl else None
+
+    def put(self, key: str, results: List[Candidate]) -> None:
+        conn = self._conn()
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO geocode VALUES (?, ?, ?)",
+                         (key, time.time(), json.dumps(results, ensure_ascii=False)))
+
+    def stats(self) -> Dict[str, int]:
+        n, = self._conn().execute("SELECT COUNT(*) FROM geocode").fetchone()
+        return {"queries": n}
+
+_cache: Optional[GeocodeCache] = None
+_cache_lock = threading.Lock()
+
+def get_cache() -> Optional[GeocodeCache]:
+    """Singleton per proses; None kalau direktori cache tak bisa ditulis."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                try:
+                    _cache = GeocodeCache(cache_dir() / "geocode.sqlite")
+                except (OSError, sqlite3.Error):
+                    return None
+    return _cache
+
+# ===== Gazetteer =====
+class Gazetteer:
+    """Wilayah Indonesia, dicari dengan prefiks nama (bisect di daftar nama terurut)."""
+
+    def __init__(self, rows: List[Dict[str, str]]):
+        self.rows = rows
+        self._induk = [normalize(r["induk"]).replace(",", " ") for r in rows]
+        keyed = sorted((_strip_level(normalize(r["nama"])), i) for i, r in enumerate(rows))
+        self._names = [k for k, _ in keyed]
+        self._ids = [i for _, i in keyed]
+
+    @classmethod
+    def load(cls, path: Path = GAZETTEER_PATH) -> "Gazetteer":
+        try:
+            with open(path, encoding="utf-8", newline="") as f:
+                return cls(list(csv.DictReader(f)))
+        except OSError:
+            return cls([])
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def _exact(self, name: str) -> List[int]:
+        lo = bisect_left(self._names, name)
+        out = []
+        for pos in range(lo, len(self._names)):
+            if self._names[pos] != name:
+                break
+            out.append(self._ids[pos])
+        return out
+
+    def _prefix(self, prefix: str) -> List[int]:
+        lo = bisect_left(self._names, prefix)
+        out = []
+        for pos in range(lo, len(self._names)):
+            if not self._names[pos].startswith(prefix):
+                break
+            out.append(self._ids[pos])
+        return out
+
+    def label(self, i: int) -> str:
+        r = self.rows[i]
+        parts = [f"{r['nama']} ({r['tingkat']})"] + ([r["induk"]] if r["induk"] else [])
+        return ", ".join(parts + ["Indonesia"])
+
+    def search(self, query: str, limit: int = 5, exact: bool = False) -> List[Candidate]:
+        """
+        Bagian pertama query = prefiks nama wilayah (exact=True: nama persis);
+        bagian berikutnya (kalau ada) wajib muncul di rantai induk (exact=True:
+        sebagai kata utuh). Nama persis didahulukan, lalu tingkat terkecil.
+        """
+        parts = [_strip_level(p) for p in normalize(query).split(", ") if p]
+        if not parts or not parts[0]:
+            return []
+        head, rest = parts[0], parts[1:]
+        scored = []
+        end = r"\b" if exact else ""
+        for i in (self._exact(head) if exact else self._prefix(head)):
+            induk = self._induk[i]
+            if all(re.search(rf"\b{re.escape(p)}{end}", induk) for p in rest):
+                name = _strip_level(normalize(self.rows[i]["nama"]))
+                level = self.rows[i]["tingkat"]
+                scored.append((name != head, LEVELS.index(level) if level in LEVELS else len(LEVELS),
+                               len(name), i))
+        scored.sort()
+        return [
+            {"label": self.label(i), "lat": float(self.rows[i]["lat"]), "lon": float(self.rows[i]["lon"])}
+            for *_, i in scored[:limit]
+        ]
+
+@lru_cache(maxsize=1)
+def get_gazetteer() -> Gazetteer:
+    return Gazetteer.load()
+
+# ===== Nominatim =====
+_nominatim_lock = threading.Lock()
+_nominatim_last = 0.0
+
+def _nominatim(q: str, country_bias: Optional[str]) -> List[Candidate]:
+    """Satu query Nominatim; antre supaya ≥ 1 detik antar request dalam satu proses."""
+    global _nominatim_last
+    params = {"q": q, "format": "jsonv2", "addressdetails": 1, "limit": 5, "accept-language": "id"}
+    if country_bias:
+        params["countrycodes"] = country_bias
+
+    with _nominatim_lock:
+        wait = _nominatim_last + NOMINATIM_MIN_DELAY - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        try:
+            # retries=0: retry otomatis akan melanggar batas 1 req/detik
+            r = http_client.get(NOMINATIM_URL, params=params, timeout=10, retries=0)
+        finally:
+            _nominatim_last = time.monotonic()
+    r.raise_for_status()
+    return [{"label": x["display_name"], "lat": float(x["lat"]), "lon": float(x["lon"])} for x in r.json()]
+
+def geocode(q: str, country_bias: Optional[str] = "id") -> List[Candidate]:
+    """Kandidat lokasi untuk alamat bebas: cache disk → gazetteer → Nominatim."""
+    norm = normalize(q)
+    if not norm:
+        return []
+    key = f"{country_bias or '*'}|{norm}"
+    cache = get_cache()
+    hit = cache.get(key) if cache else None
+    if hit is not None:
+        return hit
+
+    local_ok = country_bias in (None, "id")
+    results = get_gazetteer().search(q, exact=True) if local_ok else []
+    if not results:
+        results = _nominatim(q, country_bias)
+    # fallback ke bagian paling akhir (biasanya kota) kalau kosong
+    if not results and "," in q:
+        tail = q.split(",")[-1].strip()
+        if tail:
+            results = (get_gazetteer().search(tail, exact=True) if local_ok else []) or _nominatim(tail, country_bias)
+
+    if cache:
+        try:
+            cache.put(key, results)
+        except sqlite3.Error:
+            pass  # FS read-only → tetap jawab
+    return results
+
+# ===== Import data wilayah =====
+def _level_for(code: str, nama: str) -> str:
+    depth = code.count(".") + 1
+    if depth == 1:
+        return "provinsi"
+    if depth == 2:
+        return "kota" if nama.upper().startswith("KOTA") else "kabupaten"
+    if depth == 3:
+        return "kecamatan"
+    return "kelurahan" if code.split(".")[-1].startswith("1") else "desa"
+
+def _title(nama: str) -> str:
+    nama = re.sub(r"^(KAB\.?|KABUPATEN|KOTA ADM\.?|KOTA)\s+", "", nama.strip(), flags=re.IGNORECASE)
+    return nama.title() if nama.isupper() else nama
+
+def import_wilayah(src: Path, dest: Path = GAZETTEER_PATH) -> int:
+    """
+    Gabungkan CSV wilayah berkode (kode,nama,lat,lng; kode "16.71.04.1003") ke
+    gazetteer. Rantai induk diturunkan dari prefiks kode. Baris tanpa koordinat dilewati.
+    """
+    with open(src, encoding="utf-8-sig", newline="") as f:
+        raw = [r for r in csv.DictReader(f) if r.get("kode") and r.get("nama")]
+    names = {r["kode"].strip(): _title(r["nama"]) for r in raw}
+    new = []
+    for r in raw:
+        code = r["kode"].strip()
+        lat, lon = r.get("lat"), r.get("lng") or r.get("lon")
+        if not lat or not lon:
+            continue
+        segs = code.split(".")
+        induk = [names.get(".".join(segs[:n]), "") for n in range(len(segs) - 1, 0, -1)]
+        new.append({"nama": _title(r["nama"]), "tingkat": _level_for(code, r["nama"]),
+                    "induk": ", ".join(p for p in induk if p), "lat": lat, "lon": lon})
+
+    old = Gazetteer.load(dest).rows
+    seen = {(r["nama"].lower(), r["tingkat"], r["induk"].lower()) for r in new}
+    merged = [r for r in old if (r["nama"].lower(), r["tingkat"], r["induk"].lower()) not in seen] + new
+    tmp = Path(dest).with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=GAZETTEER_FIELDS)
+        w.writeheader()
+        w.writerows(merged)
+    os.replace(tmp, dest)
+    get_gazetteer.cache_clear()
+    return len(new)
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    imp = sub.add_parser("import-wilayah", help="gabungkan CSV wilayah berkode ke gazetteer")
+    imp.add_argument("csv", type=Path)
+    s = sub.add_parser("search", help="cari di gazetteer lokal (tanpa jaringan)")
+    s.add_argument("query")
+    sub.add_parser("stats")
+    args = ap.parse_args()
+
+    if args.cmd == "import-wilayah":
+        n = import_wilayah(args.csv)
+        print(f"{n} wilayah diimpor → {GAZETTEER_PATH} (total {len(get_gazetteer())})")
+    elif args.cmd == "search":
+        t = time.perf_counter()
+        hits = get_gazetteer().search(args.query)
+        for h in hits:
+            print(f"{h['lat']:9.4f} {h['lon']:9.4f}  {h['label']}")
+        print(f"-- {len(hits)} hasil, {(time.perf_counter() - t) * 1000:.3f} ms")
+    else:
+        cache = get_cache()
+        print({"gazetteer": len(get_gazetteer()), **(cache.stats() if cache else {})})
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Konversi Masehi ↔ Hijriah offline (Umm al-Qura) — pengganti gToH/hToG/hToGCalendar.
+
+Sumber data:
+  - 1343–1500 H: tabel awal bulan resmi Umm al-Qura (data/ummalqura.json,
+    JDN awal tiap bulan; diambil dari paket hijri-converter, MIT).
+  - 1300–1342 H & 1501–1600 H: kalender tabular (aritmetika siklus 30 tahun),
+    digeser supaya menyambung mulus dengan tabel di batasnya.
+
+Semua konversi = bisect di ~3.600 bilangan bulat (JDN awal bulan), jadi satu
+tahun penuh selesai dalam hitungan mikro/milidetik tanpa jaringan.
+
+`adjust` (−1/0/+1) = koreksi rukyat lokal: +1 berarti tanggal Hijriah maju
+satu hari dibanding Umm al-Qura (sama dengan parameter `adjustment` Aladhan).
+
+Bentuk payload (`hijri_payload`, `month_calendar`) meniru respons Aladhan,
+jadi bisa langsung dipakai kode lama di components/event.py.
+
+    python -m components.hijri 2026-10-18
+    python -m components.hijri 1448-09-01
+"""
+import datetime as dt
+import json
+import sys
+from bisect import bisect_right
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+TABLE_PATH = ROOT / "data" / "ummalqura.json"
+
+MIN_YEAR = 1300
+MAX_YEAR = 1600
+
+MONTHS_EN = [
+    "Muḥarram", "Ṣafar", "Rabīʿ al-awwal", "Rabīʿ al-thānī", "Jumādá al-ūlá", "Jumādá al-ākhirah",
+    "Rajab", "Shaʿbān", "Ramaḍān", "Shawwāl", "Dhū al-Qaʿdah", "Dhū al-Ḥijjah",
+]
+MONTHS_AR = [
+    "مُحَرَّم", "صَفَر", "رَبيع الأوَّل", "رَبيع الثاني", "جُمادى الأولى", "جُمادى الآخرة",
+    "رَجَب", "شَعْبان", "رَمَضان", "شَوّال", "ذوالقعدة", "ذوالحجة",
+]
+WEEKDAYS_EN = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+WEEKDAYS_AR = ["الاثنين", "الثلاثاء", "الاربعاء", "الخميس", "الجمعة", "السبت", "الاحد"]
+G_MONTHS_EN = ["January", "February", "March", "April", "May", "June", "July",
+               "August", "September", "October", "November", "December"]
+
+_ORDINAL_TO_JDN = 1721425  # date.toordinal() + ini = Julian Day Number
+
+class HijriRangeError(ValueError):
+    """Tanggal di luar cakupan 1300–1600 H."""
+
+# ===== Tabel awal bulan =====
+def _tabular_month_start(year: int, month: int) -> int:
+    """JDN tanggal 1 bulan Hijriah menurut kalender tabular (epoch sipil 16 Juli 622)."""
+    # ceil(29.5 * (m - 1)) = 29 * (m - 1) + m // 2
+    return 29 * (month - 1) + month // 2 + (year - 1) * 354 + (3 + 11 * year) // 30 + 1948440
+
+@lru_cache(maxsize=1)
+def _month_starts() -> Tuple[int, List[int]]:
+    """
+    (tahun_awal, JDN awal bulan ke-i) untuk MIN_YEAR/1 .. MAX_YEAR/12
+    plus satu sentinel (awal MAX_YEAR+1/1).
+    """
+    with open(TABLE_PATH, encoding="utf-8") as f:
+        raw = json.load(f)
+    off = int(raw["jdn_offset"])
+    uq_first = int(raw["first_year"])
+    uq = [off + int(x) for x in raw["month_starts"]]          # termasuk sentinel
+    uq_last = uq_first + (len(uq) - 1) // 12 - 1
+
+    # tabular sebelum tabel, digeser supaya awal tahun pertama tabel sama persis
+    shift_before = uq[0] - _tabular_month_start(uq_first, 1)
+    before = [_tabular_month_start(y, m) + shift_before
+              for y in range(MIN_YEAR, uq_first) for m in range(1, 13)]
+    # tabular sesudah tabel, ditambatkan ke sentinel tabel (= awal tahun uq_last+1);
+    # lanjut dari bulan ke-2 tahun itu sampai sentinel baru (awal MAX_YEAR+1)
+    shift_after = uq[-1] - _tabular_month_start(uq_last + 1, 1)
+    n_after = 12 * (MAX_YEAR - uq_last)
+    after = [_tabular_month_start(y, m) + shift_after
+             for y in range(uq_last + 1, MAX_YEAR + 2) for m in range(1, 13)][1:n_after + 1]
+    return MIN_YEAR, before + uq + after
+
+def _index(year: int, month: int) -> int:
+    if not (MIN_YEAR <= year <= MAX_YEAR and 1 <= month <= 12):
+        raise HijriRangeError(f"Tanggal Hijriah {year}/{month} di luar {MIN_YEAR}–{MAX_YEAR} H")
+    return (year - MIN_YEAR) * 12 + (month - 1)
+
+def month_length(year: int, month: int) -> int:
+    _, starts = _month_starts()
+    i = _index(year, month)
+    return starts[i + 1] - starts[i]
+
+# ===== Konversi inti =====
+def hijri_to_jdn(year: int, month: int, day: int) -> int:
+    _, starts = _month_starts()
+    i = _index(year, month)
+    if not 1 <= day <= starts[i + 1] - starts[i]:
+        raise ValueError(f"Hari {day} tidak ada di bulan {month}/{year} H")
+    return starts[i] + day - 1
+
+def jdn_to_hijri(jdn: int) -> Tuple[int, int, int]:
+    y0, starts = _month_starts()
+    i = bisect_right(starts, jdn) - 1
+    if i < 0 or i >= len(starts) - 1:
+        raise HijriRangeError(f"JDN {jdn} di luar {MIN_YEAR}–{MAX_YEAR} H")
+    return y0 + i // 12, i % 12 + 1, jdn - starts[i] + 1
+
+def gregorian_to_hijri(g: dt.date, adjust: int = 0) -> Tuple[int, int, int]:
+    """(tahun, bulan, hari) Hijriah untuk tanggal Masehi `g`."""
+    return jdn_to_hijri(g.toordinal() + _ORDINAL_TO_JDN + int(adjust))
+
+def hijri_to_gregorian(year: int, month: int, day: int, adjust: int = 0) -> dt.date:
+    """Tanggal Masehi untuk tanggal Hijriah (y, m, d)."""
+    return dt.date.fromordinal(hijri_to_jdn(year, month, day) - _ORDINAL_TO_JDN - int(adjust))
+
+# ===== Payload bentuk Aladhan =====
+def hijri_payload(g: dt.date, adjust: int = 0) -> Dict[str, Any]:
+    """{"hijri": {...}, "gregorian": {...}} seperti `data` dari gToH/hToG Aladhan."""
+    y, m, d = gregorian_to_hijri(g, adjust)
+    wd = g.weekday()
+    return {
+        "hijri": {
+            "date": f"{d:02d}-{m:02d}-{y}",
+            "format": "DD-MM-YYYY",
+            "day": f"{d:02d}",
+            "weekday": {"en": WEEKDAYS_EN[wd], "ar": WEEKDAYS_AR[wd]},
+            "month": {"number": m, "en": MONTHS_EN[m - 1], "ar": MONTHS_AR[m - 1]},
+            "year": str(y),
+            "designation": {"abbreviated": "AH", "expanded": "Anno Hegirae"},
+        },
+        "gregorian": {
+            "date": g.strftime("%d-%m-%Y"),
+            "format": "DD-MM-YYYY",
+            "day": f"{g.day:02d}",
+            "weekday": {"en": WEEKDAYS_EN[wd]},
+            "month": {"number": g.month, "en": G_MONTHS_EN[g.month - 1]},
+            "year": str(g.year),
+        },
+    }
+
+def month_calendar(year: int, month: int, adjust: int = 0) -> List[Dict[str, Any]]:
+    """Semua hari dalam satu bulan Hijriah (pengganti hToGCalendar)."""
+    first = hijri_to_gregorian(year, month, 1, adjust)
+    return [hijri_payload(first + dt.timedelta(days=i), adjust) for i in range(month_length(year, month))]
+
+def main():
+    arg = sys.argv[1] if len(sys.argv) > 1 else dt.date.today().isoformat()
+    y, m, d = (int(x) for x in arg.split("-"))
+    if y < 1700:
+        g = hijri_to_gregorian(y, m, d)
+        print(f"{d} {MONTHS_EN[m - 1]} {y} H → {g.isoformat()} ({WEEKDAYS_EN[g.weekday()]})")
+    else:
+        hy, hm, hd = gregorian_to_hijri(dt.date(y, m, d))
+        print(f"{arg} → {hd} {MONTHS_EN[hm - 1]} {hy} H")
+
+if __name__ == "__main__":
+    main()
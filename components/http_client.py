@@ -0,0 +1,203 @@
+"""
+Klien HTTP bersama untuk semua fetcher (EQuran, Aladhan, GoldAPI, mp3quran, Overpass, Nominatim…).
+
+  - satu requests.Session per host → koneksi keep-alive dipakai ulang
+    (tanpa handshake TCP+TLS baru tiap panggilan);
+  - timeout default (connect, read) — tidak ada lagi request tanpa batas waktu;
+  - retry dengan backoff eksponensial + full jitter untuk error jaringan,
+    429 dan 5xx (hanya metode idempoten kecuali diminta); Retry-After dihormati;
+  - circuit breaker per host: setelah BREAKER_THRESHOLD kegagalan beruntun
+    host dianggap mati selama BREAKER_COOLDOWN_SEC dan panggilan langsung
+    gagal (CircuitOpenError) tanpa menunggu timeout; sesudahnya satu
+    request percobaan (half-open) menentukan host pulih atau tidak.
+
+    from components import http_client
+    r = http_client.get("https://equran.id/api/v2/surat", timeout=12)
+
+Env: ISLAMICHAT_HTTP_TIMEOUT (detik baca, default 15), ISLAMICHAT_HTTP_RETRIES (default 2),
+ISLAMICHAT_UPSTREAM_OVERRIDE (mis. http://127.0.0.1:8999 → semua request dikirim ke
+<override>/<host asli>/<path>; dipakai bench/mock_upstream.py).
+"""
+import os
+import random
+import threading
+import time
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from components import metrics
+
+USER_AGENT = "IslamiChat/1.0"
+CONNECT_TIMEOUT = 5.0
+READ_TIMEOUT = float(os.getenv("ISLAMICHAT_HTTP_TIMEOUT", "15"))
+MAX_RETRIES = int(os.getenv("ISLAMICHAT_HTTP_RETRIES", "2"))
+BACKOFF_BASE_SEC = 0.3
+BACKOFF_MAX_SEC = 4.0
+POOL_SIZE = 16  # koneksi per host (thread pool event/masjid memakai paralel)
+
+BREAKER_THRESHOLD = 5
+BREAKER_COOLDOWN_SEC = 30.0
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+IDEMPOTENT = {"GET", "HEAD", "OPTIONS"}
+
+UPSTREAM_OVERRIDE = os.getenv("ISLAMICHAT_UPSTREAM_OVERRIDE", "").rstrip("/")
+
+class CircuitOpenError(requests.ConnectionError):
+    """Host sedang dianggap mati — gagal cepat tanpa request."""
+
+# ===== Session per host =====
+_sessions: Dict[str, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+def session_for(host: str) -> requests.Session:
+    s = _sessions.get(host)
+    if s is None:
+        with _sessions_lock:
+            s = _sessions.get(host)
+            if s is None:
+                s = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE)
+                s.mount("http://", adapter)
+                s.mount("https://", adapter)
+                s.headers["User-Agent"] = USER_AGENT
+                _sessions[host] = s
+    return s
+
+# ===== Circuit breaker =====
+class _Breaker:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.fails = 0
+        self.open_until = 0.0
+        self.probing = False
+        self.ok = 0
+        self.err = 0
+        self.last_error = ""
+
+    def allow(self) -> bool:
+        with self.lock:
+            if self.fails < BREAKER_THRESHOLD:
+                return True
+            if time.monotonic() < self.open_until or self.probing:
+                return False
+            self.probing = True  # half-open: satu request percobaan
+            return True
+
+    def success(self) -> None:
+        with self.lock:
+            self.ok += 1
+            self.fails = 0
+            self.probing = False
+
+    def failure(self, err: str) -> None:
+        with self.lock:
+            self.err += 1
+            self.fails += 1
+            self.last_error = err[:200]
+            self.probing = False
+            if self.fails >= BREAKER_THRESHOLD:
+                self.open_until = time.monotonic() + BREAKER_COOLDOWN_SEC
+
+    def release(self) -> None:
+        with self.lock:
+            self.probing = False
+
+    def state(self) -> str:
+        if self.fails < BREAKER_THRESHOLD:
+            return "closed"
+        return "open" if time.monotonic() < self.open_until else "half-open"
+
+_breakers: Dict[str, _Breaker] = {}
+
+def _breaker(host: str) -> _Breaker:
+    b = _breakers.get(host)
+    if b is None:
+        with _sessions_lock:
+            b = _breakers.setdefault(host, _Breaker())
+    return b
+
+def host_stats() -> Dict[str, Dict[str, Any]]:
+    """Ringkasan per host untuk panel status."""
+    return {
+        h: {"state": b.state(), "ok": b.ok, "err": b.err, "consec_fail": b.fails, "last_error": b.last_error}
+        for h, b in list(_breakers.items())
+    }
+
+def reset() -> None:
+    """Tutup semua session & breaker (dipakai bench/test)."""
+    with _sessions_lock:
+        for s in _sessions.values():
+            s.close()
+        _sessions.clear()
+        _breakers.clear()
+
+# ===== Request =====
+def _route(url: str) -> str:
+    """URL tujuan sebenarnya: apa adanya, atau lewat mock upstream (bench)."""
+    if not UPSTREAM_OVERRIDE:
+        return url
+    parts = urlsplit(url)
+    return f"{UPSTREAM_OVERRIDE}/{parts.netloc}{parts.path}" + (f"?{parts.query}" if parts.query else "")
+
+def _backoff(attempt: int, resp: Optional[requests.Response]) -> float:
+    if resp is not None and resp.headers.get("Retry-After", "").isdigit():
+        return min(float(resp.headers["Retry-After"]), BACKOFF_MAX_SEC)
+    # full jitter: acak di [0, base·2^n]
+    return random.uniform(0, min(BACKOFF_MAX_SEC, BACKOFF_BASE_SEC * 2 ** attempt))
+
+def request(method: str, url: str, *, timeout: Any = None, retries: Optional[int] = None,
+            **kwargs) -> requests.Response:
+    """
+    Seperti requests.request, lewat session pooled milik host-nya. `timeout`
+    angka = batas baca (connect tetap CONNECT_TIMEOUT), tuple = (connect, read).
+    Status 4xx selain 429 dikembalikan apa adanya (pemanggil yang memutuskan).
+    """
+    method = method.upper()
+    host = urlsplit(url).netloc
+    url = _route(url)  # session & breaker tetap per host asli
+    if timeout is None:
+        timeout = (CONNECT_TIMEOUT, READ_TIMEOUT)
+    elif not isinstance(timeout, tuple):
+        timeout = (min(CONNECT_TIMEOUT, float(timeout)), float(timeout))
+    if retries is None:
+        retries = MAX_RETRIES if method in IDEMPOTENT else 0
+
+    breaker = _breaker(host)
+    session = session_for(host)
+    attempt = 0
+    while True:
+        if not breaker.allow():
+            raise CircuitOpenError(f"{host} sedang tidak tersedia (circuit open), coba lagi nanti")
+        resp = None
+        t = time.perf_counter()
+        try:
+            resp = session.request(method, url, timeout=timeout, **kwargs)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            metrics.note_http(host, 0, 0, (time.perf_counter() - t) * 1000)
+            breaker.failure(f"{type(e).__name__}: {e}")
+            if attempt >= retries:
+                raise
+        except requests.RequestException:
+            breaker.release()  # error sisi klien (URL/parameter), bukan tanda host mati
+            raise
+        else:
+            nbytes = 0 if kwargs.get("stream") else len(resp.content)
+            metrics.note_http(host, resp.status_code, nbytes, (time.perf_counter() - t) * 1000)
+            if resp.status_code not in RETRY_STATUS:
+                breaker.success()
+                return resp
+            breaker.failure(f"HTTP {resp.status_code}")
+            if attempt >= retries:
+                return resp
+        time.sleep(_backoff(attempt, resp))
+        attempt += 1
+
+def get(url: str, **kwargs) -> requests.Response:
+    return request("GET", url, **kwargs)
+
+def post(url: str, **kwargs) -> requests.Response:
+    return request("POST", url, **kwargs)
@@ -3,7 +3,8 @@ import os
 import textwrap
 from datetime import date
 import streamlit as st
-from openai import OpenAI  # sudah terpasang (sebelumnya sempat berhasil dipanggil)
+
+from components.metrics import instrument
 
 # ====== BANK DALIL SINGKAT (ringkas, aman untuk khutbah) ======
 QURAN = {
@@ -233,12 +234,15 @@ Kaidah:
 Tambahan dari panitia: {tambahan or '-'}
 """.strip()
 
+@instrument("generate_khutbah_gpt", cached=False)
 def generate_khutbah_gpt(jenis, tema, gaya, panjang, audience, tanggal, tambahan, model="gpt-4o-mini"):
     api_key = st.secrets.get("OPENAI_API_KEY", None) if hasattr(st, "secrets") else None
     api_key = api_key or os.getenv("OPENAI_API_KEY")
     if not api_key:
         raise RuntimeError("OPENAI_API_KEY tidak ditemukan.")
 
+    # import di sini: SDK openai cukup berat, hanya dimuat kalau mode GPT dipakai
+    from openai import OpenAI
     client = OpenAI(api_key=api_key)
     system = (
         "You are KhutbahGPT, an imam assistant that writes concise, responsible khutbah texts "
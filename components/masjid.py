@@ -1,10 +1,18 @@
+import os
+import threading
 import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
 import streamlit as st
-import requests
-import folium
-from folium.plugins import MarkerCluster
-from streamlit_folium import st_folium
-from geopy.geocoders import Nominatim
+
+from components import http_client
+from components.metrics import bind, instrument
+from components.geocode import geocode
+from components.mosque_index import NAME_REGEX, get_index, haversine_m
+from components.mosque_tiles import mosques_near
+
+# folium / streamlit_folium di-import di dalam fungsi yang memakainya,
+# supaya modul ini (mis. fetch_mosques) ringan dipakai tanpa merender peta.
 
 # ===== Overpass setup =====
 OVERPASS_ENDPOINTS = [
@@ -12,85 +20,246 @@ OVERPASS_ENDPOINTS = [
     "https://overpass-api.de/api/interpreter",
 ]
 
+# hedging: endpoint cadangan ikut ditembak kalau yang utama belum menjawab
+HEDGE_DELAY_SEC = 1.5
+OVERPASS_DEADLINE_SEC = 30
+# backoff non-blocking: endpoint yang 429/error diberi masa "dingin" dan
+# diurutkan paling belakang — script thread tidak pernah tidur
+COOLDOWN_BASE_SEC = 5
+COOLDOWN_MAX_SEC = 120
+
+def _new_stats():
+    return {"ok": 0, "err": 0, "ewma_ms": None, "consec_fail": 0, "cooldown_until": 0.0, "last_error": ""}
+
+_stats_lock = threading.Lock()
+_stats = {ep: _new_stats() for ep in OVERPASS_ENDPOINTS}
+
+# Pool dipakai bersama semua sesi. Query aktif dibatasi semaphore, dan pool
+# diberi ruang concurrency × endpoint. Request yang kalah hedge tetap memegang
+# worker sampai read timeout, jadi hedge hanya dikirim kalau ada worker
+# menganggur — tidak pernah antre di belakang worker sibuk.
+OVERPASS_CONCURRENCY = max(1, int(os.getenv("ISLAMICHAT_OVERPASS_CONCURRENCY", "4")))
+_POOL_SIZE = OVERPASS_CONCURRENCY * len(OVERPASS_ENDPOINTS)
+_pool = ThreadPoolExecutor(max_workers=_POOL_SIZE, thread_name_prefix="overpass")
+_query_slots = threading.BoundedSemaphore(OVERPASS_CONCURRENCY)
+_inflight_lock = threading.Lock()
+_inflight = 0  # request yang sedang memegang / menunggu worker pool
+
 def _run_overpass(endpoint: str, q: str):
-    return requests.post(
-        endpoint,
-        data={"data": q},
-        headers={"User-Agent": "IslamiChat/1.0"},
-        timeout=(6, 20),  # (connect, read)
-    )
+    # retries=0: hedging & cooldown per endpoint sudah diatur di sini
+    return http_client.post(endpoint, data={"data": q}, timeout=(6, 20), retries=0)
 
-def build_query(lat: float, lon: float, radius: int, lite: bool) -> str:
-    name_regex = "masjid|musholl?a|mushol?a|mus(ha)?ll?a|musala|surau|langgar|prayer.?room"
+def _submit(ep: str, q: str, hedge: bool):
+    """Kirim request ke pool; hedge ditolak (None) kalau tidak ada worker menganggur."""
+    global _inflight
+    with _inflight_lock:
+        if hedge and _inflight >= _POOL_SIZE:
+            return None
+        _inflight += 1
+    fut = _pool.submit(bind(_timed_overpass), ep, q)
+    fut.add_done_callback(_release_worker)  # juga terpanggil saat di-cancel sebelum jalan
+    return fut
+
+def _release_worker(_fut) -> None:
+    global _inflight
+    with _inflight_lock:
+        _inflight -= 1
+
+def _record(ep: str, ok: bool, ms: float, err: str = "") -> None:
+    with _stats_lock:
+        s = _stats.setdefault(ep, _new_stats())
+        if ok:
+            s["ok"] += 1
+            s["consec_fail"] = 0
+            s["cooldown_until"] = 0.0
+            s["ewma_ms"] = ms if s["ewma_ms"] is None else 0.7 * s["ewma_ms"] + 0.3 * ms
+        else:
+            s["err"] += 1
+            s["consec_fail"] += 1
+            s["last_error"] = err[:200]
+            backoff = min(COOLDOWN_BASE_SEC * 2 ** (s["consec_fail"] - 1), COOLDOWN_MAX_SEC)
+            s["cooldown_until"] = time.time() + backoff
+
+def endpoint_order():
+    """Endpoint dalam masa dingin paling belakang, lalu latensi rata-rata × (1 + rasio error)."""
+    now = time.time()
+    with _stats_lock:
+        snap = {ep: dict(_stats.get(ep, {})) for ep in OVERPASS_ENDPOINTS}
+
+    def score(ep):
+        s = snap[ep]
+        cooling = s.get("cooldown_until", 0) > now
+        n = s.get("ok", 0) + s.get("err", 0)
+        err_rate = s.get("err", 0) / n if n else 0.0
+        # belum pernah dipakai → anggap selambat ambang hedge (prior netral)
+        lat = s.get("ewma_ms") if s.get("ewma_ms") is not None else HEDGE_DELAY_SEC * 1000
+        return (cooling, lat * (1 + err_rate), OVERPASS_ENDPOINTS.index(ep))
+    return sorted(OVERPASS_ENDPOINTS, key=score)
+
+def endpoint_stats():
+    """Salinan statistik per endpoint (untuk panel status)."""
+    with _stats_lock:
+        return {ep: dict(s) for ep, s in _stats.items()}
+
+def _timed_overpass(ep: str, q: str):
+    t = time.perf_counter()
+    try:
+        r = _run_overpass(ep, q)
+        if r.status_code == 429:
+            raise RuntimeError("429 Too Many Requests")
+        r.raise_for_status()
+        elements = r.json().get("elements", [])
+    except Exception as e:
+        _record(ep, False, (time.perf_counter() - t) * 1000, str(e))
+        raise
+    _record(ep, True, (time.perf_counter() - t) * 1000)
+    return elements
+
+def _query_for_area(area: str, lite: bool) -> str:
+    """Filter masjid/musholla yang sama untuk area `around:...` maupun bbox `s,w,n,e`."""
+    name_regex = NAME_REGEX
     if lite:
         return f"""
         [out:json][timeout:20];
         (
-          node["amenity"="place_of_worship"]["religion"="muslim"](around:{radius},{lat},{lon});
-          node["amenity"="place_of_worship"]["name"~"{name_regex}", i](around:{radius},{lat},{lon});
-          node["building"="mosque"](around:{radius},{lat},{lon});
+          node["amenity"="place_of_worship"]["religion"="muslim"]({area});
+          node["amenity"="place_of_worship"]["name"~"{name_regex}", i]({area});
+          node["building"="mosque"]({area});
         );
         out center;
         """
     return f"""
     [out:json][timeout:25];
     (
-      node["amenity"="place_of_worship"]["religion"="muslim"](around:{radius},{lat},{lon});
-      way["amenity"="place_of_worship"]["religion"="muslim"](around:{radius},{lat},{lon});
-      relation["amenity"="place_of_worship"]["religion"="muslim"](around:{radius},{lat},{lon});
+      node["amenity"="place_of_worship"]["religion"="muslim"]({area});
+      way["amenity"="place_of_worship"]["religion"="muslim"]({area});
+      relation["amenity"="place_of_worship"]["religion"="muslim"]({area});
 
-      node["amenity"="place_of_worship"]["name"~"{name_regex}", i](around:{radius},{lat},{lon});
-      way["amenity"="place_of_worship"]["name"~"{name_regex}", i](around:{radius},{lat},{lon});
-      relation["amenity"="place_of_worship"]["name"~"{name_regex}", i](around:{radius},{lat},{lon});
+      node["amenity"="place_of_worship"]["name"~"{name_regex}", i]({area});
+      way["amenity"="place_of_worship"]["name"~"{name_regex}", i]({area});
+      relation["amenity"="place_of_worship"]["name"~"{name_regex}", i]({area});
 
-      node["building"="mosque"](around:{radius},{lat},{lon});
-      way["building"="mosque"](around:{radius},{lat},{lon});
+      node["building"="mosque"]({area});
+      way["building"="mosque"]({area});
     );
     out center;
     """
 
+def build_query(lat: float, lon: float, radius: int, lite: bool) -> str:
+    return _query_for_area(f"around:{radius},{lat},{lon}", lite)
+
+def build_bbox_query(bbox, lite: bool) -> str:
+    s, w, n, e = bbox
+    return _query_for_area(f"{s:.5f},{w:.5f},{n:.5f},{e:.5f}", lite)
+
+def _overpass_elements(q: str):
+    """
+    Hedged request: tembak endpoint terbaik, tambah endpoint berikutnya tiap
+    HEDGE_DELAY_SEC (atau segera bila ada yang gagal), ambil jawaban valid
+    pertama. Sisa request dibatalkan bila belum jalan, atau dibiarkan selesai
+    di background tanpa ditunggu. Maksimal OVERPASS_CONCURRENCY query jalan
+    bersamaan; hedge dilewati selama pool penuh.
+    """
+    deadline = time.monotonic() + OVERPASS_DEADLINE_SEC
+    if not _query_slots.acquire(timeout=OVERPASS_DEADLINE_SEC):
+        raise RuntimeError("Overpass gagal: terlalu banyak pencarian bersamaan, coba lagi sebentar.")
+    pending = endpoint_order()
+    running = {}
+    errors = []
+    next_hedge = 0.0
+    try:
+        while pending or running:
+            if pending and (not running or time.monotonic() >= next_hedge):
+                fut = _submit(pending[0], q, hedge=bool(running))
+                if fut is not None:
+                    running[fut] = pending.pop(0)
+                next_hedge = time.monotonic() + HEDGE_DELAY_SEC
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            timeout = min(remaining, max(next_hedge - time.monotonic(), 0)) if pending else remaining
+            done, _ = wait(list(running), timeout=timeout, return_when=FIRST_COMPLETED)
+            for fut in done:
+                ep = running.pop(fut)
+                try:
+                    return fut.result()
+                except Exception as e:
+                    errors.append(f"{ep}: {e}")
+                    next_hedge = time.monotonic()  # gagal → langsung coba endpoint berikutnya
+    finally:
+        for fut in running:
+            fut.cancel()
+        _query_slots.release()
+    raise RuntimeError("Overpass gagal: " + (" | ".join(errors[:3]) or "timeout") + " …")
+
+def fetch_mosques_bbox(bbox, lite: bool):
+    """Elemen Overpass di dalam bbox (south, west, north, east)."""
+    return _overpass_elements(build_bbox_query(bbox, lite))
+
+@instrument("fetch_mosques")
 @st.cache_data(ttl=300)
 def fetch_mosques(lat: float, lon: float, radius: int, lite: bool):
-    q = build_query(lat, lon, radius, lite)
-    last_err = []
-    for ep in OVERPASS_ENDPOINTS:
-        delay = 1.2
-        for attempt in range(2):
-            try:
-                r = _run_overpass(ep, q)
-                if r.status_code == 429:
-                    time.sleep(delay); delay *= 1.6
-                    continue
-                r.raise_for_status()
-                return r.json().get("elements", [])
-            except Exception as e:
-                last_err.append(f"{ep} try{attempt+1}: {e}")
-                time.sleep(delay); delay *= 1.6
-    raise RuntimeError("Overpass gagal: " + " | ".join(last_err[:3]) + " …")
+    """
+    Masjid dalam radius. Kalau indeks offline (components/mosque_index.py) sudah
+    dibangun, dijawab lokal urut jarak tanpa jaringan; kalau belum, dari cache
+    tile di disk (components/mosque_tiles.py) dan hanya tile yang belum ada
+    yang diambil dari Overpass.
+    """
+    idx = get_index()
+    if idx is not None:
+        return idx.within(lat, lon, radius)  # `lite` tak relevan: tanpa rate-limit
+    return mosques_near(lat, lon, radius, lite, fetch_mosques_bbox)
+
+# ===== Titik peta + jarak =====
+TABLE_TOP_N = 50
+
+# satu callback JS untuk semua titik (FastMarkerCluster): row = [lat, lon, nama, jarak_m]
+_MARKER_CALLBACK = """
+var callback = function (row) {
+    var label = document.createElement("span");
+    label.textContent = row[2] + " • " + (row[3] >= 1000 ? (row[3] / 1000).toFixed(1) + " km" : row[3] + " m");
+    var marker = L.marker(new L.LatLng(row[0], row[1]), {
+        icon: L.AwesomeMarkers.icon({icon: "info-sign", markerColor: "green", prefix: "glyphicon"})
+    });
+    marker.bindTooltip(label);
+    marker.bindPopup(label.cloneNode(true), {maxWidth: 300});
+    return marker;
+};
+"""
+
+def mosque_points(elements, lat: float, lon: float):
+    """
+    DataFrame [nama, jarak_m, lat, lon, osm] urut dari yang terdekat; jarak
+    dihitung sekali secara vektor (haversine NumPy) untuk semua elemen.
+    """
+    import numpy as np
+    import pandas as pd
+
+    rows = []
+    for el in elements:
+        lat_m = el.get("lat") or el.get("center", {}).get("lat")
+        lon_m = el.get("lon") or el.get("center", {}).get("lon")
+        if lat_m and lon_m:
+            rows.append((el.get("tags", {}).get("name") or "Masjid", float(lat_m), float(lon_m),
+                         f"https://www.openstreetmap.org/{el.get('type', 'node')}/{el.get('id')}"))
+    df = pd.DataFrame(rows, columns=["nama", "lat", "lon", "osm"])
+    dist = haversine_m(lat, lon, df["lat"].to_numpy(), df["lon"].to_numpy())
+    df.insert(1, "jarak_m", np.rint(dist).astype(np.int64))
+    return df.sort_values("jarak_m", kind="stable", ignore_index=True)
 
 # ===== Geocoding (multi kandidat + fallback) =====
+@instrument("geocode_candidates")
 @st.cache_data(ttl=3600)
 def geocode_candidates(q: str, country_bias: str | None = "id"):
-    geo = Nominatim(user_agent="islamiChat/1.0", timeout=10)
-    # coba full query
-    results = geo.geocode(
-        q, language="id", addressdetails=True, exactly_one=False, limit=5,
-        country_codes=country_bias
-    )
-    # fallback ke bagian paling akhir (biasanya kota) kalau kosong
-    if not results and "," in q:
-        tail = q.split(",")[-1].strip()
-        if tail:
-            results = geo.geocode(
-                tail, language="id", addressdetails=True, exactly_one=False, limit=5,
-                country_codes=country_bias
-            )
-    if not results:
-        return []
-    return [{"label": r.address, "lat": float(r.latitude), "lon": float(r.longitude)} for r in results]
+    """Kandidat lokasi: cache disk → gazetteer lokal → Nominatim (components/geocode.py)."""
+    return geocode(q, country_bias)
 
 # ===== UI utama =====
 def show_nearby_mosques():
+    import folium
+    from folium.plugins import FastMarkerCluster
+    from streamlit_folium import st_folium
+
     st.header("🕌 Masjid Terdekat")
 
     radius = st.slider("Radius pencarian (meter)", 300, 4000, 1500, step=100)
@@ -156,25 +325,50 @@ def show_nearby_mosques():
     folium.Marker([lat, lon], tooltip="Titik pencarian",
                   icon=folium.Icon(color="blue", icon="user")).add_to(m)
 
-    cluster = MarkerCluster(name="Masjid").add_to(m)
-    count = 0
-    for el in elements:
-        tags = el.get("tags", {})
-        name = tags.get("name") or "Masjid"
-        lat_m = el.get("lat") or el.get("center", {}).get("lat")
-        lon_m = el.get("lon") or el.get("center", {}).get("lon")
-        if lat_m and lon_m:
-            folium.Marker(
-                [lat_m, lon_m],
-                tooltip=name,
-                popup=folium.Popup(name, max_width=300),
-                icon=folium.Icon(color="green", icon="info-sign"),
-            ).add_to(cluster)
-            count += 1
+    points = mosque_points(elements, lat, lon)
+    count = len(points)
+    # satu layer berbasis data (marker dibuat di browser), bukan objek Marker+Popup per masjid
+    FastMarkerCluster(
+        points[["lat", "lon", "nama", "jarak_m"]].values.tolist(),
+        callback=_MARKER_CALLBACK, name="Masjid",
+    ).add_to(m)
 
     st.success(f"Ditemukan {count} lokasi dalam radius {radius} m.")
+    idx = get_index()
+    if idx is not None:
+        st.caption(f"Sumber: indeks OSM offline ({len(idx)} masjid, dibangun {idx.meta.get('built_at', '?')}).")
 
     # render map di kolom tengah (centered)
     left, mid, right = st.columns([1, 6, 1])
     with mid:
-        st_folium(m, width=800, height=520)
+        # returned_objects=[] → geser/zoom peta tidak memicu rerun
+        st_folium(m, width=800, height=520, returned_objects=[])
+
+    if count:
+        st.subheader(f"📍 {min(count, TABLE_TOP_N)} masjid terdekat")
+        st.dataframe(
+            points.head(TABLE_TOP_N)[["nama", "jarak_m", "osm"]],
+            hide_index=True, use_container_width=True,
+            column_config={
+                "nama": "Nama",
+                "jarak_m": st.column_config.NumberColumn("Jarak", format="%d m"),
+                "osm": st.column_config.LinkColumn("OSM", display_text="buka"),
+            },
+        )
+
+    with st.expander("Status server Overpass"):
+        now = time.time()
+        st.dataframe(
+            [
+                {
+                    "endpoint": ep.split("/")[2],
+                    "ok": s["ok"],
+                    "error": s["err"],
+                    "latensi rata2 (ms)": round(s["ewma_ms"]) if s["ewma_ms"] is not None else None,
+                    "jeda (detik)": max(0, round(s["cooldown_until"] - now)),
+                    "error terakhir": s["last_error"],
+                }
+                for ep, s in ((ep, endpoint_stats()[ep]) for ep in endpoint_order())
+            ],
+            hide_index=True, use_container_width=True,
+        )
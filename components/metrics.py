@@ -0,0 +1,429 @@
+"""
+Instrumentasi ringan: waktu render per tab, per fetcher dan per host upstream.
+
+Setiap rerun Streamlit dibungkus satu span "tab" oleh router
+(components/router.py); fetcher yang didekorasi @instrument menjadi span
+anak. Per span dicatat: wall time, cache hit/stale/miss, jumlah request
+& byte yang diterima dari upstream (dicatat components/http_client.py)
+dan error. "hit" = dijawab tanpa request upstream (cache atau data lokal).
+
+    from components.metrics import instrument
+
+    @instrument("get_surah_detail")
+    def get_surah_detail(no): ...
+
+    @instrument("run_stt", cached=False)     # panggilan yang memang tak pernah di-cache
+    def run_stt(audio_bytes): ...
+
+Keluaran:
+  - prometheus_text(): format eksposisi Prometheus; di-serve pada
+    ISLAMICHAT_METRICS_PORT (thread terpisah, path /metrics; bind ke
+    ISLAMICHAT_METRICS_HOST, default 127.0.0.1 — set 0.0.0.0 hanya kalau
+    port itu memang tak terbuka ke publik) dan di /metrics API JSON
+    (components/api.py);
+  - log JSONL berotasi, satu baris per rerun: ISLAMICHAT_METRICS_LOG=<path>
+    (ISLAMICHAT_METRICS_LOG_MB per file, default 10; 3 cadangan);
+  - tab Debug (admin saja, ?admin=<ADMIN_TOKEN>): N rerun terakhir.
+
+Env lain: ISLAMICHAT_METRICS_HISTORY (rerun yang disimpan di memori, default 200),
+ISLAMICHAT_METRICS=off mematikan semuanya.
+"""
+import contextvars
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+ENABLED = os.getenv("ISLAMICHAT_METRICS", "on").strip().lower() not in ("off", "0", "false", "no")
+HISTORY = int(os.getenv("ISLAMICHAT_METRICS_HISTORY", "200"))
+LOG_PATH = os.getenv("ISLAMICHAT_METRICS_LOG", "").strip()
+LOG_MAX_MB = float(os.getenv("ISLAMICHAT_METRICS_LOG_MB", "10"))
+LOG_BACKUPS = 3
+MAX_SPANS_PER_RERUN = 200
+# batas bucket histogram (detik)
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+CACHE_RESULTS = ("hit", "stale", "miss")
+_PASSTHROUGH = ("clear", "refresh", "age", "stats", "ttl", "name")  # atribut cache yang tetap terlihat
+
+# ===== Span =====
+class _Span:
+    __slots__ = ("kind", "name", "parent", "depth", "t0", "ms", "cached", "cache", "http", "bytes", "error", "rows")
+
+    def __init__(self, kind: str, name: str, parent: Optional["_Span"], cached: bool):
+        self.kind = kind
+        self.name = name
+        self.parent = parent
+        self.depth = parent.depth + 1 if parent else 0
+        self.t0 = time.perf_counter()
+        self.ms = 0.0
+        self.cached = cached
+        self.cache: Optional[str] = None
+        self.http = 0
+        self.bytes = 0
+        self.error = ""
+        # baris span (urut selesai) milik rerun; hanya diisi di span akar
+        self.rows: Optional[List[Dict[str, Any]]] = None if parent else []
+
+    def root(self) -> "_Span":
+        s = self
+        while s.parent is not None:
+            s = s.parent
+        return s
+
+    def row(self) -> Dict[str, Any]:
+        return {"kind": self.kind, "name": self.name, "depth": self.depth, "ms": round(self.ms, 2),
+                "cache": self.cache, "http": self.http, "bytes": self.bytes, "error": self.error}
+
+_current: contextvars.ContextVar[Optional[_Span]] = contextvars.ContextVar("islamichat_span", default=None)
+_lock = threading.Lock()
+
+# ===== Agregat =====
+def _new_agg() -> Dict[str, Any]:
+    return {"count": 0, "errors": 0, "sum": 0.0, "max": 0.0, "buckets": [0] * len(BUCKETS),
+            "hit": 0, "stale": 0, "miss": 0, "http": 0, "bytes": 0}
+
+_spans: Dict[Tuple[str, str], Dict[str, Any]] = {}
+_hosts: Dict[str, Dict[str, Any]] = {}
+_caches: Dict[Tuple[str, str], int] = {}
+_reruns: Deque[Dict[str, Any]] = deque(maxlen=HISTORY)
+
+def _observe(s: _Span) -> None:
+    sec = s.ms / 1000
+    with _lock:
+        a = _spans.setdefault((s.kind, s.name), _new_agg())
+        a["count"] += 1
+        a["sum"] += sec
+        a["max"] = max(a["max"], sec)
+        for i, le in enumerate(BUCKETS):
+            if sec <= le:
+                a["buckets"][i] += 1
+                break
+        if s.error:
+            a["errors"] += 1
+        if s.cache in CACHE_RESULTS:
+            a[s.cache] += 1
+        a["http"] += s.http
+        a["bytes"] += s.bytes
+        root = s.root()
+        if root.rows is not None and len(root.rows) < MAX_SPANS_PER_RERUN:
+            root.rows.append(s.row())
+
+@contextmanager
+def span(kind: str, name: str, cached: bool = True) -> Iterator[Optional[_Span]]:
+    """Ukur satu blok sebagai span anak dari span aktif (kalau ada)."""
+    if not ENABLED:
+        yield None
+        return
+    s = _Span(kind, name, _current.get(), cached)
+    token = _current.set(s)
+    try:
+        yield s
+    except Exception as e:
+        s.error = f"{type(e).__name__}: {e}"[:300]
+        raise
+    finally:
+        # BaseException lain (st.stop / st.rerun) bukan error
+        _current.reset(token)
+        s.ms = (time.perf_counter() - s.t0) * 1000
+        if s.cached and s.cache is None and not s.error:
+            s.cache = "miss" if s.http else "hit"
+        _observe(s)
+
+def instrument(name: Optional[str] = None, kind: str = "fetch", cached: bool = True) -> Callable:
+    """Decorator: setiap panggilan fungsi menjadi satu span `kind`/`name`."""
+    def deco(fn: Callable) -> Callable:
+        label = name or getattr(fn, "__name__", "fn")
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(kind, label, cached):
+                return fn(*args, **kwargs)
+
+        # @persistent_cache / st.cache_data: .clear, .refresh, .age tetap bisa dipakai (warm-up, tombol reload)
+        for attr in _PASSTHROUGH:
+            if hasattr(fn, attr):
+                setattr(wrapper, attr, getattr(fn, attr))
+        return wrapper
+    return deco
+
+def bind(fn: Callable) -> Callable:
+    """fn yang jalan di salinan konteks saat ini — untuk submit ke thread pool."""
+    return functools.partial(contextvars.copy_context().run, fn)
+
+# ===== Catatan dari lapisan lain =====
+def note_cache(name: str, result: str) -> None:
+    """Dipanggil CachedFunction (components/response_cache.py) per lookup."""
+    if not ENABLED:
+        return
+    s = _current.get()
+    if s is not None and s.cached:
+        # satu span bisa memanggil beberapa fungsi cache: ambil hasil terburuk
+        if s.cache is None or CACHE_RESULTS.index(result) > CACHE_RESULTS.index(s.cache):
+            s.cache = result
+    with _lock:
+        _caches[(name, result)] = _caches.get((name, result), 0) + 1
+
+def note_http(host: str, status: int, nbytes: int, ms: float) -> None:
+    """Dipanggil components/http_client.py per request (status 0 = error jaringan)."""
+    if not ENABLED:
+        return
+    s = _current.get()
+    with _lock:
+        h = _hosts.setdefault(host, {"calls": 0, "errors": 0, "bytes": 0, "sum": 0.0, "status": {}})
+        h["calls"] += 1
+        h["bytes"] += nbytes
+        h["sum"] += ms / 1000
+        h["status"][status] = h["status"].get(status, 0) + 1
+        if status == 0 or status >= 500 or status == 429:
+            h["errors"] += 1
+        while s is not None:
+            s.http += 1
+            s.bytes += nbytes
+            s = s.parent
+
+# ===== Rerun =====
+def _session_id() -> str:
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx()
+        return ctx.session_id[:8] if ctx else ""
+    except Exception:
+        return ""
+
+@contextmanager
+def rerun(tab: str) -> Iterator[None]:
+    """Bungkus body tab aktif; hasilnya masuk riwayat rerun (+ log JSONL)."""
+    if not ENABLED:
+        yield
+        return
+    t0 = time.time()
+    s: Optional[_Span] = None
+    try:
+        with span("tab", tab) as s:
+            yield
+    finally:
+        # juga saat st.stop / st.rerun / exception: rerun tetap tercatat
+        if s is not None:
+            rec = {"ts": round(t0, 3), "session": _session_id(), "tab": tab, "ms": round(s.ms, 2),
+                   "http": s.http, "bytes": s.bytes, "error": s.error, "spans": s.rows}
+            with _lock:
+                _reruns.append(rec)
+            _log(rec)
+
+def recent_reruns(n: int = 50) -> List[Dict[str, Any]]:
+    """n rerun terakhir (terbaru dulu)."""
+    with _lock:
+        return list(_reruns)[-n:][::-1]
+
+def reset() -> None:
+    with _lock:
+        _spans.clear()
+        _hosts.clear()
+        _caches.clear()
+        _reruns.clear()
+
+# ===== Log JSONL berotasi =====
+_logger: Optional[logging.Logger] = None
+
+def _log(rec: Dict[str, Any]) -> None:
+    global _logger
+    if not LOG_PATH:
+        return
+    if _logger is None:
+        from logging.handlers import RotatingFileHandler
+        os.makedirs(os.path.dirname(os.path.abspath(LOG_PATH)), exist_ok=True)
+        handler = RotatingFileHandler(LOG_PATH, maxBytes=int(LOG_MAX_MB * 1024 * 1024),
+                                      backupCount=LOG_BACKUPS, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        lg = logging.getLogger("islamichat.metrics")
+        lg.setLevel(logging.INFO)
+        lg.propagate = False
+        lg.addHandler(handler)
+        _logger = lg
+    _logger.info(json.dumps(rec, ensure_ascii=False, separators=(",", ":")))
+
+# ===== Prometheus =====
+def _esc(v: Any) -> str:
+    return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(**kw: Any) -> str:
+    return "{" + ",".join(f'{k}="{_esc(v)}"' for k, v in kw.items()) + "}"
+
+def prometheus_text() -> str:
+    """Semua metrik proses ini dalam format eksposisi teks Prometheus 0.0.4."""
+    with _lock:
+        spans = {k: {**v, "buckets": list(v["buckets"])} for k, v in _spans.items()}
+        hosts = {h: {**v, "status": dict(v["status"])} for h, v in _hosts.items()}
+        caches = dict(_caches)
+    out: List[str] = []
+
+    def head(name: str, typ: str, help_: str) -> None:
+        out.append(f"# HELP {name} {help_}")
+        out.append(f"# TYPE {name} {typ}")
+
+    head("islamichat_span_seconds", "histogram", "Wall time per tab render / fetcher call")
+    for (kind, name), a in sorted(spans.items()):
+        cum = 0
+        for le, n in zip(BUCKETS, a["buckets"]):
+            cum += n
+            out.append(f"islamichat_span_seconds_bucket{_labels(kind=kind, name=name, le=le)} {cum}")
+        out.append(f"islamichat_span_seconds_bucket{_labels(kind=kind, name=name, le='+Inf')} {a['count']}")
+        out.append(f"islamichat_span_seconds_sum{_labels(kind=kind, name=name)} {a['sum']:.6f}")
+        out.append(f"islamichat_span_seconds_count{_labels(kind=kind, name=name)} {a['count']}")
+    head("islamichat_span_errors_total", "counter", "Calls that raised an exception")
+    for (kind, name), a in sorted(spans.items()):
+        out.append(f"islamichat_span_errors_total{_labels(kind=kind, name=name)} {a['errors']}")
+    head("islamichat_span_cache_total", "counter", "Span result: hit (no upstream), stale or miss")
+    for (kind, name), a in sorted(spans.items()):
+        for r in CACHE_RESULTS:
+            if a[r]:
+                out.append(f"islamichat_span_cache_total{_labels(kind=kind, name=name, result=r)} {a[r]}")
+    head("islamichat_span_upstream_bytes_total", "counter", "Bytes received from upstream inside the span")
+    for (kind, name), a in sorted(spans.items()):
+        out.append(f"islamichat_span_upstream_bytes_total{_labels(kind=kind, name=name)} {a['bytes']}")
+    head("islamichat_cache_lookups_total", "counter", "persistent_cache lookups per function")
+    for (name, r), n in sorted(caches.items()):
+        out.append(f"islamichat_cache_lookups_total{_labels(name=name, result=r)} {n}")
+    head("islamichat_upstream_requests_total", "counter", "HTTP requests per upstream host and status (0 = network error)")
+    for h, v in sorted(hosts.items()):
+        for status, n in sorted(v["status"].items()):
+            out.append(f"islamichat_upstream_requests_total{_labels(host=h, status=status)} {n}")
+    head("islamichat_upstream_bytes_total", "counter", "Response bytes per upstream host")
+    for h, v in sorted(hosts.items()):
+        out.append(f"islamichat_upstream_bytes_total{_labels(host=h)} {v['bytes']}")
+    head("islamichat_upstream_seconds_total", "counter", "Total time spent waiting on each upstream host")
+    for h, v in sorted(hosts.items()):
+        out.append(f"islamichat_upstream_seconds_total{_labels(host=h)} {v['sum']:.6f}")
+    return "\n".join(out) + "\n"
+
+_exporter_started = False
+_exporter_lock = threading.Lock()
+
+def start_exporter() -> bool:
+    """Serve /metrics di ISLAMICHAT_METRICS_PORT (sekali per proses; tanpa env → tidak jalan)."""
+    global _exporter_started
+    port = os.getenv("ISLAMICHAT_METRICS_PORT", "").strip()
+    if not (ENABLED and port) or _exporter_started:
+        return False
+    with _exporter_lock:
+        if _exporter_started:
+            return False
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = prometheus_text().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, fmt, *args):
+                pass
+
+        try:
+            srv = ThreadingHTTPServer((os.getenv("ISLAMICHAT_METRICS_HOST", "127.0.0.1"), int(port)), _Handler)
+        except OSError:
+            return False  # port dipakai (mis. proses lain) → jangan ganggu app
+        srv.daemon_threads = True
+        threading.Thread(target=srv.serve_forever, name="metrics-exporter", daemon=True).start()
+        _exporter_started = True
+        return True
+
+# ===== Admin & tab Debug =====
+ADMIN_STATE_KEY = "__sf_admin"
+
+def _admin_token() -> str:
+    import streamlit as st
+    try:
+        token = st.secrets.get("ADMIN_TOKEN", "")
+    except Exception:  # tanpa secrets.toml
+        token = ""
+    return str(token or os.getenv("ISLAMICHAT_ADMIN_TOKEN", ""))
+
+def is_admin() -> bool:
+    """Admin = pernah membuka ?admin=<ADMIN_TOKEN> di sesi ini (token dari secrets/env)."""
+    import hmac
+
+    import streamlit as st
+    if st.session_state.get(ADMIN_STATE_KEY):
+        return True
+    token, given = _admin_token(), st.query_params.get("admin", "")
+    if token and given and hmac.compare_digest(str(given), token):
+        st.session_state[ADMIN_STATE_KEY] = True
+        return True
+    return False
+
+def _fmt_bytes(n: int) -> str:
+    return f"{n / 1024:.1f} KB" if n < 1024 * 1024 else f"{n / 1024 / 1024:.1f} MB"
+
+def render_debug_tab() -> None:
+    """N rerun terakhir + agregat per tab/fetcher/host (tab khusus admin)."""
+    import streamlit as st
+
+    if not is_admin():  # jaga-jaga kalau dipanggil langsung
+        st.error("Khusus admin.")
+        return
+    st.subheader("🛠️ Debug: rerun & upstream")
+    if not ENABLED:
+        st.info("Instrumentasi dimatikan (ISLAMICHAT_METRICS=off).")
+        return
+
+    n = st.slider("Rerun terakhir", 10, max(HISTORY, 10), min(50, max(HISTORY, 10)), step=10)
+    rows = recent_reruns(n)
+    st.dataframe(
+        [{"waktu": time.strftime("%H:%M:%S", time.localtime(r["ts"])), "sesi": r["session"], "tab": r["tab"],
+          "ms": r["ms"], "upstream": r["http"], "diterima": _fmt_bytes(r["bytes"]),
+          "span": len(r["spans"] or []), "error": r["error"]} for r in rows],
+        hide_index=True, use_container_width=True,
+    )
+    if rows:
+        idx = st.selectbox("Rincian rerun", range(len(rows)),
+                           format_func=lambda i: f"{rows[i]['tab']} • {rows[i]['ms']:.0f} ms • "
+                                                 + time.strftime("%H:%M:%S", time.localtime(rows[i]["ts"])))
+        st.dataframe(
+            [{"span": "  " * s["depth"] + s["name"], "jenis": s["kind"], "ms": s["ms"], "cache": s["cache"] or "-",
+              "upstream": s["http"], "diterima": _fmt_bytes(s["bytes"]), "error": s["error"]}
+             for s in sorted(rows[idx]["spans"] or [], key=lambda s: s["depth"])],
+            hide_index=True, use_container_width=True,
+        )
+
+    with _lock:
+        spans = {k: dict(v) for k, v in _spans.items()}
+        hosts = {h: dict(v) for h, v in _hosts.items()}
+    st.caption("Per tab / fetcher (proses ini)")
+    st.dataframe(
+        sorted(
+            [{"jenis": k[0], "nama": k[1], "panggilan": a["count"], "rata2 ms": round(a["sum"] / a["count"] * 1000, 1),
+              "maks ms": round(a["max"] * 1000, 1), "hit": a["hit"], "stale": a["stale"], "miss": a["miss"],
+              "error": a["errors"], "diterima": _fmt_bytes(a["bytes"])} for k, a in spans.items()],
+            key=lambda r: -r["rata2 ms"] * r["panggilan"],
+        ),
+        hide_index=True, use_container_width=True,
+    )
+    if hosts:
+        from components.http_client import host_stats
+        breakers = host_stats()
+        st.caption("Upstream per host")
+        st.dataframe(
+            [{"host": h, "request": v["calls"], "gagal": v["errors"], "diterima": _fmt_bytes(v["bytes"]),
+              "rata2 ms": round(v["sum"] / v["calls"] * 1000, 1) if v["calls"] else None,
+              "status": ", ".join(f"{k}×{c}" for k, c in sorted(v["status"].items())),
+              "breaker": breakers.get(h, {}).get("state", "-")} for h, v in sorted(hosts.items())],
+            hide_index=True, use_container_width=True,
+        )
+    with st.expander("Prometheus /metrics"):
+        text = prometheus_text()
+        st.code(text[:20000], language="text")
+        st.download_button("⬇️ metrics.txt", text.encode("utf-8"), file_name="metrics.txt", mime="text/plain")
+    st.caption(f"Log JSONL: {LOG_PATH or 'mati (set ISLAMICHAT_METRICS_LOG)'} • "
+               f"exporter: {'port ' + os.getenv('ISLAMICHAT_METRICS_PORT') if _exporter_started else 'mati'}")
@@ -0,0 +1,319 @@
+"""
+Indeks POI masjid offline dari ekstrak OSM — tanpa Overpass sama sekali.
+
+Importer membaca ekstrak lokal lalu menyaring dengan aturan yang sama
+dengan masjid.build_query:
+  amenity=place_of_worship + religion=muslim
+  amenity=place_of_worship + name ~ NAME_REGEX (case-insensitive)
+  building=mosque
+Way/relation (area) diwakili titik tengahnya, seperti `out center`.
+
+Indeks spasial: grid 0,01° (~1,1 km). Titik diurutkan per sel sehingga tiap
+sel = irisan kontigu di array NumPy; query radius hanya menyentuh sel yang
+menutupi lingkaran, jarak dihitung haversine secara vektor lalu diurutkan.
+Query nearest-k memperlebar radius bertahap sampai k titik terdekat pasti
+ditemukan.
+
+    python -m components.mosque_index build --geojson sumatera-masjid.geojson
+    python -m components.mosque_index build --pbf indonesia-latest.osm.pbf   # butuh pyosmium
+    python -m components.mosque_index build --overpass-json dump.json
+    python -m components.mosque_index query -2.9761 104.7754 --radius 1500
+    python -m components.mosque_index query -2.9761 104.7754 -k 10
+
+File: data/mosques.npz (override env ISLAMICHAT_MOSQUE_INDEX).
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_PATH = ROOT / "data" / "mosques.npz"
+INDEX_FORMAT = 1
+CELL_DEG = 0.01
+EARTH_R = 6371000.0
+
+NAME_REGEX = "masjid|musholl?a|mushol?a|mus(ha)?ll?a|musala|surau|langgar|prayer.?room"
+_NAME_RE = re.compile(NAME_REGEX, re.IGNORECASE)
+_TYPES = ["node", "way", "relation"]
+
+# Record mentah importer: (osm_type, osm_id, lat, lon, name)
+Poi = Tuple[str, int, float, float, str]
+
+def is_mosque(tags: Dict[str, Any]) -> bool:
+    """Filter tag yang sama dengan masjid.build_query."""
+    if tags.get("building") == "mosque":
+        return True
+    if tags.get("amenity") != "place_of_worship":
+        return False
+    return tags.get("religion") == "muslim" or bool(_NAME_RE.search(tags.get("name") or ""))
+
+def haversine_m(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Jarak (meter) dari satu titik ke banyak titik sekaligus."""
+    p1 = np.radians(lat)
+    p2 = np.radians(lats)
+    dp = p2 - p1
+    dl = np.radians(lons - lon)
+    a = np.sin(dp / 2) ** 2 + np.cos(p1) * np.cos(p2) * np.sin(dl / 2) ** 2
+    return 2 * EARTH_R * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+def _cell_key(ci, cj):
+    return (np.asarray(ci, dtype=np.int64) + 20000) * 40000 + (np.asarray(cj, dtype=np.int64) + 20000)
+
+class MosqueIndex:
+    def __init__(self, lat: np.ndarray, lon: np.ndarray, osm_type: np.ndarray, osm_id: np.ndarray,
+                 names: List[str], meta: Optional[Dict[str, Any]] = None):
+        key = _cell_key(np.floor(lat / CELL_DEG), np.floor(lon / CELL_DEG))
+        order = np.argsort(key, kind="stable")
+        self.lat = lat[order]
+        self.lon = lon[order]
+        self.osm_type = osm_type[order]
+        self.osm_id = osm_id[order]
+        self.names = [names[i] for i in order]
+        self.meta = meta or {}
+        # sel → irisan [start, end) di array yang sudah terurut
+        self._keys, self._starts = np.unique(key[order], return_index=True)
+        self._ends = np.append(self._starts[1:], len(order))
+
+    def __len__(self) -> int:
+        return len(self.lat)
+
+    # ---------- build / persist ----------
+    @classmethod
+    def from_pois(cls, pois: Iterable[Poi], source: str = "") -> "MosqueIndex":
+        seen = set()
+        rows = []
+        for t, i, la, lo, name in pois:
+            if (t, i) in seen:
+                continue
+            seen.add((t, i))
+            rows.append((_TYPES.index(t), i, la, lo, name))
+        arr = list(zip(*rows)) if rows else [[], [], [], [], []]
+        meta = {"source": source, "built_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                "count": len(rows)}
+        return cls(np.array(arr[2], dtype=np.float64), np.array(arr[3], dtype=np.float64),
+                   np.array(arr[0], dtype=np.uint8), np.array(arr[1], dtype=np.int64), list(arr[4]), meta)
+
+    def save(self, path: Path = DEFAULT_PATH) -> None:
+        blob = [n.encode("utf-8") for n in self.names]
+        offsets = np.cumsum([0] + [len(b) for b in blob]).astype(np.int64)
+        tmp = Path(path).with_suffix(".tmp.npz")
+        np.savez_compressed(
+            tmp, lat=self.lat, lon=self.lon, osm_type=self.osm_type, osm_id=self.osm_id,
+            names=np.frombuffer(b"".join(blob), dtype=np.uint8), name_offsets=offsets,
+            meta=np.array(json.dumps({**self.meta, "format": INDEX_FORMAT})),
+        )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path = DEFAULT_PATH) -> Optional["MosqueIndex"]:
+        try:
+            z = np.load(path, allow_pickle=False)
+        except (OSError, ValueError):
+            return None
+        meta = json.loads(str(z["meta"]))
+        if meta.get("format") != INDEX_FORMAT:
+            return None
+        raw = z["names"].tobytes()
+        off = z["name_offsets"]
+        names = [raw[off[i]:off[i + 1]].decode("utf-8") for i in range(len(off) - 1)]
+        return cls(z["lat"], z["lon"], z["osm_type"], z["osm_id"], names, meta)
+
+    # ---------- query ----------
+    def _candidates(self, lat: float, lon: float, radius_m: float) -> np.ndarray:
+        dlat = np.degrees(radius_m / EARTH_R)
+        dlon = dlat / max(np.cos(np.radians(lat)), 1e-6)
+        i0, i1 = int(np.floor((lat - dlat) / CELL_DEG)), int(np.floor((lat + dlat) / CELL_DEG))
+        j0, j1 = int(np.floor((lon - dlon) / CELL_DEG)), int(np.floor((lon + dlon) / CELL_DEG))
+        ii, jj = np.meshgrid(np.arange(i0, i1 + 1), np.arange(j0, j1 + 1), indexing="ij")
+        want = _cell_key(ii.ravel(), jj.ravel())
+        pos = np.searchsorted(self._keys, want)
+        ok = pos < len(self._keys)
+        pos, want = pos[ok], want[ok]
+        pos = pos[self._keys[pos] == want]  # sel kosong → searchsorted menunjuk sel lain
+        if not len(pos):
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([np.arange(s, e) for s, e in zip(self._starts[pos], self._ends[pos])])
+
+    def _hits(self, idx: np.ndarray, dist: np.ndarray) -> List[Dict[str, Any]]:
+        return [
+            {
+                "type": _TYPES[int(self.osm_type[i])], "id": int(self.osm_id[i]),
+                "lat": float(self.lat[i]), "lon": float(self.lon[i]),
+                "tags": {"name": self.names[i]} if self.names[i] else {},
+                "distance_m": float(d),
+            }
+            for i, d in zip(idx, dist)
+        ]
+
+    def within(self, lat: float, lon: float, radius_m: float, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Semua masjid dalam radius, urut dari yang terdekat (bentuk elemen Overpass + distance_m)."""
+        cand = self._candidates(lat, lon, radius_m)
+        if not len(cand):
+            return []
+        d = haversine_m(lat, lon, self.lat[cand], self.lon[cand])
+        keep = d <= radius_m
+        cand, d = cand[keep], d[keep]
+        order = np.argsort(d, kind="stable")[:limit]
+        return self._hits(cand[order], d[order])
+
+    def nearest(self, lat: float, lon: float, k: int = 10, max_radius_m: float = 50000) -> List[Dict[str, Any]]:
+        """k masjid terdekat (≤ max_radius_m). Radius digandakan dari 1 km sampai cukup."""
+        r = 1000.0
+        while True:
+            hits = self.within(lat, lon, min(r, max_radius_m), limit=k)
+            # k titik dalam radius r pasti k terdekat global (yang di luar r lebih jauh)
+            if len(hits) >= k or r >= max_radius_m:
+                return hits
+            r *= 2
+
+# ===================== Importer =====================
+def _centroid(coords: Any) -> Optional[Tuple[float, float]]:
+    """Rata-rata titik ring terluar (GeoJSON [lon, lat]) → (lat, lon)."""
+    pts = coords
+    while pts and isinstance(pts[0], list) and pts[0] and isinstance(pts[0][0], list):
+        pts = pts[0]
+    if not pts:
+        return None
+    arr = np.asarray(pts, dtype=np.float64)
+    return float(arr[:, 1].mean()), float(arr[:, 0].mean())
+
+def _geojson_id(feat: Dict[str, Any], n: int) -> Tuple[str, int]:
+    props = feat.get("properties") or {}
+    raw = str(feat.get("id") or props.get("@id") or props.get("id") or "")
+    m = re.match(r"^(node|way|relation)/(\d+)$", raw) or re.match(r"^([nwr])(\d+)$", raw)
+    if m:
+        t = {"n": "node", "w": "way", "r": "relation"}.get(m.group(1), m.group(1))
+        return t, int(m.group(2))
+    return "node", -(n + 1)  # tanpa id OSM → id sintetis negatif
+
+def iter_geojson(path: Path) -> Iterator[Poi]:
+    """FeatureCollection (ekspor osmium/overpass-turbo/QGIS); tag OSM di `properties`."""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    for n, feat in enumerate(data.get("features") or []):
+        props = feat.get("properties") or {}
+        tags = props.get("tags") if isinstance(props.get("tags"), dict) else props
+        if not is_mosque(tags):
+            continue
+        geom = feat.get("geometry") or {}
+        if geom.get("type") == "Point":
+            lon, lat = geom["coordinates"][:2]
+            ll = (float(lat), float(lon))
+        else:
+            ll = _centroid(geom.get("coordinates"))
+        if ll:
+            t, i = _geojson_id(feat, n)
+            yield t, i, ll[0], ll[1], tags.get("name") or ""
+
+def iter_overpass_json(path: Path) -> Iterator[Poi]:
+    """Dump `[out:json] ... out center;` dari Overpass (mis. query bbox satu provinsi)."""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    for el in data.get("elements") or []:
+        tags = el.get("tags") or {}
+        lat = el.get("lat") or el.get("center", {}).get("lat")
+        lon = el.get("lon") or el.get("center", {}).get("lon")
+        if lat is not None and lon is not None and is_mosque(tags):
+            yield el.get("type", "node"), int(el["id"]), float(lat), float(lon), tags.get("name") or ""
+
+def iter_pbf(path: Path) -> Iterator[Poi]:
+    """Ekstrak .osm.pbf (mis. Geofabrik indonesia-latest). Butuh `pip install osmium`."""
+    try:
+        import osmium
+    except ImportError:
+        sys.exit("Import PBF butuh pyosmium: pip install osmium (atau konversi dulu ke GeoJSON)")
+
+    out: List[Poi] = []
+
+    class Handler(osmium.SimpleHandler):
+        def node(self, n):
+            tags = dict(n.tags)
+            if is_mosque(tags) and n.location.valid():
+                out.append(("node", n.id, n.location.lat, n.location.lon, tags.get("name") or ""))
+
+        def area(self, a):
+            # area = way tertutup atau multipolygon relation, titik tengah ring luar
+            tags = dict(a.tags)
+            if not is_mosque(tags):
+                return
+            for ring in a.outer_rings():
+                pts = [(p.lat, p.lon) for p in ring if p.location.valid()]
+                if pts:
+                    lat = sum(p[0] for p in pts) / len(pts)
+                    lon = sum(p[1] for p in pts) / len(pts)
+                    out.append(("way" if a.from_way() else "relation", a.orig_id(), lat, lon,
+                                tags.get("name") or ""))
+                break
+
+    Handler().apply_file(str(path), locations=True)
+    return iter(out)
+
+# ===================== Singleton =====================
+_index: Optional[MosqueIndex] = None
+_index_lock = threading.Lock()
+
+def index_path() -> Path:
+    return Path(os.getenv("ISLAMICHAT_MOSQUE_INDEX") or DEFAULT_PATH)
+
+def get_index() -> Optional[MosqueIndex]:
+    """Indeks per proses; None kalau belum dibangun (app lalu memakai Overpass)."""
+    global _index
+    if _index is not None:
+        return _index
+    path = index_path()
+    if not path.exists():
+        return None
+    with _index_lock:
+        if _index is None:
+            _index = MosqueIndex.load(path)
+    return _index
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("build", help="bangun indeks dari ekstrak OSM")
+    src = b.add_mutually_exclusive_group(required=True)
+    src.add_argument("--geojson", type=Path)
+    src.add_argument("--pbf", type=Path)
+    src.add_argument("--overpass-json", type=Path)
+    b.add_argument("--out", type=Path, default=index_path())
+    q = sub.add_parser("query", help="uji query radius / nearest-k")
+    q.add_argument("lat", type=float)
+    q.add_argument("lon", type=float)
+    q.add_argument("--radius", type=float)
+    q.add_argument("-k", type=int, default=10)
+    args = ap.parse_args()
+
+    if args.cmd == "build":
+        t = time.perf_counter()
+        if args.geojson:
+            pois, source = iter_geojson(args.geojson), f"geojson:{args.geojson.name}"
+        elif args.pbf:
+            pois, source = iter_pbf(args.pbf), f"pbf:{args.pbf.name}"
+        else:
+            pois, source = iter_overpass_json(args.overpass_json), f"overpass:{args.overpass_json.name}"
+        idx = MosqueIndex.from_pois(pois, source)
+        idx.save(args.out)
+        print(f"{len(idx)} masjid → {args.out} ({time.perf_counter() - t:.1f}s)")
+        return
+
+    idx = get_index()
+    if not idx:
+        sys.exit(f"Indeks belum ada: {index_path()}")
+    t = time.perf_counter()
+    hits = idx.within(args.lat, args.lon, args.radius) if args.radius else idx.nearest(args.lat, args.lon, args.k)
+    ms = (time.perf_counter() - t) * 1000
+    for h in hits[:20]:
+        print(f"{h['distance_m']:8.0f} m  {h['tags'].get('name', '-')}  ({h['type']}/{h['id']})")
+    print(f"-- {len(hits)} hasil, {ms:.3f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+Cache masjid per tile (grid tetap) di disk — pengganti cache per (lat, lon, radius).
+
+Bumi dibagi grid TILE_DEG derajat (~2,2 km). Permintaan (lat, lon, radius)
+dijawab dari gabungan tile yang menutupi lingkaran itu lalu disaring jarak
+secara lokal, jadi pengguna yang berdekatan / menggeser slider radius
+memakai tile yang sama. Tile yang belum ada diambil sekaligus dalam SATU
+query Overpass (bbox gabungan), dipecah per tile, lalu disimpan — termasuk
+tile kosong — ke SQLite dengan TTL panjang (lokasi masjid jarang berubah).
+
+Lokasi file: $ISLAMICHAT_CACHE_DIR/mosque_tiles.sqlite (default data/cache/).
+"""
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+TILE_DEG = 0.02
+TTL_SEC = int(os.getenv("ISLAMICHAT_MOSQUE_TTL", str(30 * 24 * 3600)))
+EARTH_R = 6371000.0
+
+Tile = Tuple[int, int]
+
+def cache_dir() -> Path:
+    return Path(os.getenv("ISLAMICHAT_CACHE_DIR") or ROOT / "data" / "cache")
+
+# ===== Geometri =====
+def haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp, dl = p2 - p1, math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_R * math.asin(math.sqrt(a))
+
+def element_latlon(el: Dict) -> Tuple[Optional[float], Optional[float]]:
+    """Koordinat elemen Overpass (node: lat/lon, way/relation: center)."""
+    lat = el.get("lat") or el.get("center", {}).get("lat")
+    lon = el.get("lon") or el.get("center", {}).get("lon")
+    return lat, lon
+
+def tile_of(lat: float, lon: float) -> Tile:
+    return math.floor(lat / TILE_DEG), math.floor(lon / TILE_DEG)
+
+def tile_bbox(t: Tile) -> Tuple[float, float, float, float]:
+    """(south, west, north, east)"""
+    i, j = t
+    return i * TILE_DEG, j * TILE_DEG, (i + 1) * TILE_DEG, (j + 1) * TILE_DEG
+
+def covering_tiles(lat: float, lon: float, radius_m: float) -> List[Tile]:
+    """Semua tile yang beririsan dengan bbox lingkaran (lat, lon, radius)."""
+    dlat = math.degrees(radius_m / EARTH_R)
+    dlon = dlat / max(math.cos(math.radians(lat)), 1e-6)
+    i0, j0 = tile_of(lat - dlat, lon - dlon)
+    i1, j1 = tile_of(lat + dlat, lon + dlon)
+    return [(i, j) for i in range(i0, i1 + 1) for j in range(j0, j1 + 1)]
+
+def union_bbox(tiles: Iterable[Tile]) -> Tuple[float, float, float, float]:
+    boxes = [tile_bbox(t) for t in tiles]
+    return (min(b[0] for b in boxes), min(b[1] for b in boxes),
+            max(b[2] for b in boxes), max(b[3] for b in boxes))
+
+# ===== Store =====
+class TileCache:
+    """Tile → daftar elemen Overpass (JSON) + waktu ambil. Satu koneksi per thread."""
+
+    _SCHEMA = """
+    CREATE TABLE IF NOT EXISTS tiles (
+        key        TEXT PRIMARY KEY,   -- "<mode>:<i>:<j>", mode = full|lite
+        fetched_at REAL NOT NULL,
+        elements   TEXT NOT NULL
+    )
+    """
+
+    def __init__(self, path: Path, ttl: int = TTL_SEC):
+        self.path = Path(path)
+        self.ttl = ttl
+        self._local = threading.local()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn().execute(self._SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _key(mode: str, t: Tile) -> str:
+        return f"{mode}:{t[0]}:{t[1]}"
+
+    def get_many(self, tiles: List[Tile], lite: bool) -> Dict[Tile, List[Dict]]:
+        """Tile yang masih segar. Mode lite boleh dilayani tile full (superset)."""
+        now = time.time()
+        modes = ["full", "lite"] if lite else ["full"]
+        out: Dict[Tile, List[Dict]] = {}
+        conn = self._conn()
+        for t in tiles:
+            for mode in modes:
+                row = conn.execute("SELECT fetched_at, elements FROM tiles WHERE key=?",
+                                   (self._key(mode, t),)).fetchone()
+                if row and now - row[0] < self.ttl:
+                    out[t] = json.loads(row[1])
+                    break
+        return out
+
+    def put_many(self, data: Dict[Tile, List[Dict]], lite: bool) -> None:
+        mode = "lite" if lite else "full"
+        now = time.time()
+        conn = self._conn()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO tiles VALUES (?, ?, ?)",
+                [(self._key(mode, t), now, json.dumps(els, separators=(",", ":"))) for t, els in data.items()],
+            )
+
+    def stats(self) -> Dict[str, int]:
+        n, = self._conn().execute("SELECT COUNT(*) FROM tiles").fetchone()
+        return {"tiles": n}
+
+_cache: Optional[TileCache] = None
+_cache_lock = threading.Lock()
+
+def get_cache() -> Optional[TileCache]:
+    """Singleton per proses; None kalau direktori cache tak bisa ditulis."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                try:
+                    _cache = TileCache(cache_dir() / "mosque_tiles.sqlite")
+                except (OSError, sqlite3.Error):
+                    return None
+    return _cache
+
+# ===== Query =====
+def split_by_tile(elements: List[Dict], tiles: List[Tile]) -> Dict[Tile, List[Dict]]:
+    """Pecah hasil bbox gabungan ke tile masing-masing (tile tanpa elemen → list kosong)."""
+    out: Dict[Tile, List[Dict]] = {t: [] for t in tiles}
+    for el in elements:
+        lat, lon = element_latlon(el)
+        if lat is None or lon is None:
+            continue
+        t = tile_of(lat, lon)
+        if t in out:
+            out[t].append(el)
+    return out
+
+def mosques_near(lat: float, lon: float, radius: float, lite: bool,
+                 fetch_bbox: Callable[[Tuple[float, float, float, float], bool], List[Dict]]) -> List[Dict]:
+    """
+    Elemen dalam radius (meter) dari (lat, lon). Tile yang belum ada/kedaluwarsa
+    diambil lewat fetch_bbox((s, w, n, e), lite) — satu panggilan per permintaan.
+    """
+    tiles = covering_tiles(lat, lon, radius)
+    cache = get_cache()
+    have = cache.get_many(tiles, lite) if cache else {}
+    missing = [t for t in tiles if t not in have]
+    if missing:
+        fresh = split_by_tile(fetch_bbox(union_bbox(missing), lite), missing)
+        if cache:
+            try:
+                cache.put_many(fresh, lite)
+            except sqlite3.Error:
+                pass  # FS read-only → tetap jawab dari hasil fetch
+        have.update(fresh)
+
+    seen = set()
+    out = []
+    for t in tiles:
+        for el in have.get(t, []):
+            key = (el.get("type"), el.get("id"))
+            if key in seen:
+                continue
+            seen.add(key)
+            la, lo = element_latlon(el)
+            if la is not None and lo is not None and haversine_m(lat, lon, la, lo) <= radius:
+                out.append(el)
+    return out
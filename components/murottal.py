@@ -1,21 +1,18 @@
 import streamlit as st
-import requests
+
+from components import http_client
+from components.metrics import instrument
+from components.response_cache import persistent_cache
 
 RADIO_API = "https://mp3quran.net/api/v3/radios"
 
-@st.cache_data(ttl=86400)
+@instrument("fetch_radios")
+@persistent_cache(ttl=86400)
 def fetch_radios():
-    try:
-        response = requests.get(RADIO_API)
-        if response.status_code == 200:
-            data = response.json()
-            return data.get("radios", [])
-        else:
-            st.warning("Gagal mengambil data radio. Coba lagi nanti.")
-            return []
-    except Exception as e:
-        st.error(f"Error: {e}")
-        return []
+    # murni: gagal → exception (pesan ditampilkan tab), aman untuk revalidasi latar
+    response = http_client.get(RADIO_API, timeout=15)
+    response.raise_for_status()
+    return response.json().get("radios", [])
 
 def show_murottal_tab():
     st.header("📻 Murottal 24 Jam")
@@ -24,7 +21,11 @@ def show_murottal_tab():
         Sumber audio streaming dari [mp3quran.net](https://mp3quran.net).
     """)
 
-    radios = fetch_radios()
+    try:
+        radios = fetch_radios()
+    except Exception as e:
+        st.warning(f"Gagal mengambil data radio. Coba lagi nanti. ({e})")
+        return
     if not radios:
         st.info("Belum ada data radio yang tersedia.")
         return
@@ -0,0 +1,259 @@
+"""
+Hitung waktu sholat lokal (tanpa API) dari posisi matahari.
+
+Algoritma mengikuti PrayTimes.org 2.3 — basis yang sama dengan Aladhan —
+jadi hasil per menit mestinya identik dengan `timingsByCity` untuk metode
+dan mazhab Asar yang sama. Parameter sudut per metode memakai ID metode Aladhan.
+
+Contoh:
+    compute_timings(-2.9761, 104.7754, "Asia/Jakarta", date(2026, 10, 18), method=20)
+    → payload berbentuk sama dengan `data` dari Aladhan (timings/date/meta)
+"""
+import datetime as dt
+import json
+import math
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pytz
+
+# id metode Aladhan -> parameter. Isha berupa string "90 min" = menit setelah Maghrib.
+METHOD_PARAMS: Dict[int, Dict[str, Any]] = {
+    1:  {"name": "University of Islamic Sciences, Karachi", "fajr": 18, "isha": 18},
+    2:  {"name": "Islamic Society of North America (ISNA)", "fajr": 15, "isha": 15},
+    3:  {"name": "Muslim World League", "fajr": 18, "isha": 17},
+    4:  {"name": "Umm Al-Qura University, Makkah", "fajr": 18.5, "isha": "90 min"},
+    5:  {"name": "Egyptian General Authority of Survey", "fajr": 19.5, "isha": 17.5},
+    7:  {"name": "Institute of Geophysics, University of Tehran", "fajr": 17.7, "isha": 14, "maghrib": 4.5},
+    8:  {"name": "Gulf Region", "fajr": 19.5, "isha": "90 min"},
+    9:  {"name": "Kuwait", "fajr": 18, "isha": 17.5},
+    10: {"name": "Qatar", "fajr": 18, "isha": "90 min"},
+    11: {"name": "Majlis Ugama Islam Singapura, Singapore", "fajr": 20, "isha": 18},
+    12: {"name": "Union Organization islamic de France", "fajr": 12, "isha": 12},
+    13: {"name": "Diyanet İşleri Başkanlığı, Turkey", "fajr": 18, "isha": 17},
+    14: {"name": "Spiritual Administration of Muslims of Russia", "fajr": 16, "isha": 15},
+    15: {"name": "Moonsighting Committee Worldwide", "fajr": 18, "isha": 18},
+    16: {"name": "Dubai", "fajr": 18.2, "isha": 18.2},
+    17: {"name": "Jabatan Kemajuan Islam Malaysia (JAKIM)", "fajr": 20, "isha": 18},
+    18: {"name": "Tunisia", "fajr": 18, "isha": 18},
+    19: {"name": "Algeria", "fajr": 18, "isha": 17},
+    20: {"name": "Kementerian Agama Republik Indonesia", "fajr": 20, "isha": 18},
+    21: {"name": "Morocco", "fajr": 19, "isha": 17},
+    23: {"name": "Ministry of Awqaf, Islamic Affairs and Holy Places, Jordan", "fajr": 18, "isha": 18},
+}
+
+IMSAK_MIN = 10  # Imsak = Subuh - 10 menit (default Aladhan)
+
+# ===== Trigonometri derajat =====
+# Semua rumus memakai ufunc NumPy: fungsi yang sama melayani satu kota/satu hari
+# (skalar) maupun tabel setahun × banyak lokasi (array yang di-broadcast).
+def _dsin(d): return np.sin(np.radians(d))
+def _dcos(d): return np.cos(np.radians(d))
+def _dtan(d): return np.tan(np.radians(d))
+def _darcsin(x): return np.degrees(np.arcsin(x))
+def _darccos(x): return np.degrees(np.arccos(x))
+def _darctan2(y, x): return np.degrees(np.arctan2(y, x))
+def _darccot(x): return np.degrees(np.arctan(1 / x))
+
+def _fix(a, b):
+    return a - b * np.floor(a / b)
+
+def _julian(year: int, month: int, day: int) -> float:
+    if month <= 2:
+        year -= 1
+        month += 12
+    a = math.floor(year / 100)
+    b = 2 - a + math.floor(a / 4)
+    return math.floor(365.25 * (year + 4716)) + math.floor(30.6001 * (month + 1)) + day + b - 1524.5
+
+def _sun_position(jd):
+    """(deklinasi, equation of time jam) — rumus ringkas US Naval Observatory."""
+    d = jd - 2451545.0
+    g = _fix(357.529 + 0.98560028 * d, 360)
+    q = _fix(280.459 + 0.98564736 * d, 360)
+    lam = _fix(q + 1.915 * _dsin(g) + 0.020 * _dsin(2 * g), 360)
+    e = 23.439 - 0.00000036 * d
+    ra = _darctan2(_dcos(e) * _dsin(lam), _dcos(lam)) / 15
+    eqt = q / 15 - _fix(ra, 24)
+    decl = _darcsin(_dsin(e) * _dsin(lam))
+    return decl, eqt
+
+def _mid_day(jdate, t):
+    _, eqt = _sun_position(jdate + t / 24)
+    return _fix(12 - eqt, 24)
+
+def _sun_angle_time(jdate, lat, angle, t, ccw=False):
+    decl, _ = _sun_position(jdate + t / 24)
+    noon = _mid_day(jdate, t)
+    cos_h = (-_dsin(angle) - _dsin(decl) * _dsin(lat)) / (_dcos(decl) * _dcos(lat))
+    # |cos_h| > 1 → matahari tak mencapai sudut itu (lintang tinggi) → NaN
+    with np.errstate(invalid="ignore"):
+        h = _darccos(cos_h) / 15
+    return noon - h if ccw else noon + h
+
+def _asr_time(jdate, lat, factor, t):
+    decl, _ = _sun_position(jdate + t / 24)
+    angle = -_darccot(factor + _dtan(np.abs(lat - decl)))
+    return _sun_angle_time(jdate, lat, angle, t)
+
+def _raw_times(lat, lon, jd, params: Dict[str, Any], school: int, elevation) -> Dict[str, Any]:
+    """
+    Jam UTC desimal sejak 00:00 UTC tanggal `jd` (belum dibulatkan).
+    lat/lon/jd/elevation boleh skalar atau array yang bisa di-broadcast.
+    """
+    jdate = jd - lon / (15 * 24)
+    rise_set = 0.833 + 0.0347 * np.sqrt(np.maximum(elevation, 0))
+    # tebakan awal (jam lokal matahari) → satu iterasi seperti PrayTimes
+    t = {"fajr": 5, "sunrise": 6, "dhuhr": 12, "asr": 13, "sunset": 18, "maghrib": 18, "isha": 18}
+    isha = params["isha"]
+    maghrib = params.get("maghrib", 0)
+    out = {
+        "fajr": _sun_angle_time(jdate, lat, params["fajr"], t["fajr"], ccw=True),
+        "sunrise": _sun_angle_time(jdate, lat, rise_set, t["sunrise"], ccw=True),
+        "dhuhr": _mid_day(jdate, t["dhuhr"]),
+        "asr": _asr_time(jdate, lat, 1 + int(school), t["asr"]),
+        "sunset": _sun_angle_time(jdate, lat, rise_set, t["sunset"]),
+        "maghrib": _sun_angle_time(jdate, lat, maghrib, t["maghrib"]) if maghrib else None,
+        "isha": _sun_angle_time(jdate, lat, isha, t["isha"]) if not isinstance(isha, str) else None,
+    }
+    shift = lon / 15
+    out = {k: (v - shift if v is not None else None) for k, v in out.items()}
+    if out["maghrib"] is None:
+        out["maghrib"] = out["sunset"]
+    if out["isha"] is None:
+        out["isha"] = out["maghrib"] + float(isha.split()[0]) / 60
+
+    # ANGLE_BASED (default Aladhan): batasi Subuh/Isya ke porsi malam
+    night = _fix(out["sunrise"] - out["sunset"], 24)
+    fajr_max = params["fajr"] / 60 * night
+    bad = np.isnan(out["fajr"]) | (_fix(out["sunrise"] - out["fajr"], 24) > fajr_max)
+    out["fajr"] = np.where(bad, out["sunrise"] - fajr_max, out["fajr"])
+    if not isinstance(isha, str):
+        isha_max = isha / 60 * night
+        bad = np.isnan(out["isha"]) | (_fix(out["isha"] - out["sunset"], 24) > isha_max)
+        out["isha"] = np.where(bad, out["sunset"] + isha_max, out["isha"])
+
+    # malam kutub: matahari tak terbit sama sekali → Asar tak terdefinisi
+    decl, _ = _sun_position(jdate + t["dhuhr"] / 24)
+    out["asr"] = np.where(90 - np.abs(lat - decl) < -rise_set, np.nan, out["asr"])
+
+    out["imsak"] = out["fajr"] - IMSAK_MIN / 60
+    # tengah malam: titik tengah Maghrib(sunset) → Syuruq (hari berikutnya)
+    out["midnight"] = out["sunset"] + night / 2
+    return out
+
+def _round_minutes(h):
+    # pembulatan ke menit terdekat seperti Aladhan (floor(x + 0.5))
+    return np.floor(h * 60 + 0.5)
+
+def compute_times(lat: float, lon: float, tz_name: str, day: Optional[dt.date] = None,
+                  method: int = 20, school: int = 0,
+                  elevation: float = 0) -> Dict[str, Optional[dt.datetime]]:
+    """
+    Waktu sholat sebagai datetime ber-timezone (dibulatkan ke menit terdekat).
+
+    Subuh/Isya yang tak tercapai di lintang tinggi dibatasi aturan ANGLE_BASED.
+    Saat matahari tidak terbenam/terbit sama sekali (siang/malam kutub) waktu
+    yang bergantung padanya tidak ada → None.
+    """
+    params = METHOD_PARAMS[int(method)]
+    tz = pytz.timezone(tz_name)
+    day = day or dt.datetime.now(tz).date()
+
+    raw = _raw_times(lat, lon, _julian(day.year, day.month, day.day), params, school, elevation)
+    midnight_utc = dt.datetime(day.year, day.month, day.day, tzinfo=pytz.utc)
+    out = {}
+    for k, h in raw.items():
+        m = _round_minutes(h)
+        if np.isnan(m):
+            out[k] = None
+            continue
+        out[k] = (midnight_utc + dt.timedelta(minutes=int(m))).astimezone(tz)
+    return out
+
+def compute_timings(lat: float, lon: float, tz_name: str, day: Optional[dt.date] = None,
+                    method: int = 20, school: int = 0, elevation: float = 0) -> Dict[str, Any]:
+    """
+    Payload berbentuk `data` dari Aladhan /timings — drop-in untuk parse_today_times dkk.
+    Waktu yang tidak ada (siang/malam kutub) ditulis "-" dan didaftar di meta.undefined.
+    """
+    times = compute_times(lat, lon, tz_name, day, method, school, elevation)
+    day = day or times["dhuhr"].date()
+    names = {
+        "Fajr": "fajr", "Sunrise": "sunrise", "Dhuhr": "dhuhr", "Asr": "asr",
+        "Sunset": "sunset", "Maghrib": "maghrib", "Isha": "isha",
+        "Imsak": "imsak", "Midnight": "midnight",
+    }
+    params = METHOD_PARAMS[int(method)]
+    return {
+        "timings": {k: times[v].strftime("%H:%M") if times[v] else "-" for k, v in names.items()},
+        "date": {
+            "readable": day.strftime("%d %b %Y"),
+            "gregorian": {"date": day.strftime("%d-%m-%Y")},
+        },
+        "meta": {
+            "latitude": lat,
+            "longitude": lon,
+            "timezone": tz_name,
+            "method": {
+                "id": int(method),
+                "name": params["name"],
+                "params": {"Fajr": params["fajr"], "Isha": params["isha"]},
+            },
+            "school": "HANAFI" if int(school) == 1 else "STANDARD",
+            "latitudeAdjustmentMethod": "ANGLE_BASED",
+            "undefined": [k for k, v in names.items() if times[v] is None],
+            "source": "local",
+        },
+    }
+
+# ===== Jadwal setahun (vektor) =====
+_HHMM = np.array([f"{m // 60:02d}:{m % 60:02d}" for m in range(1440)], dtype=object)
+TIMETABLE_COLUMNS = ["Imsak", "Fajr", "Sunrise", "Dhuhr", "Asr", "Sunset", "Maghrib", "Isha", "Midnight"]
+
+def prayer_timetable(locations: List[Dict[str, Any]], year: int, method: int = 20, school: int = 0):
+    """
+    Jadwal sholat setahun penuh untuk banyak lokasi sekaligus.
+
+    `locations` berbentuk baris data/kota.json ({"kota", "lat", "lon", "tz"},
+    opsional "elevation"). Deklinasi & equation of time dihitung sekali sebagai
+    array (hari × lokasi) — tidak ada loop per hari. Hasil: DataFrame panjang
+    dengan kolom kota, date, lalu TIMETABLE_COLUMNS sebagai "HH:MM" waktu lokal.
+    """
+    import pandas as pd
+
+    params = METHOD_PARAMS[int(method)]
+    days = pd.date_range(f"{year}-01-01", f"{year}-12-31", freq="D")
+    jd0 = _julian(year, 1, 1)
+    jd = (jd0 + np.arange(len(days), dtype=float))[:, None]          # (D, 1)
+    lat = np.array([float(l["lat"]) for l in locations])[None, :]    # (1, L)
+    lon = np.array([float(l["lon"]) for l in locations])[None, :]
+    elev = np.array([float(l.get("elevation") or 0) for l in locations])[None, :]
+
+    raw = _raw_times(lat, lon, jd, params, school, elev)
+    # menit sejak 00:00 UTC tanggal itu → timestamp UTC absolut (ns)
+    base = days.values.astype("datetime64[m]").astype(np.int64)[:, None]
+    stamps = {}
+    for col in TIMETABLE_COLUMNS:
+        m = np.broadcast_to(_round_minutes(raw[col.lower()]), (len(days), len(locations)))
+        stamps[col] = np.where(np.isnan(m), np.nan, base + np.nan_to_num(m))
+
+    frames = []
+    for i, loc in enumerate(locations):
+        df = pd.DataFrame({"kota": loc.get("kota", ""), "date": days.strftime("%Y-%m-%d")})
+        for col in TIMETABLE_COLUMNS:
+            local = pd.DatetimeIndex(pd.to_datetime(stamps[col][:, i], unit="m", utc=True)).tz_convert(loc["tz"])
+            hhmm = np.nan_to_num(local.hour * 60 + local.minute, nan=-1).astype(int)
+            df[col] = np.where(hhmm >= 0, _HHMM[hhmm], "")
+        frames.append(df)
+    return pd.concat(frames, ignore_index=True)
+
+def timetable_to_csv(df) -> bytes:
+    return df.to_csv(index=False).encode("utf-8")
+
+def timetable_to_json(df) -> bytes:
+    """JSON per kota → per tanggal, ringkas untuk papan jadwal digital / IoT."""
+    out: Dict[str, Dict[str, Dict[str, str]]] = {}
+    for kota, g in df.groupby("kota", sort=False):
+        out[kota] = g.set_index("date")[TIMETABLE_COLUMNS].to_dict(orient="index")
+    return json.dumps(out, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
@@ -1,9 +1,11 @@
 import random
-import requests
 import streamlit as st
 from typing import Dict, Any, List, Optional, Tuple
-
-API = "https://equran.id/api/v2"
+from components.quran_store import (
+    get_store, get_surah_detail, get_tafsir, list_surah, normalize_ayat as _normalize_ayat,
+)
+from components.quran_search import load_or_build, parse_ref
+from tools_hafalan import normalize_arabic
 
 def _extract_audio_src(audio_field):
     """Balikin URL/bytes untuk st.audio dari berbagai bentuk audio_field."""
@@ -55,30 +57,6 @@ JUZ_STARTS: Dict[int, Tuple[int, int]] = {
     26:(46,1), 27:(51,31),28:(58,1), 29:(67,1), 30:(78,1),
 }
 
-# =========================
-# Data fetchers (cached)
-# =========================
-@st.cache_data(ttl=6 * 60 * 60, show_spinner=False)
-def list_surah() -> List[Dict[str, Any]]:
-    r = requests.get(f"{API}/surat", timeout=12)
-    r.raise_for_status()
-    j = r.json()
-    return j.get("data", []) or j.get("Data", []) or []
-
-@st.cache_data(ttl=6 * 60 * 60, show_spinner=False)
-def get_surah_detail(no: int) -> Dict[str, Any]:
-    r = requests.get(f"{API}/surat/{no}", timeout=15)
-    r.raise_for_status()
-    j = r.json()
-    return j.get("data", {}) or j.get("Data", {}) or {}
-
-@st.cache_data(ttl=6 * 60 * 60, show_spinner=False)
-def get_tafsir(no: int) -> Dict[str, Any]:
-    r = requests.get(f"{API}/tafsir/{no}", timeout=15)
-    r.raise_for_status()
-    j = r.json()
-    return j.get("data", {}) or j.get("Data", {}) or {}
-
 # =========================
 # Utilities
 # =========================
@@ -97,40 +75,92 @@ def _audio_full_candidates(detail: Dict[str, Any]) -> Dict[str, str]:
         cands["Default"] = af
     return cands
 
-def _normalize_ayat(a: Dict[str, Any]) -> Dict[str, Any]:
-    return {
-        "nomor": a.get("nomorAyat") or a.get("nomor") or a.get("number"),
-        # perbaiki key untuk arab/latin/terjemah (camelCase + fallback lama)
-        "arab": (
-            a.get("teksArab")
-            or a.get("teks_arab")
-            or a.get("arab")
-            or a.get("teks")
-            or a.get("text")
-            or ""
-        ),
-        "latin": (
-            a.get("teksLatin")
-            or a.get("teks_latin")
-            or a.get("latin")
-            or a.get("read")
-            or ""
-        ),
-        "terjemah": (
-            a.get("teksIndonesia")
-            or a.get("teks_id")
-            or a.get("terjemah")
-            or a.get("translation")
-            or ""
-        ),
-        # audio tetap; extractor akan handle dict/list/string
-        "audio": a.get("audio") or a.get("audio_url") or "",
-    }
-
 def _ayat_list(detail: Dict[str, Any]) -> List[Dict[str, Any]]:
     raw = detail.get("ayat") or detail.get("verses") or []
     return [_normalize_ayat(a) for a in raw]
 
+@st.cache_resource(show_spinner="Menyiapkan indeks pencarian Al-Qur’an…")
+def _search_index(corpus_version: str):
+    # dibangun/di-load sekali per proses (per versi korpus), dipakai semua sesi
+    return load_or_build(get_store())
+
+def _jump_to(surah: int, ayat: int, label: Optional[str]) -> None:
+    # dipakai sebagai on_click → boleh mengubah state selectbox sebelum dirender
+    st.session_state["__sf_q_surah"] = int(surah)
+    st.session_state["__sf_scroll_to_ayat"] = int(ayat)
+    if label:
+        st.session_state["__sf_q_surah_label"] = label
+
+def _render_global_search(store, q: str, labels_by_no: Dict[int, str], limit: int = 20) -> None:
+    idx = _search_index(store.version)
+    hits = idx.search(q, limit=limit)
+    if not hits:
+        st.info("Tidak ada ayat yang cocok di seluruh Al-Qur’an.")
+        return
+    st.caption(f"{len(hits)} hasil teratas untuk “{q}”")
+    for h in hits:
+        s, n = h["surah"], h["ayat"]
+        a = store.ayah(s, n)
+        if not a:
+            continue
+        c1, c2 = st.columns([6, 1])
+        with c1:
+            st.markdown(f"**{s}:{n}** — {a['terjemah']}")
+        with c2:
+            st.button("Buka", key=f"__sf_q_hit_{s}_{n}", on_click=_jump_to,
+                      args=(s, n, labels_by_no.get(s)), use_container_width=True)
+
+PAGE_SIZES = [10, 20, 50]
+
+def _shift_page(key: str, delta: int, n_pages: int) -> None:
+    st.session_state[key] = min(max(int(st.session_state.get(key, 1)) + delta, 1), n_pages)
+
+def _page_window(ayat: List[Dict[str, Any]], no_surah: int, scroll_target: Optional[int]) -> Tuple[List[Dict[str, Any]], str, int]:
+    """
+    Pilih potongan ayat yang dirender (hanya halaman aktif yang masuk widget tree).
+    Return: (ayat di halaman ini, key state halaman, jumlah halaman)
+    """
+    size = int(st.session_state.get("__sf_q_page_size", PAGE_SIZES[0]))
+    n_pages = max((len(ayat) + size - 1) // size, 1)
+    page_key = f"__sf_q_page_{no_surah}"
+
+    # lompat ke halaman yang memuat ayat target (lanjutkan bacaan / Juz / hasil cari)
+    if scroll_target:
+        pos = next((i for i, a in enumerate(ayat) if int(a["nomor"]) == int(scroll_target)), None)
+        if pos is not None:
+            st.session_state[page_key] = pos // size + 1
+    st.session_state[page_key] = min(max(int(st.session_state.get(page_key, 1)), 1), n_pages)
+
+    page = st.session_state[page_key]
+    return ayat[(page - 1) * size: page * size], page_key, n_pages
+
+@st.cache_resource(ttl=6 * 60 * 60, show_spinner=False)
+def _surah_ayat_index(no: int) -> Dict[int, Dict[str, Any]]:
+    """nomor ayat -> ayat ternormalisasi; dibangun sekali per surat (read-only, tanpa copy)."""
+    return {int(a["nomor"]): a for a in _ayat_list(get_surah_detail(no))}
+
+def _load_hafalan_ayat(items: List[Tuple[int, int]]) -> Dict[Tuple[int, int], Optional[Dict[str, Any]]]:
+    """
+    Muat semua ayat di daftar hafalan sekaligus: dari korpus lokal langsung per
+    primary key; tanpa korpus, tiap surat unik di-index sekali lalu dipakai bersama.
+    """
+    out: Dict[Tuple[int, int], Optional[Dict[str, Any]]] = {}
+    store = get_store()
+    if store:
+        for s, n in items:
+            out[(int(s), int(n))] = store.ayah(s, n)
+        return out
+
+    for s in sorted({int(s) for s, _ in items}):
+        try:
+            idx = _surah_ayat_index(s)
+        except Exception:
+            idx = {}
+        for s2, n in items:
+            if int(s2) == s:
+                out[(s, int(n))] = idx.get(int(n))
+    return out
+
 def _get_last_state() -> Dict[str, int]:
     return st.session_state.setdefault("quran_last", {"surah": 1, "ayat": 1})
 
@@ -156,15 +186,12 @@ def _remove_hafalan(surah: int, ayat: int):
 # =========================
 def render_quran_tab():
     st.header("📖 Al-Qur’an")
-    st.caption("Sumber data: EQuran.id • Teks/tafsir Kemenag • Audio via CDN")
+    store = get_store()
+    sumber = f"EQuran.id (korpus lokal {store.version})" if store else "EQuran.id"
+    st.caption(f"Sumber data: {sumber} • Teks/tafsir Kemenag • Audio via CDN")
 
-    # --- Lanjutkan bacaan terakhir
-    last = _get_last_state()
-    with st.expander("⏭️ Lanjutkan bacaan terakhir", expanded=False):
-        st.write(f"Terakhir: **Surah {last['surah']}** ayat **{last['ayat']}**")
-        if st.button("Buka posisi terakhir", use_container_width=True):
-            st.session_state["__sf_q_surah"] = last["surah"]
-            st.session_state["__sf_scroll_to_ayat"] = last["ayat"]
+    # --- Lanjutkan bacaan terakhir (diisi setelah label surat ada, lihat bawah)
+    resume_box = st.container()
 
     # --- Daftar surat
     try:
@@ -184,12 +211,19 @@ def render_quran_tab():
     # pilih default
     labels = list(options.keys())
     default_surah = int(st.session_state.get("__sf_q_surah", 1))
-    try:
-        label_idx = next(i for i, (lbl, n) in enumerate(options.items()) if n == default_surah)
-    except StopIteration:
-        label_idx = 0
-    
-    pilih_label = st.selectbox("Pilih Surat", labels, index=label_idx, key="__sf_q_surah_label")
+    labels_by_no = {n: lbl for lbl, n in options.items()}
+    # state selectbox hanya di-seed kalau belum ada; _jump_to menulis key ini
+    # langsung, jadi widget tidak diberi index= (Streamlit memperingatkan
+    # bila default value & Session State dipakai bersamaan)
+    if st.session_state.get("__sf_q_surah_label") not in options:
+        st.session_state["__sf_q_surah_label"] = labels_by_no.get(default_surah, labels[0])
+
+    last = _get_last_state()
+    with resume_box.expander("⏭️ Lanjutkan bacaan terakhir", expanded=False):
+        st.write(f"Terakhir: **Surah {last['surah']}** ayat **{last['ayat']}**")
+        st.button("Buka posisi terakhir", use_container_width=True, on_click=_jump_to,
+                  args=(last["surah"], last["ayat"], labels_by_no.get(int(last["surah"]))))
+    pilih_label = st.selectbox("Pilih Surat", labels, key="__sf_q_surah_label")
     no_surah = options[pilih_label]
 
     # --- Navigasi Juz
@@ -198,13 +232,11 @@ def render_quran_tab():
         with colj1:
             juz = st.selectbox("Pilih Juz", list(range(1,31)), key="__sf_q_juz")
         with colj2:
-            if st.button("Lompat ke Juz", use_container_width=True):
-                s, a = JUZ_STARTS.get(juz, (1,1))
-                st.session_state["__sf_q_surah"] = s
-                st.session_state["__sf_q_surah_label"] = None
-                st.session_state["__sf_scroll_to_ayat"] = a
-                # force re-render ke surah tujuan
-                st.experimental_rerun()
+            # on_click: state selectbox surat diubah sebelum rerun berikutnya,
+            # lalu halaman yang memuat ayat pembuka Juz otomatis dipilih
+            s, a = JUZ_STARTS.get(juz, (1,1))
+            st.button("Lompat ke Juz", use_container_width=True, on_click=_jump_to,
+                      args=(s, a, labels_by_no.get(s)))
 
         st.caption("Mapping mengikuti pembuka Juz pada mushaf Madinah; bisa disesuaikan bila perlu.")
 
@@ -233,24 +265,58 @@ def render_quran_tab():
             qari = st.selectbox("Audio full surat (qari)", qari_names, key="__sf_q_qari")
             st.audio(cands[qari])
 
-    # --- Pencarian dalam surat
-    q = st.text_input("Cari ayat (nomor / potongan teks terjemah/Arab)", key="__sf_q_query")
+    # --- Pencarian (dalam surat / seluruh Al-Qur'an via indeks)
+    cq1, cq2 = st.columns([3, 1])
+    with cq1:
+        q = st.text_input("Cari ayat (nomor, surah:ayat mis. 2:255, atau potongan teks terjemah/Latin/Arab)",
+                          key="__sf_q_query")
+    with cq2:
+        cari_semua = st.toggle("Seluruh Al-Qur’an", value=False, key="__sf_q_global",
+                               disabled=store is None,
+                               help=("Mencari di korpus lokal." if store else
+                                     "Korpus lokal sedang disiapkan di latar (job warm-up quran_corpus); "
+                                     "coba lagi sebentar lagi."))
+
+    ref = parse_ref(q)
+    if ref and ref[0] != int(no_surah):
+        st.button(f"➡️ Buka {ref[0]}:{ref[1]}", on_click=_jump_to,
+                  args=(ref[0], ref[1], labels_by_no.get(ref[0])))
+    elif q and cari_semua and store:
+        with st.expander("🔎 Hasil pencarian seluruh Al-Qur’an", expanded=True):
+            _render_global_search(store, q.strip(), labels_by_no)
 
     # --- Render ayat
     ayat_all = _ayat_list(detail)
-    if q:
+    if q and not cari_semua:
         ql = q.strip().lower()
+        qa = normalize_arabic(q)
         def match(a):
             return (
                 ql == str(a["nomor"]).lower() or
+                (ref is not None and ref == (int(no_surah), int(a["nomor"]))) or
                 ql in a["terjemah"].lower() or
-                ql in a["arab"].lower()
+                (qa and qa in normalize_arabic(a["arab"]))
             )
         ayat_all = [a for a in ayat_all if match(a)]
 
     scroll_target = st.session_state.pop("__sf_scroll_to_ayat", None)
 
-    for a in ayat_all:
+    # --- Tampilan (global, bukan 2 toggle per ayat) & paginasi
+    cv1, cv2, cv3 = st.columns([1, 1, 1])
+    with cv1:
+        show_latin = st.toggle("Latin", value=False, key="__sf_q_show_latin")
+    with cv2:
+        show_id = st.toggle("Terjemah", value=True, key="__sf_q_show_id")
+    with cv3:
+        st.selectbox("Ayat per halaman", PAGE_SIZES, key="__sf_q_page_size")
+
+    ayat_page, page_key, n_pages = _page_window(ayat_all, int(no_surah), scroll_target)
+    if n_pages > 1:
+        st.number_input(f"Halaman (1–{n_pages})", min_value=1, max_value=n_pages, step=1, key=page_key)
+    if ayat_page:
+        st.caption(f"Ayat {ayat_page[0]['nomor']}–{ayat_page[-1]['nomor']} • {len(ayat_all)} ayat ditampilkan dalam {n_pages} halaman")
+
+    for a in ayat_page:
         n = a["nomor"]
         with st.container():
             st.markdown(f"**{n}**")
@@ -259,10 +325,6 @@ def render_quran_tab():
                 unsafe_allow_html=True
             )
 
-            # Controls tampilan
-            show_latin = st.toggle("Latin", value=False, key=f"latin_{no_surah}_{n}")
-            show_id = st.toggle("Terjemah", value=True, key=f"id_{no_surah}_{n}")
-
             if show_latin and a["latin"]:
                 st.caption(a["latin"])
             if show_id and a["terjemah"]:
@@ -296,13 +358,25 @@ def render_quran_tab():
             if scroll_target and int(n) == int(scroll_target):
                 st.info(f"📌 Anda di ayat {n}.", icon="📌")
 
+    if n_pages > 1:
+        p1, p2, p3 = st.columns([1, 2, 1])
+        cur_page = st.session_state[page_key]
+        p1.button("⬅️ Sebelumnya", key="__sf_q_prev", disabled=cur_page <= 1,
+                  on_click=_shift_page, args=(page_key, -1, n_pages), use_container_width=True)
+        p2.markdown(f"<div style='text-align:center'>Halaman {cur_page} / {n_pages}</div>", unsafe_allow_html=True)
+        p3.button("Berikutnya ➡️", key="__sf_q_next", disabled=cur_page >= n_pages,
+                  on_click=_shift_page, args=(page_key, 1, n_pages), use_container_width=True)
+
     # --- Tafsir
-    with st.expander("📚 Tampilkan Tafsir Surat ini", expanded=False):
+    with st.expander("📚 Tampilkan Tafsir (ayat di halaman ini)", expanded=False):
         try:
             tafsir = get_tafsir(int(no_surah))
             konten = tafsir.get("tafsir") or tafsir.get("keterangan") or tafsir
             if isinstance(konten, list):
+                on_page = {str(a["nomor"]) for a in ayat_page}
                 for item in konten:
+                    if str(item.get("ayat")) not in on_page:
+                        continue
                     st.markdown(f"**Ayat {item.get('ayat','?')}**")
                     st.write(item.get("teks") or item.get("text") or "")
                     st.divider()
@@ -339,13 +413,10 @@ def render_quran_tab():
         st.info("Belum ada ayat di daftar hafalan. Gunakan tombol **➕ Hafalan** pada ayat di atas.")
         return
 
-    # Render latihan
+    # Render latihan (semua ayat dimuat sekali, lookup O(1) per item)
+    ayat_by_key = _load_hafalan_ayat(items)
     for (s, n) in items:
-        try:
-            d = get_surah_detail(s)
-            ayat = next((x for x in _ayat_list(d) if int(x["nomor"]) == int(n)), None)
-        except Exception:
-            ayat = None
+        ayat = ayat_by_key.get((int(s), int(n)))
 
         box = st.container()
         with box:
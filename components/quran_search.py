@@ -0,0 +1,207 @@
+"""
+Indeks pencarian seluruh Al-Qur'an (6.236 ayat) — inverted index + skor BM25.
+
+Field yang diindeks:
+  t: terjemah (lowercase)
+  l: latin    (diakritik transliterasi dilipat: "raḥmānir-raḥīm" → "rahmanir rahim",
+              lalu tools_hafalan.normalize_latin_user)
+  a: arab     (alif wasla ٱ → ا, lalu tools_hafalan.normalize_arabic →
+              harakat/tatweel/variasi alif dibuang)
+
+Lipatan yang sama dipakai di sisi indeks maupun query.
+
+Query ber-aksara Arab dicocokkan ke field a:, selain itu ke t: dan l:.
+Query berbentuk "2:255" / "2.255" langsung jadi lookup surah:ayat.
+
+Indeks dibangun dari korpus lokal (components/quran_store.py) lalu disimpan
+ke `data/quran_index.pickle`; berikutnya cukup di-load (selama versi korpus sama).
+    python -m components.quran_search build
+    python -m components.quran_search "sabar shalat"
+"""
+import math
+import pickle
+import re
+import sys
+import time
+import unicodedata
+from array import array
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from tools_hafalan import normalize_arabic, normalize_latin_user
+
+ROOT = Path(__file__).resolve().parents[1]
+INDEX_PATH = ROOT / "data" / "quran_index.pickle"
+INDEX_FORMAT = 2  # naikkan bila tokenisasi berubah → pickle lama dibangun ulang
+
+_ARABIC_CHARS = re.compile(r"[؀-ۿ]")
+_WORD = re.compile(r"[0-9a-z']+")
+_REF = re.compile(r"^\s*(\d{1,3})\s*[:.]\s*(\d{1,3})\s*$")
+
+# parameter BM25 standar
+_K1 = 1.2
+_B = 0.75
+
+def _strip_marks(s: str) -> str:
+    """NFKD lalu buang tanda diakritik gabung: "raḥīm" → "rahim"."""
+    t = unicodedata.normalize("NFKD", s or "")
+    return "".join(c for c in t if not unicodedata.combining(c))
+
+def _tokens_terjemah(s: str) -> List[str]:
+    return _WORD.findall(_strip_marks(s).lower())
+
+def _fold_latin(s: str) -> str:
+    # transliterasi EQuran: ā/ḥ/ṣ… → huruf dasar, "-" penyambung → spasi
+    return normalize_latin_user(_strip_marks(s).replace("-", " "))
+
+def _fold_arabic(s: str) -> str:
+    # teks Utsmani memakai alif wasla (ٱ); pengguna mengetik alif biasa
+    return normalize_arabic((s or "").replace("\u0671", "\u0627"))
+
+def _tokens_latin(s: str) -> List[str]:
+    return _fold_latin(s).split()
+
+def _tokens_arab(s: str) -> List[str]:
+    return _fold_arabic(s).split()
+
+def parse_ref(q: str) -> Optional[Tuple[int, int]]:
+    """'2:255' → (2, 255); selain itu None."""
+    m = _REF.match(q or "")
+    if not m:
+        return None
+    s, a = int(m.group(1)), int(m.group(2))
+    return (s, a) if 1 <= s <= 114 and a >= 1 else None
+
+class QuranIndex:
+    def __init__(self, refs: List[Tuple[int, int]], doc_len: array,
+                 postings: Dict[str, Tuple[array, array]], corpus_version: str):
+        self.refs = refs              # doc_id -> (surah, ayat)
+        self.doc_len = doc_len        # doc_id -> jumlah token (semua field)
+        self.postings = postings      # "t:kata" -> (doc_ids, tf)
+        self.corpus_version = corpus_version
+        self._ref_to_doc = {r: i for i, r in enumerate(refs)}
+        avgdl = (sum(doc_len) / len(doc_len)) if doc_len else 1.0
+        # normalisasi panjang dokumen BM25, dihitung sekali saat load
+        self._norm = [_K1 * (1 - _B + _B * dl / avgdl) for dl in doc_len]
+
+    # ---------- build / persist ----------
+    @classmethod
+    def build(cls, store) -> "QuranIndex":
+        refs: List[Tuple[int, int]] = []
+        doc_len = array("I")
+        tmp: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        for surah, a in store.iter_ayat():
+            doc = len(refs)
+            refs.append((surah, int(a["nomor"])))
+            counts = Counter()
+            counts.update("t:" + w for w in _tokens_terjemah(a["terjemah"]))
+            counts.update("l:" + w for w in _tokens_latin(a["latin"]))
+            counts.update("a:" + w for w in _tokens_arab(a["arab"]))
+            doc_len.append(sum(counts.values()))
+            for tok, tf in counts.items():
+                tmp[tok].append((doc, tf))
+        postings = {
+            tok: (array("I", (d for d, _ in lst)), array("H", (min(tf, 65535) for _, tf in lst)))
+            for tok, lst in tmp.items()
+        }
+        return cls(refs, doc_len, postings, store.version)
+
+    def save(self, path: Path = INDEX_PATH) -> None:
+        with open(path, "wb") as f:
+            pickle.dump({"format": INDEX_FORMAT, "corpus_version": self.corpus_version,
+                         "refs": self.refs, "doc_len": self.doc_len, "postings": self.postings},
+                        f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path: Path = INDEX_PATH) -> Optional["QuranIndex"]:
+        try:
+            with open(path, "rb") as f:
+                raw = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+        if raw.get("format") != INDEX_FORMAT:
+            return None
+        return cls(raw["refs"], raw["doc_len"], raw["postings"], raw["corpus_version"])
+
+    # ---------- query ----------
+    def _query_tokens(self, q: str) -> List[List[str]]:
+        """Tiap kata query → daftar token field yang dicari (OR antar field)."""
+        if _ARABIC_CHARS.search(q):
+            return [["a:" + w] for w in _tokens_arab(q)]
+        out = []
+        for w in _tokens_terjemah(q.replace("-", " ")):
+            alts = ["t:" + w]
+            lat = _fold_latin(w)
+            if lat:
+                alts.append("l:" + lat)
+            out.append(alts)
+        return out
+
+    def search(self, q: str, limit: int = 50) -> List[Dict]:
+        """
+        Ranked search (BM25). Ayat yang memuat lebih banyak kata query
+        otomatis di atas karena skor tiap kata dijumlahkan.
+        """
+        ref = parse_ref(q)
+        if ref:
+            return [{"surah": ref[0], "ayat": ref[1], "score": float("inf")}] if ref in self._ref_to_doc else []
+
+        n_docs = len(self.refs)
+        scores: Dict[int, float] = defaultdict(float)
+        for alts in self._query_tokens(q):
+            best: Dict[int, float] = {}
+            for tok in alts:
+                post = self.postings.get(tok)
+                if not post:
+                    continue
+                docs, tfs = post
+                idf = math.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+                norm = self._norm
+                for d, tf in zip(docs, tfs):
+                    s = idf * tf * (_K1 + 1) / (tf + norm[d])
+                    if s > best.get(d, 0.0):
+                        best[d] = s
+            for d, s in best.items():
+                scores[d] += s
+
+        top = sorted(scores.items(), key=lambda x: (-x[1], x[0]))[:limit]
+        return [{"surah": self.refs[d][0], "ayat": self.refs[d][1], "score": s} for d, s in top]
+
+def load_or_build(store, path: Path = INDEX_PATH) -> QuranIndex:
+    """Pakai indeks prebuilt kalau cocok dengan versi korpus; kalau tidak, bangun & simpan."""
+    idx = QuranIndex.load(path)
+    if idx and idx.corpus_version == store.version:
+        return idx
+    idx = QuranIndex.build(store)
+    try:
+        idx.save(path)
+    except OSError:
+        pass  # FS read-only (mis. container) → cukup di memori
+    return idx
+
+def main():
+    from components.quran_store import get_store
+    store = get_store()
+    if not store:
+        sys.exit("Korpus Quran belum ada. Jalankan: python -m components.quran_store build")
+
+    if sys.argv[1:] == ["build"]:
+        t = time.perf_counter()
+        idx = QuranIndex.build(store)
+        idx.save()
+        print(f"{len(idx.refs)} ayat, {len(idx.postings)} token → {INDEX_PATH} ({time.perf_counter() - t:.2f}s)")
+        return
+
+    idx = load_or_build(store)
+    q = " ".join(sys.argv[1:])
+    t = time.perf_counter()
+    hits = idx.search(q, limit=10)
+    dt = (time.perf_counter() - t) * 1000
+    for h in hits:
+        a = store.ayah(h["surah"], h["ayat"])
+        print(f"{h['surah']}:{h['ayat']}  ({h['score']:.2f})  {a['terjemah'][:100] if a else ''}")
+    print(f"-- {len(hits)} hasil, {dt:.2f} ms")
+
+if __name__ == "__main__":
+    main()
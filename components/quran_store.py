@@ -0,0 +1,397 @@
+"""
+Korpus Al-Qur'an lokal (SQLite) — pengganti fetch per-surat ke EQuran.id.
+
+Isi: 114 surat (info + audio full), semua ayat (Arab, Latin, terjemah,
+audio per ayat) dan tafsir per ayat. File di-bundle bersama app
+(default `data/quran.sqlite`, bisa dioverride env ISLAMICHAT_QURAN_DB),
+dibuka read-only, dan lookup ayat memakai primary key (surah, nomor).
+
+Membangun / memperbarui korpus (sekali, butuh internet atau dump JSON):
+    python -m components.quran_store build                 # tarik dari API EQuran v2
+    python -m components.quran_store build --from-dir dump/ # dari file JSON EQuran
+        dump/surat.json, dump/surat/<n>.json, dump/tafsir/<n>.json
+    python -m components.quran_store build --if-changed    # tulis hanya bila isi berubah
+    python -m components.quran_store info
+
+Korpus yang tidak lengkap (≠ 114 surat / 6.236 ayat) ditolak, kecuali
+--allow-partial (mis. dibangun dari fixture bench/mock_upstream.py).
+File di-bundle oleh workflow .github/workflows/quran-corpus.yml. Kalau
+deploy belum membawanya, job warm-up "quran_corpus" membangunnya sekali
+dari API ke $ISLAMICHAT_CACHE_DIR/quran.sqlite (ensure_corpus); sampai
+selesai semua fetcher tetap memakai API.
+"""
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from components import http_client
+from components.metrics import instrument
+from components.mosque_tiles import cache_dir
+from components.response_cache import persistent_cache
+
+ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_PATH = ROOT / "data" / "quran.sqlite"
+SCHEMA_VERSION = 1
+EQURAN_API = "https://equran.id/api/v2"
+EXPECTED_SURAH = 114
+EXPECTED_AYAT = 6236
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta  (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS surah (nomor INTEGER PRIMARY KEY, info TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS ayat (
+    surah    INTEGER NOT NULL,
+    nomor    INTEGER NOT NULL,
+    arab     TEXT NOT NULL,
+    latin    TEXT NOT NULL,
+    terjemah TEXT NOT NULL,
+    audio    TEXT NOT NULL,   -- JSON (string/dict/list, apa adanya dari API)
+    tafsir   TEXT,
+    PRIMARY KEY (surah, nomor)
+) WITHOUT ROWID;
+"""
+
+# =========================
+# Normalizer (bentuk JSON EQuran)
+# =========================
+def normalize_ayat(a: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "nomor": a.get("nomorAyat") or a.get("nomor") or a.get("number"),
+        # perbaiki key untuk arab/latin/terjemah (camelCase + fallback lama)
+        "arab": (
+            a.get("teksArab")
+            or a.get("teks_arab")
+            or a.get("arab")
+            or a.get("teks")
+            or a.get("text")
+            or ""
+        ),
+        "latin": (
+            a.get("teksLatin")
+            or a.get("teks_latin")
+            or a.get("latin")
+            or a.get("read")
+            or ""
+        ),
+        "terjemah": (
+            a.get("teksIndonesia")
+            or a.get("teks_id")
+            or a.get("terjemah")
+            or a.get("translation")
+            or ""
+        ),
+        # audio tetap; extractor akan handle dict/list/string
+        "audio": a.get("audio") or a.get("audio_url") or "",
+    }
+
+def _unwrap(j: Any) -> Any:
+    if isinstance(j, dict):
+        return j.get("data", j.get("Data", j))
+    return j
+
+# =========================
+# Reader
+# =========================
+class QuranStore:
+    """Akses read-only ke korpus; satu koneksi SQLite per thread."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._local = threading.local()
+        self.meta = {k: v for k, v in self._conn().execute("SELECT key, value FROM meta")}
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+            self._local.conn = conn
+        return conn
+
+    @property
+    def version(self) -> str:
+        return self.meta.get("corpus_version", "?")
+
+    def list_surah(self) -> List[Dict[str, Any]]:
+        rows = self._conn().execute("SELECT info FROM surah ORDER BY nomor")
+        return [json.loads(info) for (info,) in rows]
+
+    def ayah(self, surah: int, nomor: int) -> Optional[Dict[str, Any]]:
+        """Satu ayat (bentuk ternormalisasi), lookup primary key."""
+        row = self._conn().execute(
+            "SELECT nomor, arab, latin, terjemah, audio FROM ayat WHERE surah=? AND nomor=?",
+            (int(surah), int(nomor)),
+        ).fetchone()
+        if not row:
+            return None
+        n, arab, latin, terjemah, audio = row
+        return {"nomor": n, "arab": arab, "latin": latin, "terjemah": terjemah, "audio": json.loads(audio)}
+
+    def surah_detail(self, no: int) -> Dict[str, Any]:
+        """Detail surat dengan bentuk sama seperti respons /surat/{no} EQuran v2."""
+        row = self._conn().execute("SELECT info FROM surah WHERE nomor=?", (int(no),)).fetchone()
+        if not row:
+            return {}
+        detail = json.loads(row[0])
+        detail["ayat"] = [
+            {"nomorAyat": n, "teksArab": arab, "teksLatin": latin,
+             "teksIndonesia": terjemah, "audio": json.loads(audio)}
+            for n, arab, latin, terjemah, audio in self._conn().execute(
+                "SELECT nomor, arab, latin, terjemah, audio FROM ayat WHERE surah=? ORDER BY nomor",
+                (int(no),),
+            )
+        ]
+        return detail
+
+    def tafsir(self, no: int) -> Dict[str, Any]:
+        """Tafsir surat dengan bentuk sama seperti respons /tafsir/{no} EQuran v2."""
+        row = self._conn().execute("SELECT info FROM surah WHERE nomor=?", (int(no),)).fetchone()
+        if not row:
+            return {}
+        out = json.loads(row[0])
+        out["tafsir"] = [
+            {"ayat": n, "teks": teks}
+            for n, teks in self._conn().execute(
+                "SELECT nomor, tafsir FROM ayat WHERE surah=? AND tafsir IS NOT NULL ORDER BY nomor",
+                (int(no),),
+            )
+        ]
+        return out
+
+    def iter_ayat(self):
+        """(surah, ayat ternormalisasi tanpa audio) untuk semua ayat, urut mushaf."""
+        for s, n, arab, latin, terjemah in self._conn().execute(
+            "SELECT surah, nomor, arab, latin, terjemah FROM ayat ORDER BY surah, nomor"
+        ):
+            yield s, {"nomor": n, "arab": arab, "latin": latin, "terjemah": terjemah}
+
+_store: Optional[QuranStore] = None
+_store_lock = threading.Lock()
+
+def corpus_path() -> Path:
+    """env → korpus bundel (data/) → hasil build saat deploy di cache dir."""
+    env = os.getenv("ISLAMICHAT_QURAN_DB")
+    if env:
+        return Path(env)
+    if DEFAULT_PATH.exists():
+        return DEFAULT_PATH
+    return cache_dir() / "quran.sqlite"
+
+def get_store() -> Optional[QuranStore]:
+    """Singleton per proses. None kalau korpus belum dibangun / versi skema beda."""
+    global _store
+    if _store is not None:
+        return _store
+    path = corpus_path()
+    if not path.exists():
+        return None
+    with _store_lock:
+        if _store is None:
+            try:
+                store = QuranStore(path)
+            except sqlite3.Error:
+                return None
+            if store.meta.get("schema_version") != str(SCHEMA_VERSION):
+                return None
+            _store = store
+    return _store
+
+# =========================
+# Data fetchers
+# Korpus lokal (QuranStore) dipakai bila tersedia; API EQuran hanya fallback
+# =========================
+@instrument("list_surah")
+def list_surah() -> List[Dict[str, Any]]:
+    store = get_store()
+    if store:
+        return store.list_surah()
+    return _api_list_surah()
+
+@instrument("get_surah_detail")
+def get_surah_detail(no: int) -> Dict[str, Any]:
+    store = get_store()
+    if store:
+        return store.surah_detail(no)
+    return _api_surah_detail(no)
+
+@instrument("get_tafsir")
+def get_tafsir(no: int) -> Dict[str, Any]:
+    store = get_store()
+    if store:
+        return store.tafsir(no)
+    return _api_tafsir(no)
+
+@persistent_cache(ttl=6 * 60 * 60, show_spinner=False)
+def _api_list_surah() -> List[Dict[str, Any]]:
+    r = http_client.get(f"{EQURAN_API}/surat", timeout=12)
+    r.raise_for_status()
+    j = r.json()
+    return j.get("data", []) or j.get("Data", []) or []
+
+@persistent_cache(ttl=6 * 60 * 60, show_spinner=False)
+def _api_surah_detail(no: int) -> Dict[str, Any]:
+    r = http_client.get(f"{EQURAN_API}/surat/{no}", timeout=15)
+    r.raise_for_status()
+    j = r.json()
+    return j.get("data", {}) or j.get("Data", {}) or {}
+
+@persistent_cache(ttl=6 * 60 * 60, show_spinner=False)
+def _api_tafsir(no: int) -> Dict[str, Any]:
+    r = http_client.get(f"{EQURAN_API}/tafsir/{no}", timeout=15)
+    r.raise_for_status()
+    j = r.json()
+    return j.get("data", {}) or j.get("Data", {}) or {}
+
+# =========================
+# Importer
+# =========================
+class IncompleteCorpusError(RuntimeError):
+    """Jumlah surat/ayat hasil build tidak sama dengan mushaf lengkap."""
+
+def build_corpus(out_path: Path, load_json: Callable[[str], Any], source: str,
+                 allow_partial: bool = False) -> Dict[str, str]:
+    """
+    Bangun korpus dari sumber berbentuk EQuran v2.
+    load_json(rel) dipanggil dengan "surat", "surat/<n>", "tafsir/<n>".
+    Ditulis ke file sementara lalu di-rename, jadi pembaca lama tidak pernah
+    melihat file setengah jadi. corpus_version = hash isi, jadi build ulang
+    dari data yang sama menghasilkan versi yang sama.
+    """
+    out_path = Path(out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out_path.with_suffix(f".{os.getpid()}.tmp")
+    if tmp.exists():
+        tmp.unlink()
+    conn = sqlite3.connect(tmp)
+    conn.executescript(_SCHEMA)
+
+    daftar = _unwrap(load_json("surat")) or []
+    total = 0
+    digest = hashlib.sha1()
+    for s in daftar:
+        no = int(s.get("nomor") or s.get("number"))
+        detail = _unwrap(load_json(f"surat/{no}")) or {}
+        try:
+            tafsir = _unwrap(load_json(f"tafsir/{no}")) or {}
+        except Exception:
+            tafsir = {}
+        tafsir_by_ayat = {
+            int(t.get("ayat")): (t.get("teks") or t.get("text") or "")
+            for t in (tafsir.get("tafsir") or [])
+            if str(t.get("ayat", "")).isdigit()
+        }
+
+        info = {k: v for k, v in detail.items() if k not in ("ayat", "verses", "tafsir")} or dict(s)
+        info_json = json.dumps(info, ensure_ascii=False, sort_keys=True)
+        conn.execute("INSERT INTO surah VALUES (?, ?)", (no, info_json))
+        digest.update(info_json.encode("utf-8"))
+        for raw in detail.get("ayat") or detail.get("verses") or []:
+            a = normalize_ayat(raw)
+            n = int(a["nomor"])
+            row = (no, n, a["arab"], a["latin"], a["terjemah"],
+                   json.dumps(a["audio"], ensure_ascii=False, sort_keys=True), tafsir_by_ayat.get(n))
+            conn.execute("INSERT INTO ayat VALUES (?, ?, ?, ?, ?, ?, ?)", row)
+            digest.update(json.dumps(row, ensure_ascii=False).encode("utf-8"))
+            total += 1
+
+    if not allow_partial and (len(daftar) != EXPECTED_SURAH or total != EXPECTED_AYAT):
+        conn.close()
+        tmp.unlink()
+        raise IncompleteCorpusError(f"korpus tidak lengkap: {len(daftar)} surat, {total} ayat "
+                                    f"(seharusnya {EXPECTED_SURAH}/{EXPECTED_AYAT})")
+
+    meta = {
+        "schema_version": str(SCHEMA_VERSION),
+        "corpus_version": f"equran-v2-{digest.hexdigest()[:12]}",
+        "source": source,
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "surah_count": str(len(daftar)),
+        "ayat_count": str(total),
+    }
+    conn.executemany("INSERT INTO meta VALUES (?, ?)", meta.items())
+    conn.commit()
+    conn.execute("VACUUM")
+    conn.close()
+    os.replace(tmp, out_path)
+    return meta
+
+def _api_loader(base: str) -> Callable[[str], Any]:
+    def load(rel: str) -> Any:
+        r = http_client.get(f"{base}/{rel}", timeout=20)
+        r.raise_for_status()
+        return r.json()
+    return load
+
+def _dir_loader(root: Path) -> Callable[[str], Any]:
+    def load(rel: str) -> Any:
+        with open(root / f"{rel}.json", encoding="utf-8") as f:
+            return json.load(f)
+    return load
+
+_build_lock = threading.Lock()
+
+def ensure_corpus() -> Dict[str, str]:
+    """
+    Job warm-up "quran_corpus": kalau belum ada korpus (bundel/env/cache),
+    bangun sekali dari API EQuran ke cache dir. Metadata korpus aktif dikembalikan.
+    """
+    store = get_store()
+    if store:
+        return store.meta
+    with _build_lock:
+        store = get_store()
+        if store:
+            return store.meta
+        return build_corpus(corpus_path(), _api_loader(EQURAN_API), EQURAN_API)
+
+def _read_meta(path: Path) -> Dict[str, str]:
+    try:
+        conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            return dict(conn.execute("SELECT key, value FROM meta"))
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return {}
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("build", help="bangun korpus SQLite")
+    b.add_argument("--from-dir", type=Path, help="folder dump JSON EQuran")
+    b.add_argument("--api", default=EQURAN_API)
+    b.add_argument("--out", type=Path, default=Path(os.getenv("ISLAMICHAT_QURAN_DB") or DEFAULT_PATH))
+    b.add_argument("--allow-partial", action="store_true", help="terima korpus tidak lengkap (fixture/tes)")
+    b.add_argument("--if-changed", action="store_true", help="jangan timpa --out kalau corpus_version sama")
+    sub.add_parser("info", help="tampilkan metadata korpus")
+    args = ap.parse_args()
+
+    if args.cmd == "build":
+        out = args.out.with_name(args.out.name + ".new") if args.if_changed else args.out
+        if args.from_dir:
+            load, source = _dir_loader(args.from_dir), f"dir:{args.from_dir}"
+        else:
+            load, source = _api_loader(args.api), args.api
+        try:
+            meta = build_corpus(out, load, source, allow_partial=args.allow_partial)
+        except IncompleteCorpusError as e:
+            sys.exit(str(e))
+        if args.if_changed:
+            if _read_meta(args.out).get("corpus_version") == meta["corpus_version"]:
+                out.unlink()
+                print(f"tidak berubah ({meta['corpus_version']}), {args.out} dibiarkan")
+                return
+            os.replace(out, args.out)
+        print(json.dumps(meta, indent=2))
+    else:
+        store = get_store()
+        print(json.dumps(store.meta, indent=2) if store else f"Korpus belum ada: {corpus_path()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,411 @@
+"""
+Cache respons upstream yang persisten & bisa dibagi antar proses satu host.
+
+`@st.cache_data(ttl=...)` hanya hidup di memori satu proses: tiap restart dan
+tiap replika di belakang load balancer mulai dingin. `@persistent_cache(ttl=...)`
+adalah pengganti drop-in:
+
+    @persistent_cache(ttl=6 * 60 * 60, show_spinner=False)
+    def _api_surah_detail(no: int): ...
+
+    _api_surah_detail.clear()          # hapus semua entri fungsi ini
+    _api_surah_detail.refresh(2)       # hitung ulang & simpan sekarang
+    _api_surah_detail.stats()          # hit/miss/stale/error + jumlah entri
+
+Perilaku:
+  - backend default SQLite (WAL) di $ISLAMICHAT_RESPONSE_CACHE, default
+    <cache_dir>/responses.sqlite — satu file boleh dipakai banyak proses
+    di host yang sama. WAL butuh memori bersama, jadi file ini harus di disk
+    lokal (bukan NFS/SMB/volume jaringan); tiap replika punya file sendiri.
+    Backend `memory` untuk dev, `none` mematikan;
+  - TTL per fungsi; nilai dipickle seperti st.cache_data, jadi pemanggil
+    selalu menerima salinan;
+  - stale-while-revalidate: entri kedaluwarsa yang masih dalam jendela
+    `stale_ttl` (default = ttl) langsung dikembalikan dan disegarkan di
+    thread latar (satu refresh per key); kalau refresh/hitung gagal,
+    entri basi itu tetap dipakai (stale-if-error) selama umurnya masih di
+    bawah `stale_if_error` (default 24 jam) — data "hari ini" pasang batas
+    lebih pendek supaya jadwal kemarin tak tersaji;
+  - LRU berbatas ukuran: total byte di atas ISLAMICHAT_CACHE_MAX_MB
+    (default 256) → entri yang paling lama tak diakses dibuang;
+  - lapisan memori kecil di depan backend supaya rerun tak menyentuh disk.
+
+Fungsi yang di-cache harus murni: gagal → exception, tanpa st.* — revalidasi
+latar & warm-up memanggilnya dari thread tanpa ScriptRunContext (`_call_headless`).
+Pesan ke pengguna urusan pemanggil di UI.
+
+Key = nama fungsi + hash bytecode (versi kode) + argumen setelah default diisi.
+Pengecualian tidak di-cache (sama dengan st.cache_data). Hasil None/kosong juga
+tidak disimpan: fetcher lama menelan error dan mengembalikan None/[], dan
+kegagalan sesaat tak boleh ikut tersimpan lintas restart & replika.
+
+    python -m components.response_cache stats
+    python -m components.response_cache clear [prefix]
+"""
+import functools
+import hashlib
+import inspect
+import os
+import pickle
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from components import metrics
+from components.mosque_tiles import cache_dir
+
+BACKEND = os.getenv("ISLAMICHAT_CACHE_BACKEND", "sqlite")  # sqlite | memory | none
+MAX_BYTES = int(float(os.getenv("ISLAMICHAT_CACHE_MAX_MB", "256")) * 1024 * 1024)
+MEMORY_ITEMS = 256
+STALE_IF_ERROR_SEC = 24 * 3600  # umur maksimum entri basi yang boleh dipakai saat upstream gagal
+TOUCH_EVERY_SEC = 60  # accessed_at LRU cukup diperbarui sesekali (hemat tulis)
+
+Entry = Tuple[bytes, float]  # (nilai terpickle, stored_at epoch)
+
+def db_path() -> Path:
+    return Path(os.getenv("ISLAMICHAT_RESPONSE_CACHE") or cache_dir() / "responses.sqlite")
+
+# ===== Backend =====
+class MemoryBackend:
+    """Dict per proses — perilaku lama st.cache_data, untuk dev/test."""
+
+    def __init__(self, max_bytes: int = MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._data: "OrderedDict[str, Entry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Entry]:
+        with self._lock:
+            e = self._data.get(key)
+            if e is not None:
+                self._data.move_to_end(key)
+            return e
+
+    def set(self, key: str, value: bytes, stored_at: float) -> None:
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old:
+                self._bytes -= len(old[0])
+            self._data[key] = (value, stored_at)
+            self._bytes += len(value)
+            while self._bytes > self.max_bytes and len(self._data) > 1:
+                _, (v, _) = self._data.popitem(last=False)
+                self._bytes -= len(v)
+
+    def delete_prefix(self, prefix: str) -> int:
+        with self._lock:
+            keys = [k for k in self._data if k.startswith(prefix)]
+            for k in keys:
+                self._bytes -= len(self._data.pop(k)[0])
+            return len(keys)
+
+    def stats(self, prefix: str = "") -> Dict[str, int]:
+        with self._lock:
+            items = [v for k, (v, _) in self._data.items() if k.startswith(prefix)]
+        return {"entries": len(items), "bytes": sum(len(v) for v in items)}
+
+class SqliteBackend:
+    """File SQLite (WAL) di disk lokal; aman dipakai banyak thread & proses satu host."""
+
+    _SCHEMA = """
+    CREATE TABLE IF NOT EXISTS entries (
+        key         TEXT PRIMARY KEY,
+        value       BLOB NOT NULL,
+        size        INTEGER NOT NULL,
+        stored_at   REAL NOT NULL,
+        accessed_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS entries_lru ON entries(accessed_at);
+    """
+
+    def __init__(self, path: Path, max_bytes: int = MAX_BYTES):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn().executescript(self._SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[Entry]:
+        conn = self._conn()
+        row = conn.execute("SELECT value, stored_at, accessed_at FROM entries WHERE key=?", (key,)).fetchone()
+        if row is None:
+            return None
+        now = time.time()
+        if now - row[2] > TOUCH_EVERY_SEC:
+            with conn:
+                conn.execute("UPDATE entries SET accessed_at=? WHERE key=?", (now, key))
+        return bytes(row[0]), row[1]
+
+    def set(self, key: str, value: bytes, stored_at: float) -> None:
+        conn = self._conn()
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                         (key, value, len(value), stored_at, time.time()))
+        self._evict(conn)
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        total, = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()
+        if total <= self.max_bytes:
+            return
+        # buang yang paling lama tak diakses sampai 90% batas
+        target = total - int(self.max_bytes * 0.9)
+        with conn:
+            conn.execute("""
+                DELETE FROM entries WHERE key IN (
+                    SELECT key FROM (
+                        SELECT key, size, SUM(size) OVER (ORDER BY accessed_at, key) AS run FROM entries
+                    ) WHERE run - size < ?
+                )""", (target,))
+
+    def delete_prefix(self, prefix: str) -> int:
+        conn = self._conn()
+        with conn:
+            cur = conn.execute("DELETE FROM entries WHERE substr(key, 1, ?) = ?", (len(prefix), prefix))
+        return cur.rowcount
+
+    def stats(self, prefix: str = "") -> Dict[str, int]:
+        n, size = self._conn().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries WHERE substr(key, 1, ?) = ?",
+            (len(prefix), prefix)).fetchone()
+        return {"entries": n, "bytes": size}
+
+_backend: Any = None
+_backend_lock = threading.Lock()
+
+def get_backend():
+    """Backend per proses; jatuh ke memori kalau file cache tak bisa dibuka."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                if BACKEND == "memory":
+                    _backend = MemoryBackend()
+                elif BACKEND == "none":
+                    _backend = False
+                else:
+                    try:
+                        _backend = SqliteBackend(db_path())
+                    except (OSError, sqlite3.Error):
+                        _backend = MemoryBackend()
+    return _backend or None
+
+# ===== Decorator =====
+_refresh_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="cache-refresh")
+_registry: Dict[str, "CachedFunction"] = {}
+
+def _seconds(ttl: Union[int, float, timedelta, None]) -> Optional[float]:
+    if ttl is None:
+        return None
+    return ttl.total_seconds() if isinstance(ttl, timedelta) else float(ttl)
+
+def _code_version(fn: Callable) -> str:
+    code = fn.__code__
+    return hashlib.sha1(code.co_code + repr(code.co_names).encode()).hexdigest()[:8]
+
+class CachedFunction:
+    def __init__(self, fn: Callable, ttl: Optional[float], stale_ttl: Optional[float],
+                 show_spinner: Union[bool, str], stale_if_error: Optional[float] = STALE_IF_ERROR_SEC):
+        functools.update_wrapper(self, fn)
+        self._fn = fn
+        self._sig = inspect.signature(fn)
+        self.ttl = ttl
+        self.stale_ttl = ttl if stale_ttl is None else stale_ttl
+        self.stale_if_error = stale_if_error
+        self.show_spinner = show_spinner
+        self.name = f"{fn.__module__}.{fn.__qualname__}"
+        self.prefix = f"{self.name}@{_code_version(fn)}:"
+        self._mem: "OrderedDict[str, Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._refreshing: set = set()
+        self.counters = {"hit": 0, "miss": 0, "stale": 0, "error": 0, "refresh": 0}
+        _registry[self.name] = self
+
+    # ---------- key & storage ----------
+    def _key(self, args, kwargs) -> str:
+        bound = self._sig.bind(*args, **kwargs)
+        bound.apply_defaults()
+        raw = repr(tuple(bound.arguments.items())).encode()
+        return self.prefix + hashlib.sha1(raw).hexdigest()
+
+    def _count(self, what: str) -> None:
+        with self._lock:
+            self.counters[what] += 1
+        if what in ("hit", "stale", "miss"):
+            metrics.note_cache(self.name, what)
+
+    def _lookup(self, key: str) -> Optional[Entry]:
+        with self._lock:
+            e = self._mem.get(key)
+            if e is not None:
+                self._mem.move_to_end(key)
+                return e
+        backend = get_backend()
+        if backend is None:
+            return None
+        try:
+            e = backend.get(key)
+        except sqlite3.Error:
+            return None
+        if e is not None:
+            self._remember(key, e)
+        return e
+
+    def _remember(self, key: str, e: Entry) -> None:
+        with self._lock:
+            self._mem[key] = e
+            self._mem.move_to_end(key)
+            while len(self._mem) > MEMORY_ITEMS:
+                self._mem.popitem(last=False)
+
+    def _store(self, key: str, value: Any) -> None:
+        if value is None or (isinstance(value, (list, dict, tuple, str)) and not value):
+            return
+        e = (pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), time.time())
+        self._remember(key, e)
+        backend = get_backend()
+        if backend is not None:
+            try:
+                backend.set(key, *e)
+            except sqlite3.Error:
+                pass  # disk penuh/terkunci → tetap jalan dengan lapisan memori
+
+    def _compute(self, key: str, args, kwargs) -> Any:
+        if self.show_spinner:
+            import streamlit as st
+            text = self.show_spinner if isinstance(self.show_spinner, str) else f"Running {self._fn.__name__}(...)."
+            with st.spinner(text):
+                value = self._fn(*args, **kwargs)
+        else:
+            value = self._fn(*args, **kwargs)
+        self._store(key, value)
+        return value
+
+    def _call_headless(self, key: str, args, kwargs) -> Any:
+        """Hitung & simpan tanpa UI (tanpa spinner) — untuk thread latar/warm-up."""
+        value = self._fn(*args, **kwargs)
+        self._store(key, value)
+        self._count("refresh")
+        return value
+
+    def _usable_stale(self, e: Optional[Entry]) -> bool:
+        if e is None:
+            return False
+        return self.stale_if_error is None or time.time() - e[1] < self.stale_if_error
+
+    def _revalidate(self, key: str, args, kwargs) -> None:
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def run():
+            try:
+                self._call_headless(key, args, kwargs)
+            except Exception:
+                self._count("error")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+        _refresh_pool.submit(run)
+
+    # ---------- API publik ----------
+    def __call__(self, *args, **kwargs) -> Any:
+        key = self._key(args, kwargs)
+        e = self._lookup(key)
+        if e is not None:
+            age = time.time() - e[1]
+            if self.ttl is None or age < self.ttl:
+                self._count("hit")
+                return pickle.loads(e[0])
+            if age < self.ttl + self.stale_ttl:
+                self._count("stale")
+                self._revalidate(key, args, kwargs)
+                return pickle.loads(e[0])
+        self._count("miss")
+        try:
+            return self._compute(key, args, kwargs)
+        except Exception:
+            self._count("error")
+            if self._usable_stale(e):  # stale-if-error: data lama (berbatas umur) daripada kosong
+                return pickle.loads(e[0])
+            raise
+
+    def refresh(self, *args, **kwargs) -> Any:
+        """Hitung ulang sekarang (abaikan cache) lalu simpan — dipakai warm-up."""
+        return self._call_headless(self._key(args, kwargs), args, kwargs)
+
+    def age(self, *args, **kwargs) -> Optional[float]:
+        """Umur (detik) entri untuk argumen ini, None kalau belum ada."""
+        e = self._lookup(self._key(args, kwargs))
+        return None if e is None else time.time() - e[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._mem.clear()
+        backend = get_backend()
+        if backend is not None:
+            backend.delete_prefix(self.prefix)
+
+    def stats(self) -> Dict[str, Any]:
+        backend = get_backend()
+        with self._lock:
+            out: Dict[str, Any] = {"name": self.name, **self.counters, "memory": len(self._mem)}
+        out.update(backend.stats(self.prefix) if backend is not None else {"entries": 0, "bytes": 0})
+        calls = out["hit"] + out["stale"] + out["miss"]
+        out["hit_rate"] = round((out["hit"] + out["stale"]) / calls, 3) if calls else None
+        return out
+
+def persistent_cache(func: Optional[Callable] = None, *, ttl: Union[int, float, timedelta, None] = None,
+                     stale_ttl: Union[int, float, timedelta, None] = None,
+                     stale_if_error: Union[int, float, timedelta, None] = STALE_IF_ERROR_SEC,
+                     show_spinner: Union[bool, str] = True, **_ignored):
+    """
+    Drop-in untuk @st.cache_data(ttl=..., show_spinner=...). Argumen
+    st.cache_data lain (max_entries, persist, …) diterima tapi diabaikan —
+    ukuran dibatasi per byte oleh backend. `stale_if_error=None` = tanpa batas umur.
+    """
+    def wrap(fn: Callable) -> CachedFunction:
+        return CachedFunction(fn, _seconds(ttl), _seconds(stale_ttl), show_spinner, _seconds(stale_if_error))
+    return wrap(func) if func is not None else wrap
+
+def all_stats() -> List[Dict[str, Any]]:
+    """Statistik semua fungsi ber-@persistent_cache yang sudah di-import."""
+    return [f.stats() for f in _registry.values()]
+
+def clear_all(prefix: str = "") -> int:
+    for f in _registry.values():
+        with f._lock:
+            f._mem.clear()
+    backend = get_backend()
+    return backend.delete_prefix(prefix) if backend is not None else 0
+
+def main():
+    cmd = sys.argv[1] if len(sys.argv) > 1 else "stats"
+    backend = get_backend()
+    if backend is None:
+        sys.exit("Cache dimatikan (ISLAMICHAT_CACHE_BACKEND=none)")
+    if cmd == "clear":
+        prefix = sys.argv[2] if len(sys.argv) > 2 else ""
+        print(f"{clear_all(prefix)} entri dihapus")
+    else:
+        print({"path": str(db_path()) if isinstance(backend, SqliteBackend) else "memory",
+               "max_mb": MAX_BYTES // (1024 * 1024), **backend.stats()})
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+import importlib
+import streamlit as st
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from components import metrics
+
+# ===== Registry tab =====
+# key -> {"key", "label", "render", "deps", "when"}; urutan insert = urutan tampil
+_TABS: Dict[str, Dict[str, Any]] = {}
+
+# render boleh callable atau string "paket.modul:fungsi" (lazy import)
+Target = Union[str, Callable[[], None]]
+
+STATE_KEY = "__sf_active_tab"
+
+def register_tab(key: str, label: str, render: Optional[Target] = None,
+                 deps: Optional[List[Target]] = None, when: Optional[Target] = None):
+    """
+    Daftarkan satu tab. Bisa dipanggil langsung atau sebagai decorator:
+
+        register_tab("quran", "📖 Quran", "components.quran:render_quran_tab")
+
+        @register_tab("chatbot", "🤖 Chatbot")
+        def _tab_chatbot(): ...
+
+    Target string "modul:fungsi" baru di-import saat tab itu dirender, jadi
+    dependency berat (folium, geopy, openai, ...) tidak ikut dimuat saat
+    cold start / ping. `deps` = target yang harus jalan dulu sebelum body tab
+    (mis. inisialisasi session_state bersama). `when` = target yang
+    mengembalikan bool per rerun; tab hanya tampil kalau True (mis. tab admin).
+    Registry ini global per proses, jadi syarat per sesi harus lewat `when`,
+    bukan dengan mendaftarkan tab secara kondisional. Registrasi ulang dengan
+    key sama menimpa entri lama, jadi aman dipanggil di setiap rerun app.py.
+    """
+    def _add(fn: Target) -> Target:
+        _TABS[key] = {"key": key, "label": label, "render": fn, "deps": list(deps or []), "when": when}
+        return fn
+
+    if render is not None:
+        return _add(render)
+    return _add
+
+def resolve(target: Target) -> Callable[[], None]:
+    """'components.quran:render_quran_tab' → fungsi (import modul saat itu juga)."""
+    if callable(target):
+        return target
+    mod_name, _, attr = target.partition(":")
+    return getattr(importlib.import_module(mod_name), attr)
+
+def registered_tabs() -> List[Dict[str, Any]]:
+    return list(_TABS.values())
+
+def visible_keys() -> List[str]:
+    """Key tab yang boleh tampil di sesi ini (syarat `when` dievaluasi tiap rerun)."""
+    return [k for k, spec in _TABS.items() if spec["when"] is None or resolve(spec["when"])()]
+
+def active_tab_key(default: Optional[str] = None) -> Optional[str]:
+    """Tab aktif: session_state → query param ?tab= → default → tab pertama."""
+    keys = visible_keys()
+    if not keys:
+        return None
+    cur = st.session_state.get(STATE_KEY)
+    if cur in keys:
+        return cur
+    qp = st.query_params.get("tab")
+    if qp in keys:
+        return qp
+    return default if default in keys else keys[0]
+
+def render_tab_router(default: Optional[str] = None) -> Optional[str]:
+    """
+    Pengganti st.tabs(): st.tabs mengeksekusi SEMUA body tab di tiap rerun,
+    router ini hanya menjalankan body tab yang sedang aktif (plus deps-nya).
+    """
+    keys = visible_keys()
+    if not keys:
+        return None
+
+    current = active_tab_key(default)
+    if st.session_state.get(STATE_KEY) not in keys:
+        st.session_state[STATE_KEY] = current
+
+    active = st.radio(
+        "Menu",
+        keys,
+        format_func=lambda k: _TABS[k]["label"],
+        horizontal=True,
+        label_visibility="collapsed",
+        key=STATE_KEY,
+    )
+
+    # deep-link: ?tab=quran bisa dibagikan / di-bookmark
+    if st.query_params.get("tab") != active:
+        st.query_params["tab"] = active
+
+    spec = _TABS[active]
+    # satu span per rerun: waktu body tab + fetcher di dalamnya (components/metrics.py)
+    with metrics.rerun(active):
+        for dep in spec["deps"]:
+            resolve(dep)()
+        resolve(spec["render"])()
+    return active
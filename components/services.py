@@ -0,0 +1,195 @@
+"""
+Layanan inti tanpa Streamlit: waktu sholat, konversi Hijriah, kalender
+setahun, ayat Quran dan zakat penghasilan.
+
+Fungsi di sini murni (input → dict/bytes), jadi bisa dipakai UI Streamlit,
+API JSON (components/api.py) maupun skrip lain tanpa ScriptRunContext.
+Input salah → ServiceError dengan kode status HTTP yang cocok.
+
+    from components import services
+    services.prayer_times(city="Jakarta")
+    services.hijri_convert(date="2025-03-01")
+    services.calendar_year(1447, fmt="ics")
+    services.quran_ayah(1, 1)
+    services.zakat_income(10_000_000, 4_000_000, harga_emas=1_500_000)
+
+Tabel kota & timezone diambil dari components/geo_tz (tanpa Streamlit),
+jadi waktu sholat, Hijriah, zakat dan Quran tidak memuat Streamlit sama
+sekali. Hanya calendar_year yang masih memakai engine di components/event
+(modul UI, meng-import streamlit di level atas) — di-import malas di dalam fungsi.
+"""
+import datetime as dt
+import math
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+NISAB_EMAS_GRAM = 85.0
+ZAKAT_RATE = 0.025
+CALENDAR_FORMATS = ("json", "csv", "ics")
+
+class ServiceError(ValueError):
+    """Input tidak valid (400) atau data tidak ditemukan (404)."""
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+def _parse_date(s: Optional[str], field: str = "date") -> Optional[dt.date]:
+    if not s:
+        return None
+    for fmt in ("%Y-%m-%d", "%d-%m-%Y"):
+        try:
+            return dt.datetime.strptime(s.strip(), fmt).date()
+        except ValueError:
+            continue
+    raise ServiceError(f"{field} harus YYYY-MM-DD atau DD-MM-YYYY: {s!r}")
+
+def _int(v: Any, field: str) -> int:
+    try:
+        return int(v)
+    except (TypeError, ValueError):
+        raise ServiceError(f"{field} harus bilangan bulat: {v!r}")
+
+def _float(v: Any, field: str) -> float:
+    try:
+        x = float(v)
+    except (TypeError, ValueError):
+        raise ServiceError(f"{field} harus angka: {v!r}")
+    if not math.isfinite(x):  # inf/nan → JSON tidak valid (Infinity/NaN)
+        raise ServiceError(f"{field} harus angka berhingga: {v!r}")
+    return x
+
+# ===== Waktu sholat =====
+def prayer_times(city: Optional[str] = None, country: str = "Indonesia",
+                 lat: Optional[float] = None, lon: Optional[float] = None,
+                 tz: Optional[str] = None, date: Optional[str] = None,
+                 method: int = 20, school: int = 0) -> Dict[str, Any]:
+    """
+    Jadwal sholat satu hari, dihitung lokal (prayer_calc). Lokasi dari kota
+    di data/kota.json, atau lat/lon (+ tz opsional, default ditebak offline).
+    Di siang/malam kutub waktu yang tidak ada bernilai "-" (meta.undefined).
+    """
+    import pytz
+    from components.prayer_calc import METHOD_PARAMS, compute_timings
+    from components.geo_tz import find_city, tz_for_coords
+
+    method, school = _int(method, "method"), _int(school, "school")
+    if method not in METHOD_PARAMS:
+        raise ServiceError(f"method tidak dikenal: {method} (pilihan: {sorted(METHOD_PARAMS)})")
+    if school not in (0, 1):
+        raise ServiceError("school harus 0 (Syafi'i) atau 1 (Hanafi)")
+
+    if city:
+        kota = find_city(city, country)
+        if not kota:
+            raise ServiceError(f"kota tidak ditemukan di tabel offline: {city}, {country}", 404)
+        lat, lon, tz = kota["lat"], kota["lon"], tz or kota["tz"]
+    elif lat is not None and lon is not None:
+        lat, lon = _float(lat, "lat"), _float(lon, "lon")
+        if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+            raise ServiceError("lat/lon di luar rentang")
+        tz = tz or tz_for_coords(round(lat, 2), round(lon, 2))
+        if not tz:
+            raise ServiceError("zona waktu tidak bisa ditebak untuk koordinat ini; sertakan tz")
+    else:
+        raise ServiceError("sertakan city atau lat & lon")
+
+    try:
+        zone = pytz.timezone(tz)
+    except pytz.UnknownTimeZoneError:
+        raise ServiceError(f"tz tidak dikenal: {tz}")
+    day = _parse_date(date) or dt.datetime.now(zone).date()
+    payload = compute_timings(lat, lon, tz, day, method=method, school=school)
+    if city:
+        payload["meta"]["city"] = city
+    return payload
+
+# ===== Hijriah =====
+def hijri_convert(date: Optional[str] = None, hijri: Optional[str] = None, adjust: int = 0) -> Dict[str, Any]:
+    """
+    Masehi → Hijriah (`date`, default hari ini) atau Hijriah → Masehi
+    (`hijri` = DD-MM-YYYY). Bentuk hasil seperti `data` gToH/hToG Aladhan.
+    """
+    from components.hijri import HijriRangeError, hijri_payload, hijri_to_gregorian
+
+    adjust = _int(adjust, "adjust")
+    if abs(adjust) > 2:
+        raise ServiceError("adjust harus di antara -2..2")
+    try:
+        if hijri:
+            try:
+                d, m, y = (int(x) for x in hijri.strip().split("-"))
+            except ValueError:
+                raise ServiceError(f"hijri harus DD-MM-YYYY: {hijri!r}")
+            g = hijri_to_gregorian(y, m, d, adjust)
+        else:
+            g = _parse_date(date) or dt.date.today()
+        return hijri_payload(g, adjust)
+    except HijriRangeError as e:
+        raise ServiceError(str(e))
+
+@lru_cache(maxsize=32)
+def calendar_year(year_h: int, fmt: str = "json", mon_thu: bool = True, tasua: bool = True,
+                  adjust: int = 0, only_labeled: bool = False) -> bytes:
+    """
+    Kalender satu tahun Hijriah (berlabel) sebagai JSON/CSV/ICS. Hasil
+    deterministik per argumen → lru_cache; ±355 baris, murah disimpan.
+    """
+    import json
+
+    from components.event import hijri_years_range, iter_csv, iter_ics
+    from components.hijri import MAX_YEAR, MIN_YEAR
+
+    year_h = _int(year_h, "year")
+    if not (MIN_YEAR <= year_h <= MAX_YEAR):
+        raise ServiceError(f"tahun Hijriah harus {MIN_YEAR}–{MAX_YEAR}")
+    if fmt not in CALENDAR_FORMATS:
+        raise ServiceError(f"format harus salah satu dari {CALENDAR_FORMATS}")
+    rows = hijri_years_range(year_h, year_h, include_mon_thu=mon_thu, include_tasua=tasua,
+                             adjust=_int(adjust, "adjust"), only_labeled=only_labeled)
+    if fmt == "csv":
+        return b"".join(iter_csv(rows))
+    if fmt == "ics":
+        return b"".join(iter_ics(rows, cal_name=f"Kalender Hijriah {year_h} H"))
+    return json.dumps({"year": year_h, "days": list(rows)}, ensure_ascii=False).encode("utf-8")
+
+# ===== Quran =====
+def quran_ayah(surah: int, ayah: int) -> Dict[str, Any]:
+    """Satu ayat: korpus lokal bila ada, selain itu detail surat dari EQuran."""
+    from components.quran_store import get_store, get_surah_detail, normalize_ayat
+
+    surah, ayah = _int(surah, "surah"), _int(ayah, "ayah")
+    if not (1 <= surah <= 114):
+        raise ServiceError("surah harus 1–114")
+    store = get_store()
+    if store:
+        row = store.ayah(surah, ayah)
+    else:
+        ayat = (get_surah_detail(surah) or {}).get("ayat") or []
+        row = next((a for a in map(normalize_ayat, ayat) if a["nomor"] == ayah), None)
+    if not row:
+        raise ServiceError(f"ayat {surah}:{ayah} tidak ditemukan", 404)
+    return {"surah": surah, "ayah": ayah, **row}
+
+# ===== Zakat =====
+def nisab_emas_idr(emas_idr_per_gram: float, tahunan: bool) -> float:
+    nisab_tahunan = NISAB_EMAS_GRAM * emas_idr_per_gram
+    return nisab_tahunan if tahunan else nisab_tahunan / 12.0
+
+def zakat_income(penghasilan: float, pengeluaran: float = 0, harga_emas: float = 1_000_000,
+                 tahunan: bool = False, pakai_nisab: bool = True) -> Dict[str, Any]:
+    """Zakat penghasilan 2,5% dari (penghasilan − pengeluaran pokok), dengan syarat nisab 85 gr emas."""
+    penghasilan, pengeluaran = _float(penghasilan, "penghasilan"), _float(pengeluaran, "pengeluaran")
+    harga_emas = _float(harga_emas, "harga_emas")
+    if min(penghasilan, pengeluaran, harga_emas) < 0:
+        raise ServiceError("nilai tidak boleh negatif")
+    saldo = max(penghasilan - pengeluaran, 0)
+    nisab = nisab_emas_idr(harga_emas, tahunan)
+    wajib = (saldo >= nisab) if pakai_nisab else True
+    return {
+        "saldo": saldo,
+        "nisab": nisab,
+        "wajib": wajib,
+        "zakat": ZAKAT_RATE * saldo if wajib else 0,
+        "metode": "tahunan" if tahunan else "bulanan",
+    }
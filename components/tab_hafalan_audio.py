@@ -3,6 +3,8 @@ import streamlit as st
 from urllib.parse import quote_plus
 from tools_mushaf import MUSHAF
 
+from components.metrics import instrument
+
 # ======================
 # KONFIGURASI
 # ======================
@@ -41,6 +43,7 @@ def _audio_file_meta(upload) -> tuple[str, bytes]:
 # ======================
 # STT (Opsional)
 # ======================
+@instrument("run_stt", cached=False)
 def run_stt(audio_bytes: bytes) -> str:
     """
     Transkripsi audio -> teks Arab (jika memungkinkan).
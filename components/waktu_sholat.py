@@ -1,10 +1,19 @@
 import datetime as dt
+import json
 import pytz
 import streamlit as st
-import requests
+from streamlit.components.v1 import html
+from functools import lru_cache
+from typing import Optional
+
+from components import http_client
+from components.geo_tz import all_cities, find_city, tz_for_coords  # noqa: F401 (re-export)
+from components.metrics import instrument
+from components.response_cache import persistent_cache
+from components.prayer_calc import compute_timings, prayer_timetable
 
 # ====== Konstanta global ======
-TZ = pytz.timezone("Asia/Jakarta")
+TZ = pytz.timezone("Asia/Jakarta")  # default kalau zona lokasi tak bisa ditentukan
 METHODS = {
     "UOIF (Europe)": 12,
     "Moonsighting Committee": 20,
@@ -15,12 +24,61 @@ METHODS = {
 }
 
 # ====== Helper functions ======
-@st.cache_data(show_spinner=False, ttl=300)
-def fetch_timings_by_city(city: str, country: str, method: int):
+@instrument("fetch_timings")
+def fetch_timings(city: str, country: str, method: int, school: int = 0):
+    """
+    Waktu sholat hari ini. Kota yang ada di tabel offline dihitung lokal
+    (components/prayer_calc.py, tanpa jaringan); selain itu fallback ke Aladhan.
+    """
+    kota = find_city(city, country)
+    if kota:
+        today = dt.datetime.now(pytz.timezone(kota["tz"])).date()
+        return compute_timings(kota["lat"], kota["lon"], kota["tz"], today, method=method, school=school)
+    return fetch_timings_by_city(city, country, method, school)
+
+# ====== Zona waktu per lokasi ======
+@lru_cache(maxsize=64)
+def get_tz(name: str):
+    """pytz timezone dari nama IANA (di-cache); nama tak dikenal → TZ default."""
+    try:
+        return pytz.timezone(name)
+    except pytz.UnknownTimeZoneError:
+        return TZ
+
+def location_tz(payload: dict):
+    """
+    Zona waktu lokasi dari payload timings: `meta.timezone` (Aladhan maupun
+    hitungan lokal selalu mengisinya), lalu lookup koordinat, lalu TZ default.
+    """
+    meta = (payload or {}).get("meta") or {}
+    if meta.get("timezone"):
+        return get_tz(meta["timezone"])
+    try:
+        name = tz_for_coords(round(float(meta["latitude"]), 2), round(float(meta["longitude"]), 2))
+    except (KeyError, TypeError, ValueError):
+        name = None
+    return get_tz(name) if name else TZ
+
+@instrument("yearly_timetable")
+@st.cache_data(show_spinner=False, ttl=24 * 3600)
+def yearly_timetable(locations: tuple, year: int, method: int, school: int = 0):
+    """
+    Jadwal setahun untuk banyak lokasi sekaligus (dihitung vektor, lihat
+    prayer_calc.prayer_timetable). `locations`: tuple (kota, lat, lon, tz)
+    supaya bisa di-hash oleh st.cache_data.
+    """
+    locs = [{"kota": k, "lat": lat, "lon": lon, "tz": tz} for k, lat, lon, tz in locations]
+    return prayer_timetable(locs, year, method=method, school=school)
+
+@instrument("fetch_timings_by_city")
+# jadwal "hari ini": entri basi saat upstream gagal hanya boleh sebentar,
+# jangan sampai jadwal kemarin tersaji lewat tengah malam
+@persistent_cache(show_spinner=False, ttl=300, stale_if_error=900)
+def fetch_timings_by_city(city: str, country: str, method: int, school: int = 0):
     url = "https://api.aladhan.com/v1/timingsByCity"
-    r = requests.get(
+    r = http_client.get(
         url,
-        params={"city": city, "country": country, "method": method, "school": 0},
+        params={"city": city, "country": country, "method": method, "school": school},
         timeout=10,
     )
     r.raise_for_status()
@@ -31,13 +89,14 @@ def fetch_timings_by_city(city: str, country: str, method: int):
 
 def parse_today_times(timings_dict):
     keys = ["Fajr", "Dhuhr", "Asr", "Maghrib", "Isha"]
-    return {k: timings_dict[k] for k in keys if k in timings_dict}
+    # "-" = waktu tidak ada hari itu (siang/malam kutub, lihat prayer_calc)
+    return {k: timings_dict[k] for k in keys if ":" in timings_dict.get(k, "")}
 
-def to_local_datetime(date_readable: str, time_str: str):
+def to_local_datetime(date_readable: str, time_str: str, tz=None):
     d = dt.datetime.strptime(date_readable, "%d %b %Y").date()
     hh, mm = [int(x) for x in time_str.split(":")[:2]]
     naive = dt.datetime(d.year, d.month, d.day, hh, mm)
-    return TZ.localize(naive)
+    return (tz or TZ).localize(naive)
 
 def next_prayer(now_local: dt.datetime, times_local: dict):
     upcoming = [(name, t) for name, t in times_local.items() if t > now_local]
@@ -59,3 +118,49 @@ def fmt_delta(delta: dt.timedelta):
     if h == 0:
         parts.append(f"{ss} dtk")
     return " ".join(parts)
+
+# ====== Countdown di browser ======
+_COUNTDOWN_HTML = """
+<div id="cd" style="font-family:sans-serif;padding:.75rem 1rem;border-radius:.5rem;
+     background:rgba(33,195,84,.12);color:inherit;font-size:1rem"></div>
+<script>
+const S = __SCHEDULE__;
+const el = document.getElementById("cd");
+function fmt(s) {
+  const h = Math.floor(s / 3600), m = Math.floor(s % 3600 / 60), ss = s % 60;
+  const p = [];
+  if (h) p.push(h + " jam");
+  if (m || (h && ss)) p.push(m + " mnt");
+  if (!h) p.push(ss + " dtk");
+  return p.join(" ");
+}
+function tick() {
+  const now = Date.now();
+  const nx = S.find(x => x.t > now);
+  if (!nx) { el.innerHTML = "Semua waktu sholat hari ini sudah lewat."; return; }
+  const s = Math.max(0, Math.floor((nx.t - now) / 1000));
+  el.innerHTML = "Sholat berikutnya: <b>" + nx.name + "</b> — <b>" + nx.hhmm + "</b> (≈ " + fmt(s) + ")";
+}
+tick();
+setInterval(tick, 1000);
+</script>
+"""
+
+def countdown_schedule(times_local: dict, days: int = 2):
+    """
+    Daftar {name, t (epoch ms), hhmm} untuk hari ini + hari berikutnya
+    (jadwal hari ini digeser 24 jam, selisihnya ≤ ~1 menit) supaya hitung
+    mundur di browser bisa langsung lanjut ke Subuh besok.
+    """
+    out = []
+    for d in range(days):
+        for name, t in times_local.items():
+            # jam dinding yang sama keesokan harinya (aman untuk pergantian DST)
+            tt = get_tz(str(t.tzinfo)).localize(t.replace(tzinfo=None) + dt.timedelta(days=d))
+            out.append({"name": name, "t": int(tt.timestamp() * 1000), "hhmm": tt.strftime("%H:%M")})
+    return sorted(out, key=lambda x: x["t"])
+
+def render_countdown(times_local: dict):
+    """Hitung mundur sholat berikutnya yang berdetak di browser (tanpa rerun server)."""
+    schedule = json.dumps(countdown_schedule(times_local))
+    html(_COUNTDOWN_HTML.replace("__SCHEDULE__", schedule), height=60)
@@ -0,0 +1,244 @@
+"""
+Warm-up & refresh latar untuk data upstream (satu scheduler per proses).
+
+Container yang baru hidup punya cache kosong: pengguna pertama yang membuka
+Quran / Doa Harian / Kalender menanggung seluruh latensi upstream. Scheduler
+ini jalan di thread daemon, mengisi cache @persistent_cache saat boot lalu
+menyegarkannya sebelum TTL habis (REFRESH_AT × ttl), jadi rerun pengguna
+tidak pernah menunggu upstream.
+
+Job didaftarkan seperti tab di router — target string "modul:fungsi" baru
+di-import saat job pertama kali jalan:
+
+    register_job("doa_list", "Doa harian (daftar)", "components.doa_harian:fetch_list")
+    register_job("hijri_year", "Kalender Hijriah (API)", "components.event:_api_h_to_g_calendar",
+                 args="components.warmup:current_hijri_months")
+
+Target yang punya `.refresh` (fungsi @persistent_cache) dipanggil lewat
+refresh(*args); selain itu dipanggil langsung. Entri yang masih segar
+(mis. baru disegarkan replika lain lewat file cache bersama) dilewati.
+
+Job yang butuh st.secrets mendapat argumennya dari thread skrip lewat
+start(job_args={...}) — thread warm-up tidak punya ScriptRunContext.
+
+Env: ISLAMICHAT_WARMUP = daftar nama job dipisah koma, "off" mematikan
+(default: quran_corpus,quran_list,doa_list,radios,hijri_year).
+"""
+import datetime as dt
+import heapq
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from components.router import resolve
+
+DEFAULT_JOBS = "quran_corpus,quran_list,doa_list,radios,hijri_year"
+REFRESH_AT = 0.8        # segarkan saat umur entri 80% TTL
+DEFAULT_EVERY_SEC = 3600
+JITTER = 0.1            # ± fraksi interval, supaya replika tidak serempak
+BOOT_DELAY_SEC = 5.0    # warm-up pertama diacak 0..BOOT_DELAY_SEC
+MIN_EVERY_SEC = 60
+
+Target = Union[str, Callable[..., Any]]
+ArgsSpec = Union[None, str, Callable[[], List[Tuple]], List[Tuple]]
+
+# ===== Registry job =====
+# name -> {"name", "label", "target", "args", "every", "jitter"}; urutan insert = urutan tampil
+_JOBS: Dict[str, Dict[str, Any]] = {}
+_status: Dict[str, Dict[str, Any]] = {}
+_status_lock = threading.Lock()
+
+def register_job(name: str, label: str, target: Target, args: ArgsSpec = None,
+                 every: Optional[float] = None, jitter: float = JITTER) -> None:
+    """
+    `args` = list tuple argumen (satu panggilan per tuple), atau target yang
+    mengembalikan list itu saat job jalan (mis. bulan-bulan tahun Hijriah
+    berjalan). `every` None → REFRESH_AT × ttl fungsi cache (atau 1 jam).
+    """
+    _JOBS[name] = {"name": name, "label": label, "target": target, "args": args,
+                   "every": every, "jitter": jitter}
+    with _status_lock:
+        _status.setdefault(name, {"last_run": None, "ok": None, "ms": None, "calls": 0,
+                                  "skipped": 0, "error": "", "next_run": None})
+
+def registered_jobs() -> List[Dict[str, Any]]:
+    return list(_JOBS.values())
+
+def _arg_list(job: Dict[str, Any]) -> List[Tuple]:
+    spec = job["args"]
+    if spec is None:
+        return [()]
+    if isinstance(spec, (str,)) or callable(spec):
+        return [tuple(a) for a in resolve(spec)()]
+    return [tuple(a) for a in spec]
+
+def _interval(job: Dict[str, Any], fn: Any) -> float:
+    every = job["every"]
+    if every is None:
+        ttl = getattr(fn, "ttl", None)
+        every = ttl * REFRESH_AT if ttl else DEFAULT_EVERY_SEC
+    return max(float(every), MIN_EVERY_SEC)
+
+def _jittered(sec: float, frac: float) -> float:
+    return sec * (1 + random.uniform(-frac, frac))
+
+def run_job(name: str) -> float:
+    """Jalankan satu job sekarang; kembalikan interval sampai jalan berikutnya."""
+    job = _JOBS[name]
+    t = time.perf_counter()
+    calls = skipped = 0
+    err = ""
+    every = DEFAULT_EVERY_SEC
+    try:
+        fn = resolve(job["target"])
+        every = _interval(job, fn)
+        for args in _arg_list(job):
+            age = fn.age(*args) if hasattr(fn, "age") else None
+            if age is not None and age < every * 0.5:
+                skipped += 1  # sudah disegarkan (proses/replika lain)
+                continue
+            value = (fn.refresh if hasattr(fn, "refresh") else fn)(*args)
+            calls += 1
+            if value is None or value == [] or value == {}:
+                # fetcher lama menelan error dan mengembalikan None/[]
+                err = f"hasil kosong untuk {args}" if args else "hasil kosong"
+    except Exception as e:
+        err = f"{type(e).__name__}: {e}"[:300]
+    with _status_lock:
+        st_ = _status[name]
+        st_.update(last_run=time.time(), ok=not err, ms=round((time.perf_counter() - t) * 1000),
+                   error=err, calls=st_["calls"] + calls, skipped=st_["skipped"] + skipped)
+    # gagal → coba lagi lebih cepat (tapi tetap ≥ MIN_EVERY_SEC)
+    return every if not err else max(MIN_EVERY_SEC, every / 10)
+
+# ===== Scheduler =====
+class _Scheduler(threading.Thread):
+    def __init__(self, names: List[str]):
+        super().__init__(name="warmup", daemon=True)
+        self.names = names
+        self.stop_event = threading.Event()
+
+    def run(self) -> None:
+        now = time.time()
+        queue = [(now + random.uniform(0, BOOT_DELAY_SEC), n) for n in self.names]
+        heapq.heapify(queue)
+        while queue and not self.stop_event.is_set():
+            when, name = queue[0]
+            self._set_next(name, when)
+            if self.stop_event.wait(max(0.0, when - time.time())):
+                break
+            heapq.heappop(queue)
+            every = run_job(name)
+            heapq.heappush(queue, (time.time() + _jittered(every, _JOBS[name]["jitter"]), name))
+
+    def _set_next(self, name: str, when: float) -> None:
+        with _status_lock:
+            _status[name]["next_run"] = when
+
+_scheduler: Optional[_Scheduler] = None
+_start_lock = threading.Lock()
+
+def enabled_jobs() -> List[str]:
+    raw = os.getenv("ISLAMICHAT_WARMUP", DEFAULT_JOBS).strip()
+    if raw.lower() in ("off", "0", "false", "none", ""):
+        return []
+    return [n.strip() for n in raw.split(",") if n.strip() in _JOBS]
+
+def start(job_args: Optional[Dict[str, ArgsSpec]] = None) -> bool:
+    """
+    Mulai scheduler sekali per proses (aman dipanggil di setiap rerun).
+    `job_args` menimpa args job tertentu dengan nilai yang dibaca di thread
+    skrip (mis. kunci API dari st.secrets).
+    """
+    global _scheduler
+    if _scheduler is not None:
+        return False
+    with _start_lock:
+        if _scheduler is not None:
+            return False
+        for name, spec in (job_args or {}).items():
+            if name in _JOBS:
+                _JOBS[name]["args"] = spec
+        names = enabled_jobs()
+        if not names:
+            return False
+        _scheduler = _Scheduler(names)
+        _scheduler.start()
+        return True
+
+def stop() -> None:
+    global _scheduler
+    if _scheduler is not None:
+        _scheduler.stop_event.set()
+        _scheduler = None
+
+def status() -> List[Dict[str, Any]]:
+    """Baris status per job (untuk panel)."""
+    active = set(_scheduler.names) if _scheduler else set()
+    with _status_lock:
+        return [{"name": j["name"], "label": j["label"], "active": j["name"] in active, **_status[j["name"]]}
+                for j in _JOBS.values()]
+
+# ===== Job bawaan =====
+def current_hijri_months() -> List[Tuple]:
+    """12 bulan tahun Hijriah berjalan (argumen _api_h_to_g_calendar)."""
+    from components.hijri import gregorian_to_hijri
+    year_h = gregorian_to_hijri(dt.date.today())[0]
+    return [(year_h, m, 0) for m in range(1, 13)]
+
+def _surah_list_if_api() -> List[Tuple]:
+    # korpus lokal sudah ada → list_surah() tidak memanggil API
+    from components.quran_store import get_store
+    return [()] if get_store() is None else []
+
+def _hijri_year_if_api() -> List[Tuple]:
+    # jalur lokal (default) tidak memanggil API sama sekali — tak ada yang perlu dipanaskan
+    from components.event import HIJRI_SOURCE
+    return current_hijri_months() if HIJRI_SOURCE == "api" else []
+
+# korpus belum di-bundle → bangun sekali dari API (no-op kalau sudah ada)
+register_job("quran_corpus", "Quran • korpus lokal", "components.quran_store:ensure_corpus",
+             every=24 * 3600)
+register_job("quran_list", "Quran • daftar surah", "components.quran_store:_api_list_surah",
+             args="components.warmup:_surah_list_if_api")
+register_job("doa_list", "Doa harian • daftar", "components.doa_harian:fetch_list")
+register_job("radios", "Murottal • daftar radio", "components.murottal:fetch_radios")
+register_job("hijri_year", "Kalender Hijriah • 12 bulan (API)", "components.event:_api_h_to_g_calendar",
+             args="components.warmup:_hijri_year_if_api")
+# args = [(GOLDAPI_KEY,)] dari app.py lewat start(job_args=...); tanpa kunci → no-op
+register_job("gold_price", "Zakat • harga emas", "components.zakat:fetch_gold_price_idr_per_gram",
+             args=[])
+
+def render_status() -> None:
+    """Panel status: kapan tiap dataset terakhir disegarkan + statistik cache."""
+    import streamlit as st
+    from components.response_cache import all_stats
+
+    def _fmt(ts: Optional[float]) -> str:
+        return dt.datetime.fromtimestamp(ts).strftime("%d/%m %H:%M:%S") if ts else "-"
+
+    st.dataframe(
+        [
+            {
+                "dataset": s["label"],
+                "aktif": "✅" if s["active"] else "—",
+                "terakhir": _fmt(s["last_run"]),
+                "status": "-" if s["ok"] is None else ("ok" if s["ok"] else "gagal"),
+                "durasi (ms)": s["ms"],
+                "berikutnya": _fmt(s["next_run"]) if s["active"] else "-",
+                "error": s["error"],
+            }
+            for s in status()
+        ],
+        hide_index=True, use_container_width=True,
+    )
+    rows = all_stats()
+    if rows:
+        st.caption("Cache respons (proses ini)")
+        st.dataframe(
+            [{k: r[k] for k in ("name", "hit", "stale", "miss", "error", "refresh", "entries", "bytes")}
+             for r in rows],
+            hide_index=True, use_container_width=True,
+        )
@@ -1,17 +1,31 @@
-import requests, math, streamlit as st
+import math, streamlit as st
+
+from components import http_client
+from components.metrics import instrument
+from components.response_cache import persistent_cache
+from components.services import zakat_income
 
 OZT_TO_GRAM = 31.1034768
 
-@st.cache_data(ttl=6*3600)
-def fetch_gold_price_idr_per_gram() -> tuple[float, str]:
+def gold_api_key() -> str:
+    """GOLDAPI_KEY dari st.secrets — dibaca di thread skrip, lalu diteruskan ke fetcher."""
+    try:
+        return str(st.secrets.get("GOLDAPI_KEY", "") or "")
+    except Exception:  # tanpa secrets.toml
+        return ""
+
+@instrument("fetch_gold_price_idr_per_gram")
+@persistent_cache(ttl=6*3600)
+def fetch_gold_price_idr_per_gram(key: str) -> tuple[float, str]:
     """
     Ambil harga emas/gram (IDR). Urutan:
       A) GoldAPI XAU/IDR: price_gram_24k -> fallback price/ozt / 31.1034768
       B) GoldAPI XAU/USD + kurs USD→IDR (open.er-api.com)
+    `key` = GOLDAPI_KEY (lihat gold_api_key); tak membaca st.* supaya aman
+    dipanggil warm-up dari thread latar.
     Return: (harga_idr_per_gram, sumber_info)
     Raise Exception bila seluruh langkah gagal.
     """
-    key = st.secrets.get("GOLDAPI_KEY", "")
     if not key:
         raise Exception("GOLDAPI_KEY tidak ada di secrets")
 
@@ -19,7 +33,7 @@ def fetch_gold_price_idr_per_gram() -> tuple[float, str]:
 
     # --- A) Langsung XAU/IDR ---
     try:
-        r = requests.get("https://www.goldapi.io/api/XAU/IDR", headers=headers, timeout=10)
+        r = http_client.get("https://www.goldapi.io/api/XAU/IDR", headers=headers, timeout=10)
         data = r.json()
         if "error" in data:
             # tampilkan error aslinya untuk debugging di UI
@@ -42,7 +56,7 @@ def fetch_gold_price_idr_per_gram() -> tuple[float, str]:
 
     # --- B) XAU/USD + konversi kurs ---
     try:
-        r = requests.get("https://www.goldapi.io/api/XAU/USD", headers=headers, timeout=10)
+        r = http_client.get("https://www.goldapi.io/api/XAU/USD", headers=headers, timeout=10)
         data = r.json()
         if "error" in data:
             raise Exception(f"GoldAPI XAU/USD error: {data.get('error')}")
@@ -54,7 +68,7 @@ def fetch_gold_price_idr_per_gram() -> tuple[float, str]:
             p_ozt_usd = float(data["price"])  # naikkan KeyError bila tak ada → ketangkap except
             usd_per_gram = p_ozt_usd / OZT_TO_GRAM
 
-        fx = requests.get("https://open.er-api.com/v6/latest/USD", timeout=10).json()
+        fx = http_client.get("https://open.er-api.com/v6/latest/USD", timeout=10).json()
         usd_idr = float(fx["rates"]["IDR"])
         idr_per_gram = usd_per_gram * usd_idr
         if math.isfinite(idr_per_gram) and idr_per_gram > 0:
@@ -69,10 +83,6 @@ def fetch_gold_price_idr_per_gram() -> tuple[float, str]:
 def format_rp(x: float) -> str:
     return f"Rp {x:,.0f}".replace(",", ".")
 
-def nisab_emas_idr(emas_idr_per_gram: float, tahunan: bool) -> float:
-    nisab_tahunan = 85.0 * emas_idr_per_gram
-    return nisab_tahunan if tahunan else nisab_tahunan / 12.0
-
 def zakat_kalkulator():
     st.subheader("💰 Kalkulator Zakat Penghasilan")
 
@@ -89,7 +99,7 @@ def zakat_kalkulator():
     auto_err = None
     if use_auto:
         try:
-            auto_price, source = fetch_gold_price_idr_per_gram()
+            auto_price, source = fetch_gold_price_idr_per_gram(gold_api_key())
         except Exception as e:
             auto_err = str(e)
 
@@ -115,10 +125,9 @@ def zakat_kalkulator():
         pakai_nisab = st.checkbox("Terapkan syarat nisab", value=True)
 
     if st.button("Hitung Zakat", type="primary"):
-        saldo = max(penghasilan - pengeluaran, 0)
-        nisab = nisab_emas_idr(emas_per_gram, tahunan=(metode=="Tahunan (Maal)"))
-        wajib = (saldo >= nisab) if pakai_nisab else True
-        zakat = 0.025 * saldo if wajib else 0
+        hasil = zakat_income(penghasilan, pengeluaran, emas_per_gram,
+                             tahunan=(metode=="Tahunan (Maal)"), pakai_nisab=pakai_nisab)
+        saldo, nisab, wajib, zakat = hasil["saldo"], hasil["nisab"], hasil["wajib"], hasil["zakat"]
 
         st.markdown("---")
         st.write(f"💡 Nisab acuan: {format_rp(nisab)} "